@@ -10,6 +10,9 @@ from urllib.parse import urlparse
 from pydantic import Field, AliasChoices, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Provider names accepted by MCP_DEFAULT_PROVIDER, in implicit-default order.
+SUPPORTED_PROVIDERS = ("hunyuan", "openai", "doubao")
+
 
 class ServerConfig(BaseSettings):
     """
@@ -38,6 +41,48 @@ class ServerConfig(BaseSettings):
         validation_alias=AliasChoices('MCP_PORT', 'port')
     )
 
+    http_loop: Literal["auto", "asyncio", "uvloop"] = Field(
+        default="auto",
+        description="uvicorn event loop implementation (auto picks uvloop when installed)",
+        validation_alias=AliasChoices('MCP_HTTP_LOOP', 'http_loop')
+    )
+
+    http_parser: Literal["auto", "h11", "httptools"] = Field(
+        default="auto",
+        description="uvicorn HTTP parser implementation (auto picks httptools when installed)",
+        validation_alias=AliasChoices('MCP_HTTP_PARSER', 'http_parser')
+    )
+
+    http_access_log: bool = Field(
+        default=False,
+        description="Emit a uvicorn access log line for every HTTP request",
+        validation_alias=AliasChoices('MCP_HTTP_ACCESS_LOG', 'http_access_log')
+    )
+
+    http_workers: int = Field(
+        default=1,
+        description=(
+            "Number of uvicorn worker processes for the HTTP transport. Sessions and "
+            "get_image_data records are kept per worker"
+        ),
+        validation_alias=AliasChoices('MCP_HTTP_WORKERS', 'http_workers')
+    )
+
+    http_max_concurrency: int = Field(
+        default=0,
+        description=(
+            "Maximum concurrent connections/tasks per HTTP worker; excess requests are "
+            "answered with 503 instead of queueing. 0 disables the limit"
+        ),
+        validation_alias=AliasChoices('MCP_HTTP_MAX_CONCURRENCY', 'http_max_concurrency')
+    )
+
+    max_request_body_bytes: int = Field(
+        default=10 * 1024 * 1024,
+        description="Maximum JSON-RPC POST body size in bytes (only for http transport)",
+        validation_alias=AliasChoices('MCP_MAX_REQUEST_BODY_BYTES', 'max_request_body_bytes')
+    )
+
     # ========== Security Configuration ==========
     auth_token: Optional[str] = Field(
         default=None,
@@ -111,6 +156,15 @@ class ServerConfig(BaseSettings):
         validation_alias=AliasChoices('MCP_GET_IMAGE_DATA_MAX_BYTES', 'get_image_data_max_bytes')
     )
 
+    inline_image_max_bytes: int = Field(
+        default=0,
+        description=(
+            "Largest generated image (bytes) returned inline as base64 in generate_image; "
+            "larger saved images are returned as local_path/url only. 0 disables the limit"
+        ),
+        validation_alias=AliasChoices('MCP_INLINE_IMAGE_MAX_BYTES', 'inline_image_max_bytes')
+    )
+
     # ========== Provider Configuration ==========
     default_provider: Optional[str] = Field(
         default=None,
@@ -153,6 +207,27 @@ class ServerConfig(BaseSettings):
         validation_alias=AliasChoices('OPENAI_MODEL', 'openai_model')
     )
 
+    openai_max_retries: int = Field(
+        default=5,
+        description="Retries for transient OpenAI failures (429, 408, 409, 5xx, timeouts, connection errors)",
+        validation_alias=AliasChoices('OPENAI_MAX_RETRIES', 'openai_max_retries')
+    )
+
+    openai_backoff_max: float = Field(
+        default=60.0,
+        description="Upper bound in seconds for the jittered exponential backoff between OpenAI retries",
+        validation_alias=AliasChoices('OPENAI_BACKOFF_MAX', 'openai_backoff_max')
+    )
+
+    openai_cache_size: int = Field(
+        default=0,
+        description=(
+            "Entries in the exact-match OpenAI response cache keyed by model, prompt and options "
+            "(0 disables caching; each entry holds a full base64 image)"
+        ),
+        validation_alias=AliasChoices('OPENAI_CACHE_SIZE', 'openai_cache_size')
+    )
+
     # Doubao (ByteDance) - New Ark API
     doubao_api_key: Optional[str] = Field(
         default=None,
@@ -215,11 +290,18 @@ class ServerConfig(BaseSettings):
     @field_validator("default_provider")
     @classmethod
     def _normalize_default_provider(cls, value: Optional[str]) -> Optional[str]:
-        """Normalize default provider input from env/config."""
+        """Normalize and validate default provider input from env/config."""
         if value is None:
             return None
         normalized = value.strip().lower()
-        return normalized or None
+        if not normalized:
+            return None
+        if normalized not in SUPPORTED_PROVIDERS:
+            raise ValueError(
+                "Invalid MCP_DEFAULT_PROVIDER. "
+                f"Supported values: {list(SUPPORTED_PROVIDERS)}; got: {normalized!r}"
+            )
+        return normalized
 
     def get_provider_credentials(self) -> dict:
         """
@@ -294,6 +376,27 @@ class ServerConfig(BaseSettings):
             if self.get_image_data_max_bytes <= 0:
                 raise ValueError("MCP_GET_IMAGE_DATA_MAX_BYTES must be greater than 0")
 
+            if self.max_request_body_bytes <= 0:
+                raise ValueError("MCP_MAX_REQUEST_BODY_BYTES must be greater than 0")
+
+            if self.http_workers <= 0:
+                raise ValueError("MCP_HTTP_WORKERS must be greater than 0")
+
+            if self.http_max_concurrency < 0:
+                raise ValueError("MCP_HTTP_MAX_CONCURRENCY must be greater than or equal to 0")
+
+        if self.inline_image_max_bytes < 0:
+            raise ValueError("MCP_INLINE_IMAGE_MAX_BYTES must be greater than or equal to 0")
+
+        if self.openai_max_retries < 0:
+            raise ValueError("OPENAI_MAX_RETRIES must be greater than or equal to 0")
+
+        if self.openai_backoff_max <= 0:
+            raise ValueError("OPENAI_BACKOFF_MAX must be greater than 0")
+
+        if self.openai_cache_size < 0:
+            raise ValueError("OPENAI_CACHE_SIZE must be greater than or equal to 0")
+
     def __str__(self) -> str:
         """String representation of config (safe, no secrets)."""
         return (
@@ -322,4 +425,4 @@ def load_config() -> ServerConfig:
 
 
 # Export for convenience
-__all__ = ["ServerConfig", "load_config"]
+__all__ = ["ServerConfig", "SUPPORTED_PROVIDERS", "load_config"]
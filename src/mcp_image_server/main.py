@@ -5,8 +5,18 @@ This module provides a single entry point that supports both stdio and HTTP tran
 based on configuration, ensuring backward compatibility while enabling remote access.
 """
 
+import logging
 import sys
-from .config import load_config
+from .config import ServerConfig, load_config
+
+
+def configure_logging(config: ServerConfig) -> None:
+    """Send package log records to stderr (stdout carries the stdio JSON-RPC stream)."""
+    logging.basicConfig(
+        stream=sys.stderr,
+        level=getattr(logging, config.log_level.upper(), logging.INFO),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
 
 
 def main():
@@ -19,6 +29,7 @@ def main():
     try:
         # Load configuration
         config = load_config()
+        configure_logging(config)
 
         print(f"Starting MCP Image Generation Server...", file=sys.stderr)
         print(f"Transport mode: {config.transport}", file=sys.stderr)
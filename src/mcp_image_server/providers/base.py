@@ -1,17 +1,84 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, Optional
+import asyncio
 import sys
 
+import aiohttp
+
+# Upper bound for a single generated image accepted from an upstream API.
+DEFAULT_MAX_IMAGE_BYTES = 50 * 1024 * 1024
+
+# One pooled aiohttp session per event loop, shared by the aiohttp-based providers
+# so keep-alive connections (and their TLS sessions) survive provider re-creation
+# on reload_config. Closed once by ProviderManager.aclose() on shutdown.
+_HTTP_SESSIONS: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+_HTTP_CONNECTION_LIMIT = 100
+_HTTP_KEEPALIVE_SECONDS = 60
+
+
 def debug_print(*args, **kwargs):
     """Print debug messages to stderr instead of stdout"""
     print(*args, file=sys.stderr, **kwargs)
 
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session for the running event loop, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    session = _HTTP_SESSIONS.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=_HTTP_CONNECTION_LIMIT,
+                keepalive_timeout=_HTTP_KEEPALIVE_SECONDS,
+            )
+        )
+        _HTTP_SESSIONS[loop] = session
+    return session
+
+
+async def close_http_session() -> None:
+    """Close the shared aiohttp session of the running event loop, if any"""
+    session = _HTTP_SESSIONS.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+def error_result(message: str) -> List[Dict]:
+    """Build the single-item error result returned by providers"""
+    return [{"error": message, "content_type": "text/plain"}]
+
+
+class ImageTooLargeError(Exception):
+    """Raised when an upstream image exceeds the provider's max_image_bytes limit"""
+
+    def __init__(self, size: int, max_bytes: int):
+        super().__init__(f"Image too large: {size} bytes exceeds limit of {max_bytes} bytes")
+        self.size = size
+        self.max_bytes = max_bytes
+
+
+async def read_limited(response: aiohttp.ClientResponse, max_bytes: int) -> bytes:
+    """Read a response body in 64 KiB chunks, raising ImageTooLargeError once max_bytes is exceeded"""
+    if response.content_length is not None and response.content_length > max_bytes:
+        raise ImageTooLargeError(response.content_length, max_bytes)
+
+    buffer = bytearray()
+    async for chunk in response.content.iter_chunked(64 * 1024):
+        buffer += chunk
+        if len(buffer) > max_bytes:
+            raise ImageTooLargeError(len(buffer), max_bytes)
+    return bytes(buffer)
+
+
 class BaseImageProvider(ABC):
     """Base class for image generation API providers"""
-    
+
+    _err = staticmethod(error_result)
+
     def __init__(self, **kwargs):
         """Initialize the provider with configuration"""
         self.config = kwargs
+        self.max_image_bytes = int(kwargs.get("max_image_bytes") or DEFAULT_MAX_IMAGE_BYTES)
         
     @abstractmethod
     async def generate_images(
@@ -33,25 +100,41 @@ class BaseImageProvider(ABC):
             **kwargs: Additional provider-specific parameters
             
         Returns:
-            List[Dict]: List of generated image information
+            List[Dict]: List of generated image information. Successful items
+            carry the image either as raw bytes in "content_bytes" or as a
+            base64 string in "content"; failures carry "error".
         """
         pass
     
     @abstractmethod
-    def get_available_styles(self) -> Dict[str, str]:
-        """Get available image styles for this provider"""
+    def get_available_styles(self) -> Mapping[str, str]:
+        """Get available image styles for this provider (read-only mapping)"""
         pass
     
     @abstractmethod
-    def get_available_resolutions(self) -> Dict[str, str]:
-        """Get available image resolutions for this provider"""
+    def get_available_resolutions(self) -> Mapping[str, str]:
+        """Get available image resolutions for this provider (read-only mapping)"""
         pass
     
+    @classmethod
+    def catalog_styles(cls, **config) -> Mapping[str, str]:
+        """Styles an instance built with these constructor kwargs would report, without building it"""
+        raise NotImplementedError
+
+    @classmethod
+    def catalog_resolutions(cls, **config) -> Mapping[str, str]:
+        """Resolutions an instance built with these constructor kwargs would report, without building it"""
+        raise NotImplementedError
+
     @abstractmethod
     def get_provider_name(self) -> str:
         """Get the name of this provider"""
         pass
     
+    async def aclose(self) -> None:
+        """Release network resources held by this provider (no-op by default)"""
+        return None
+
     def validate_style(self, style: str) -> bool:
         """Validate if the style is supported by this provider"""
         return style in self.get_available_styles()
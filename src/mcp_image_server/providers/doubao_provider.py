@@ -1,10 +1,29 @@
-import base64
 import json
-from typing import Dict, List, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
 import asyncio
+import logging
 import aiohttp
-import sys
-from .base import BaseImageProvider, debug_print
+from .base import BaseImageProvider, ImageTooLargeError, get_http_session, read_limited
+
+logger = logging.getLogger(__name__)
+
+_STYLES: Mapping[str, str] = MappingProxyType({
+    "general": "通用风格",
+    "anime": "动漫风格 anime style",
+    "realistic": "写实风格 realistic photographic",
+    "oil_painting": "油画风格 oil painting",
+    "watercolor": "水彩风格 watercolor painting",
+    "sketch": "素描风格 pencil sketch",
+    "cartoon": "卡通风格 cartoon illustration",
+    "chinese_painting": "国画风格 traditional Chinese painting",
+    "pixel_art": "像素艺术 pixel art",
+    "cyberpunk": "赛博朋克 cyberpunk style",
+    "fantasy": "奇幻风格 fantasy art",
+    "sci_fi": "科幻风格 sci-fi concept art",
+})
+
 
 class DoubaoProvider(BaseImageProvider):
     """ByteDance Doubao (豆包) image generation provider using Ark API"""
@@ -32,6 +51,15 @@ class DoubaoProvider(BaseImageProvider):
         "512x512": "512x512 (1:1 小正方形)",
     }
 
+    # Fixed request fields; per-call values are filled into a shallow copy.
+    _REQUEST_TEMPLATE: Dict[str, object] = {
+        "model": None,
+        "prompt": None,
+        "n": 1,
+        "size": None,
+        "response_format": "b64_json",
+    }
+
     def __init__(
         self,
         api_key: str,
@@ -49,6 +77,8 @@ class DoubaoProvider(BaseImageProvider):
         self.fallback_model = (fallback_model or "").strip() or None
         if self.fallback_model == self.model:
             self.fallback_model = None
+        # Models are fixed for the instance's lifetime, so filter resolutions once.
+        self._resolutions = self._resolutions_for_models(self.model, self.fallback_model)
 
     def get_provider_name(self) -> str:
         return "doubao"
@@ -72,49 +102,48 @@ class DoubaoProvider(BaseImageProvider):
             return 1280 * 720
         return 0
 
-    def _minimum_pixels_required(self) -> int:
-        required = self._minimum_pixels_for_model(self.model)
-        if self.fallback_model:
-            required = max(required, self._minimum_pixels_for_model(self.fallback_model))
-        return required
-
-    def get_available_styles(self) -> Dict[str, str]:
+    def get_available_styles(self) -> Mapping[str, str]:
         """
         Doubao Seedream models use prompt engineering for styles.
         These style keywords will be appended to the prompt.
         """
-        return {
-            "general": "通用风格",
-            "anime": "动漫风格 anime style",
-            "realistic": "写实风格 realistic photographic",
-            "oil_painting": "油画风格 oil painting",
-            "watercolor": "水彩风格 watercolor painting",
-            "sketch": "素描风格 pencil sketch",
-            "cartoon": "卡通风格 cartoon illustration",
-            "chinese_painting": "国画风格 traditional Chinese painting",
-            "pixel_art": "像素艺术 pixel art",
-            "cyberpunk": "赛博朋克 cyberpunk style",
-            "fantasy": "奇幻风格 fantasy art",
-            "sci_fi": "科幻风格 sci-fi concept art"
-        }
+        return _STYLES
 
-    def get_available_resolutions(self) -> Dict[str, str]:
+    def get_available_resolutions(self) -> Mapping[str, str]:
         """
         Doubao Seedream models supported resolutions.
         Format: WIDTHxHEIGHT
         """
-        minimum_pixels = self._minimum_pixels_required()
+        return self._resolutions
+
+    @classmethod
+    def catalog_styles(cls, **config) -> Mapping[str, str]:
+        return _STYLES
+
+    @classmethod
+    def catalog_resolutions(cls, model: str = "", fallback_model: Optional[str] = None, **config) -> Mapping[str, str]:
+        model = (model or "").strip()
+        fallback_model = (fallback_model or "").strip() or None
+        return cls._resolutions_for_models(model, None if fallback_model == model else fallback_model)
+
+    @classmethod
+    @lru_cache(maxsize=32)
+    def _resolutions_for_models(cls, model: str, fallback_model: Optional[str]) -> Mapping[str, str]:
+        """Filter the base resolutions by the models' minimum pixel count (shared per model pair)."""
+        minimum_pixels = cls._minimum_pixels_for_model(model)
+        if fallback_model:
+            minimum_pixels = max(minimum_pixels, cls._minimum_pixels_for_model(fallback_model))
         if minimum_pixels <= 0:
-            return dict(self._BASE_RESOLUTIONS)
+            return MappingProxyType(dict(cls._BASE_RESOLUTIONS))
 
         filtered = {
             resolution: desc
-            for resolution, desc in self._BASE_RESOLUTIONS.items()
-            if self._pixels_for_resolution(resolution) >= minimum_pixels
+            for resolution, desc in cls._BASE_RESOLUTIONS.items()
+            if cls._pixels_for_resolution(resolution) >= minimum_pixels
         }
 
         # Defensive fallback: keep at least one valid high-resolution option.
-        return filtered or {"2048x2048": self._BASE_RESOLUTIONS["2048x2048"]}
+        return MappingProxyType(filtered or {"2048x2048": cls._BASE_RESOLUTIONS["2048x2048"]})
 
     @staticmethod
     def _is_model_unavailable_error(error_text: str) -> bool:
@@ -152,20 +181,19 @@ class DoubaoProvider(BaseImageProvider):
         negative_prompt: str,
         headers: Dict[str, str],
     ) -> tuple[Optional[Dict], int, str]:
-        request_data = {
-            "model": model,
-            "prompt": prompt,
-            "n": 1,
-            "size": size,
-            "response_format": "b64_json",
-        }
+        request_data = self._REQUEST_TEMPLATE.copy()
+        request_data["model"] = model
+        request_data["prompt"] = prompt
+        request_data["size"] = size
         if negative_prompt:
             request_data["negative_prompt"] = negative_prompt
 
+        # Serialize once, compactly; headers already carry the JSON content type.
+        body = json.dumps(request_data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
         async with session.post(
             f"{self.endpoint}/api/v3/images/generations",
             headers=headers,
-            json=request_data,
+            data=body,
             timeout=aiohttp.ClientTimeout(total=60),
         ) as response:
             status_code = response.status
@@ -173,7 +201,9 @@ class DoubaoProvider(BaseImageProvider):
             if status_code != 200:
                 return None, status_code, await response.text()
 
-            response_data = await response.json()
+            # Parse the raw bytes directly: skips aiohttp's text decode/charset
+            # detection, which is a full extra copy for multi-MB b64_json bodies.
+            response_data = json.loads(await response.read())
             if "error" in response_data:
                 error_payload = response_data["error"]
                 if isinstance(error_payload, dict):
@@ -194,22 +224,22 @@ class DoubaoProvider(BaseImageProvider):
     ) -> List[Dict]:
         """Generate images using Doubao Ark API"""
         try:
-            debug_print(
-                f"[DEBUG] Doubao generate_images call started: query={query}, style={style}, "
-                f"resolution={resolution}, model={self.model}, fallback_model={self.fallback_model}"
+            logger.debug(
+                "Doubao generate_images call started: query=%s, style=%s, resolution=%s, model=%s, fallback_model=%s",
+                query, style, resolution, self.model, self.fallback_model
             )
 
             # Parse resolution
             width, height = map(int, resolution.split('x'))
 
             # Build prompt with style
-            full_prompt = query
-            if style and style != "general":
-                style_desc = self.get_available_styles().get(style, "")
-                if style_desc:
-                    # Extract English style description
-                    english_part = style_desc.split()[-1] if " " in style_desc else style_desc
-                    full_prompt = f"{query}, {english_part}"
+            style_desc = _STYLES.get(style, "") if style and style != "general" else ""
+            if style_desc:
+                # Extract English style description
+                english_part = style_desc.rpartition(" ")[2]
+                full_prompt = f"{query}, {english_part}"
+            else:
+                full_prompt = query
 
             # Prepare headers
             headers = {
@@ -221,123 +251,118 @@ class DoubaoProvider(BaseImageProvider):
             if self.fallback_model:
                 models_to_try.append(self.fallback_model)
 
-            debug_print(f"[DEBUG] Calling Doubao Ark API with prompt: {full_prompt}")
-            async with aiohttp.ClientSession() as session:
-                for index, model_name in enumerate(models_to_try):
-                    response_data, status_code, error_text = await self._request_generation(
-                        session=session,
-                        model=model_name,
-                        prompt=full_prompt,
-                        size=f"{width}x{height}",
-                        negative_prompt=negative_prompt,
-                        headers=headers,
+            logger.debug("Calling Doubao Ark API with prompt: %s", full_prompt)
+            session = get_http_session()
+            for index, model_name in enumerate(models_to_try):
+                response_data, status_code, error_text = await self._request_generation(
+                    session=session,
+                    model=model_name,
+                    prompt=full_prompt,
+                    size=f"{width}x{height}",
+                    negative_prompt=negative_prompt,
+                    headers=headers,
+                )
+
+                if response_data is None:
+                    logger.error(
+                        "Doubao API request failed: model=%s, status=%s, error=%s",
+                        model_name, status_code, error_text
                     )
 
-                    if response_data is None:
-                        debug_print(
-                            f"[ERROR] Doubao API request failed: model={model_name}, "
-                            f"status={status_code}, error={error_text}"
+                    has_fallback = index == 0 and len(models_to_try) > 1
+                    if has_fallback and self._is_model_unavailable_error(error_text):
+                        logger.warning(
+                            "Doubao model '%s' unavailable, retrying with fallback '%s'",
+                            model_name, models_to_try[1]
                         )
-
-                        has_fallback = index == 0 and len(models_to_try) > 1
-                        if has_fallback and self._is_model_unavailable_error(error_text):
-                            debug_print(
-                                f"[WARNING] Doubao model '{model_name}' unavailable, "
-                                f"retrying with fallback '{models_to_try[1]}'"
-                            )
-                            continue
-
-                        return [{
-                            "error": f"Doubao API request failed: HTTP {status_code}, {error_text}",
-                            "content_type": "text/plain"
-                        }]
-
-                    # Extract image data (Ark API returns OpenAI-compatible format)
-                    if "data" not in response_data or not response_data["data"]:
-                        debug_print("[ERROR] No data in Doubao response")
-                        return [{
-                            "error": "No image data returned from Doubao API",
-                            "content_type": "text/plain"
-                        }]
-
-                    debug_print(f"[DEBUG] Doubao API response received with model={model_name}")
-
-                    # Get first image (we requested n=1)
-                    image_item = response_data["data"][0]
-
-                    # Handle response format
-                    if "b64_json" in image_item:
-                        # Base64 encoded image
-                        encoded_image = image_item["b64_json"]
-                        debug_print(f"[DEBUG] Received base64 image, length: {len(encoded_image)}")
-                    elif "url" in image_item:
-                        # Image URL - need to download
-                        image_url = image_item["url"]
-                        debug_print(f"[DEBUG] Downloading image from URL: {image_url}")
-                        image_data = await self._download_image(image_url)
-                        if not image_data:
-                            return [{
-                                "error": "Failed to download image from Doubao",
-                                "content_type": "text/plain"
-                            }]
-                        encoded_image = base64.b64encode(image_data).decode('utf-8')
-                    else:
-                        debug_print("[ERROR] No image data or URL in response")
-                        return [{
-                            "error": "Invalid response format from Doubao API",
-                            "content_type": "text/plain"
-                        }]
-
-                    # Return result
-                    result = [{
-                        "content": encoded_image,
-                        "content_type": "image/png",
-                        "description": query,
-                        "style": style,
-                        "provider": self.get_provider_name()
-                    }]
-
-                    debug_print(f"[DEBUG] Returning Doubao result successfully with model={model_name}")
-                    return result
-
-                return [{
-                    "error": "Doubao API request failed after trying all configured models",
-                    "content_type": "text/plain"
+                        continue
+
+                    return self._err(f"Doubao API request failed: HTTP {status_code}, {error_text}")
+
+                # Extract image data (Ark API returns OpenAI-compatible format)
+                if "data" not in response_data or not response_data["data"]:
+                    logger.error("No data in Doubao response")
+                    return self._err("No image data returned from Doubao API")
+
+                logger.debug("Doubao API response received with model=%s", model_name)
+
+                # Get first image (we requested n=1)
+                image_item = response_data["data"][0]
+
+                # Handle response format
+                if "b64_json" in image_item:
+                    # Base64 encoded image
+                    encoded_image = image_item["b64_json"]
+                    logger.debug("Received base64 image, length: %s", len(encoded_image))
+                    decoded_size = len(encoded_image) * 3 // 4
+                    if decoded_size > self.max_image_bytes:
+                        raise ImageTooLargeError(decoded_size, self.max_image_bytes)
+                    image_payload = {"content": encoded_image}
+                elif "url" in image_item:
+                    # Image URL - need to download
+                    image_url = image_item["url"]
+                    logger.debug("Downloading image from URL: %s", image_url)
+                    image_data = await self._download_image(image_url, session=session)
+                    if not image_data:
+                        return self._err("Failed to download image from Doubao")
+                    # Raw bytes; transports base64-encode only when building image blocks.
+                    image_payload = {"content_bytes": image_data}
+                else:
+                    logger.error("No image data or URL in response")
+                    return self._err("Invalid response format from Doubao API")
+
+                # Return result
+                result = [{
+                    **image_payload,
+                    "content_type": "image/png",
+                    "description": query,
+                    "style": style,
+                    "provider": self.get_provider_name()
                 }]
 
+                logger.debug("Returning Doubao result successfully with model=%s", model_name)
+                return result
+
+            return self._err("Doubao API request failed after trying all configured models")
+
+        except ImageTooLargeError as e:
+            logger.error(str(e))
+            return self._err(str(e))
         except asyncio.TimeoutError:
             error_msg = "Doubao API request timeout"
-            debug_print(f"[ERROR] {error_msg}")
-            return [{
-                "error": error_msg,
-                "content_type": "text/plain"
-            }]
+            logger.error(error_msg)
+            return self._err(error_msg)
         except Exception as e:
             error_msg = str(e)
-            debug_print(f"[ERROR] Unexpected error in Doubao provider: {error_msg}")
-            import traceback
-            traceback.print_exc(file=sys.stderr)
-            return [{
-                "error": f"Error occurred during Doubao image generation: {error_msg}",
-                "content_type": "text/plain"
-            }]
-
-    async def _download_image(self, url: str) -> Optional[bytes]:
-        """Download image from URL"""
-        debug_print(f"[DEBUG] Downloading image from URL: {url}")
+            logger.exception("Unexpected error in Doubao provider: %s", error_msg)
+            return self._err(f"Error occurred during Doubao image generation: {error_msg}")
+
+    async def _download_image(
+        self,
+        url: str,
+        session: Optional[aiohttp.ClientSession] = None,
+        max_bytes: Optional[int] = None,
+    ) -> Optional[bytes]:
+        """Download image from URL, reusing the caller's session or the shared pooled one"""
+        logger.debug("Downloading image from URL: %s", url)
+        limit = max_bytes or self.max_image_bytes
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        image_data = await response.read()
-                        debug_print(f"[DEBUG] Image downloaded successfully, size: {len(image_data)} bytes")
-                        return image_data
-                    else:
-                        debug_print(f"[ERROR] Failed to download image, status code: {response.status}")
-                        return None
+            return await self._read_image(session or get_http_session(), url, limit)
+        except ImageTooLargeError:
+            raise
         except Exception as e:
             error_msg = str(e)
-            debug_print(f"[ERROR] Error downloading image: {error_msg}")
-            import traceback
-            traceback.print_exc(file=sys.stderr)
+            logger.exception("Error downloading image: %s", error_msg)
             return None
+
+    @staticmethod
+    async def _read_image(session: aiohttp.ClientSession, url: str, limit: int) -> Optional[bytes]:
+        """Stream an image body, aborting mid-stream once limit is exceeded"""
+        async with session.get(url) as response:
+            if response.status != 200:
+                logger.error("Failed to download image, status code: %s", response.status)
+                return None
+
+            image_data = await read_limited(response, limit)
+            logger.debug("Image downloaded successfully, size: %s bytes", len(image_data))
+            return image_data
@@ -1,21 +1,144 @@
 from tencentcloud.common import credential
 from tencentcloud.common.exception.tencent_cloud_sdk_exception import TencentCloudSDKException
+from tencentcloud.common.profile.client_profile import ClientProfile
+from tencentcloud.common.profile.http_profile import HttpProfile
 from tencentcloud.aiart.v20221229 import aiart_client, models as aiart_models
 import json
-import base64
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 import asyncio
-import aiohttp
-import sys
-from .base import BaseImageProvider, debug_print
+import logging
+from .base import BaseImageProvider, ImageTooLargeError, get_http_session, read_limited
+
+logger = logging.getLogger(__name__)
+
+HUNYUAN_REGION = "ap-guangzhou"
+
+_STYLES: Mapping[str, str] = MappingProxyType({
+    "riman": "日漫动画风格, Japanese anime style",
+    "xieshi": "写实风格, photorealistic style",
+    "monai": "莫奈印象派画风, Monet impressionist painting style",
+    "shuimo": "水墨画风格, Chinese ink wash painting style",
+    "bianping": "扁平插画风格, flat illustration style",
+    "xiangsu": "像素插画风格, pixel art style",
+    "ertonghuiben": "儿童绘本风格, children's picture book style",
+    "3dxuanran": "3D渲染风格, 3D rendering style",
+    "manhua": "漫画风格, comic style",
+    "heibaimanhua": "黑白漫画风格, black and white comic style",
+    "dongman": "动漫风格, animation style",
+    "bijiasuo": "毕加索立体主义风格, Picasso cubism style",
+    "saibopengke": "赛博朋克风格, cyberpunk style",
+    "youhua": "油画风格, oil painting style",
+    "masaike": "马赛克风格, mosaic style",
+    "qinghuaci": "青花瓷风格, blue and white porcelain style",
+    "xinnianjianzhi": "新年剪纸画风格, New Year paper-cut art style",
+    "xinnianhuayi": "新年花艺风格, New Year floral art style",
+})
+
+_RESOLUTIONS: Mapping[str, str] = MappingProxyType({
+    "768:768": "768:768 (1:1 正方形)",
+    "768:1024": "768:1024 (3:4 竖向)",
+    "1024:768": "1024:768 (4:3 横向)",
+    "1024:1024": "1024:1024 (1:1 正方形大图)",
+    "720:1280": "720:1280 (9:16 竖向)",  # 720*1280=921600 <= 1024*1024=1048576
+    "1280:720": "1280:720 (16:9 横向)",
+    "512:1024": "512:1024 (1:2 竖向)",
+    "1024:512": "1024:512 (2:1 横向)",
+})
+
+# (secret_id, secret_key, region) -> AiartClient, shared by every provider instance
+# so the SDK's keep-alive connection pool survives provider re-creation (e.g. reload_config).
+_CLIENT_CACHE: Dict[Tuple[str, str, str], "aiart_client.AiartClient"] = {}
+
+
+def _get_shared_client(secret_id: str, secret_key: str, region: str = HUNYUAN_REGION) -> "aiart_client.AiartClient":
+    """Return a cached AiartClient for the given credentials, creating it on first use."""
+    key = (secret_id, secret_key, region)
+    client = _CLIENT_CACHE.get(key)
+    if client is None:
+        cred = credential.Credential(secret_id, secret_key)
+        profile = ClientProfile(httpProfile=HttpProfile(keepAlive=True))
+        client = aiart_client.AiartClient(cred, region, profile)
+        _CLIENT_CACHE[key] = client
+    return client
+
+
+class _JobPollScheduler:
+    """Multiplex QueryTextToImageJob polling for every in-flight Hunyuan job.
+
+    Waiters register a JobId and await a future; a single task per event loop
+    queries all pending jobs concurrently each tick and resolves the future
+    with the terminal response (status 4: failed, 5: completed).
+    """
+
+    TERMINAL_STATUS_CODES = frozenset({"4", "5"})
+
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+        self._pending: Dict[str, Tuple["aiart_client.AiartClient", asyncio.Future]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def wait_for_job(self, client: "aiart_client.AiartClient", job_id: str, timeout: float):
+        """Return the terminal status response for job_id, or None on timeout."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[job_id] = (client, future)
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            entry = self._pending.get(job_id)
+            if entry is not None and entry[1] is future:
+                del self._pending[job_id]
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            batch = [
+                (job_id, client, future)
+                for job_id, (client, future) in self._pending.items()
+                if not future.done() and future.get_loop() is loop
+            ]
+            if not batch:
+                break
+
+            responses = await asyncio.gather(
+                *(self._query(loop, client, job_id) for job_id, client, _ in batch),
+                return_exceptions=True,
+            )
+            for (job_id, _, future), resp in zip(batch, responses):
+                if future.done():
+                    continue
+                if isinstance(resp, TencentCloudSDKException):
+                    logger.error("Error querying task status: JobId=%s, %s", job_id, resp)
+                elif isinstance(resp, Exception):
+                    future.set_exception(resp)
+                elif resp.JobStatusCode in self.TERMINAL_STATUS_CODES:
+                    future.set_result(resp)
+                else:
+                    logger.debug("Task still in progress, JobId=%s, status code: %s", job_id, resp.JobStatusCode)
+
+            await asyncio.sleep(self.interval)
+
+    @staticmethod
+    async def _query(loop: asyncio.AbstractEventLoop, client: "aiart_client.AiartClient", job_id: str):
+        req = aiart_models.QueryTextToImageJobRequest()
+        req.JobId = job_id
+        return await loop.run_in_executor(None, client.QueryTextToImageJob, req)
+
+
+_POLL_SCHEDULER = _JobPollScheduler()
+
 
 class HunyuanProvider(BaseImageProvider):
     """Tencent HunyuanImage 3.0 image generation provider"""
 
     def __init__(self, secret_id: str, secret_key: str, **kwargs):
         super().__init__(**kwargs)
-        self.cred = credential.Credential(secret_id, secret_key)
-        self.client = aiart_client.AiartClient(self.cred, "ap-guangzhou")
+        self.client = _get_shared_client(secret_id, secret_key)
 
     def get_provider_name(self) -> str:
         return "hunyuan"
@@ -23,51 +146,37 @@ class HunyuanProvider(BaseImageProvider):
     @staticmethod
     def _extract_result_image_url(result_image: object) -> Optional[str]:
         """Extract a usable image URL from Tencent ResultImage payload."""
-        if isinstance(result_image, str):
-            return result_image if result_image else None
-
+        # The SDK returns list[str] almost exclusively; check that shape first.
         if isinstance(result_image, list):
-            for item in result_image:
-                if isinstance(item, str) and item:
-                    return item
+            if result_image:
+                first = result_image[0]
+                if isinstance(first, str) and first:
+                    return first
+                for item in result_image:
+                    if isinstance(item, str) and item:
+                        return item
+            return None
+
+        if isinstance(result_image, str):
+            return result_image or None
 
         return None
 
-    def get_available_styles(self) -> Dict[str, str]:
+    def get_available_styles(self) -> Mapping[str, str]:
         # HunyuanImage 3.0 has no Style parameter; styles are injected into the prompt
-        return {
-            "riman": "日漫动画风格, Japanese anime style",
-            "xieshi": "写实风格, photorealistic style",
-            "monai": "莫奈印象派画风, Monet impressionist painting style",
-            "shuimo": "水墨画风格, Chinese ink wash painting style",
-            "bianping": "扁平插画风格, flat illustration style",
-            "xiangsu": "像素插画风格, pixel art style",
-            "ertonghuiben": "儿童绘本风格, children's picture book style",
-            "3dxuanran": "3D渲染风格, 3D rendering style",
-            "manhua": "漫画风格, comic style",
-            "heibaimanhua": "黑白漫画风格, black and white comic style",
-            "dongman": "动漫风格, animation style",
-            "bijiasuo": "毕加索立体主义风格, Picasso cubism style",
-            "saibopengke": "赛博朋克风格, cyberpunk style",
-            "youhua": "油画风格, oil painting style",
-            "masaike": "马赛克风格, mosaic style",
-            "qinghuaci": "青花瓷风格, blue and white porcelain style",
-            "xinnianjianzhi": "新年剪纸画风格, New Year paper-cut art style",
-            "xinnianhuayi": "新年花艺风格, New Year floral art style"
-        }
-
-    def get_available_resolutions(self) -> Dict[str, str]:
+        return _STYLES
+
+    def get_available_resolutions(self) -> Mapping[str, str]:
         # HunyuanImage 3.0: width and height each in [512, 2048], width*height <= 1024*1024
-        return {
-            "768:768": "768:768 (1:1 正方形)",
-            "768:1024": "768:1024 (3:4 竖向)",
-            "1024:768": "1024:768 (4:3 横向)",
-            "1024:1024": "1024:1024 (1:1 正方形大图)",
-            "720:1280": "720:1280 (9:16 竖向)",  # 720*1280=921600 <= 1024*1024=1048576
-            "1280:720": "1280:720 (16:9 横向)",
-            "512:1024": "512:1024 (1:2 竖向)",
-            "1024:512": "1024:512 (2:1 横向)"
-        }
+        return _RESOLUTIONS
+
+    @classmethod
+    def catalog_styles(cls, **config) -> Mapping[str, str]:
+        return _STYLES
+
+    @classmethod
+    def catalog_resolutions(cls, **config) -> Mapping[str, str]:
+        return _RESOLUTIONS
 
     async def generate_images(
         self,
@@ -79,17 +188,21 @@ class HunyuanProvider(BaseImageProvider):
     ) -> List[Dict]:
         """Generate images using HunyuanImage 3.0 text-to-image model"""
         try:
-            debug_print(f"[DEBUG] Hunyuan generate_images call started: query={query}, style={style}, resolution={resolution}")
+            logger.debug(
+                "Hunyuan generate_images call started: query=%s, style=%s, resolution=%s",
+                query, style, resolution
+            )
 
             # Build prompt: inject style description and negative prompt
-            styled_prompt = query
-            if style:
-                style_desc = self.get_available_styles().get(style, "")
-                if style_desc:
-                    styled_prompt = f"{query}, {style_desc}"
-
-            if negative_prompt:
-                styled_prompt = f"{styled_prompt}. Avoid: {negative_prompt}"
+            style_desc = _STYLES.get(style, "") if style else ""
+            if style_desc and negative_prompt:
+                styled_prompt = f"{query}, {style_desc}. Avoid: {negative_prompt}"
+            elif style_desc:
+                styled_prompt = f"{query}, {style_desc}"
+            elif negative_prompt:
+                styled_prompt = f"{query}. Avoid: {negative_prompt}"
+            else:
+                styled_prompt = query
 
             # Create request object
             req = aiart_models.SubmitTextToImageJobRequest()
@@ -98,7 +211,10 @@ class HunyuanProvider(BaseImageProvider):
             req.Revise = 1  # Enable prompt expansion
             req.LogoAdd = 0  # No watermark
 
-            debug_print(f"[DEBUG] Calling Tencent API SubmitTextToImageJob: Prompt={styled_prompt}, Resolution={resolution}")
+            logger.debug(
+                "Calling Tencent API SubmitTextToImageJob: Prompt=%s, Resolution=%s",
+                styled_prompt, resolution
+            )
 
             loop = asyncio.get_event_loop()
 
@@ -109,161 +225,121 @@ class HunyuanProvider(BaseImageProvider):
                 try:
                     resp = await loop.run_in_executor(None, self.client.SubmitTextToImageJob, req)
                     job_id = resp.JobId
-                    debug_print(f"[DEBUG] Successfully submitted task, JobId={job_id}")
+                    logger.debug("Successfully submitted task, JobId=%s", job_id)
                     break
                 except TencentCloudSDKException as e:
                     error_msg = str(e)
-                    debug_print(f"[ERROR] Task submission failed (attempt {attempt+1}/{max_retries}): {error_msg}")
+                    logger.error("Task submission failed (attempt %s/%s): %s", attempt+1, max_retries, error_msg)
                     if attempt < max_retries - 1:
                         await asyncio.sleep(2)
                     else:
                         raise
 
             if not job_id:
-                debug_print("[ERROR] Unable to get task ID")
-                return [{
-                    "error": "Failed to create image generation task",
-                    "content_type": "text/plain"
-                }]
+                logger.error("Unable to get task ID")
+                return self._err("Failed to create image generation task")
 
             # Wait for task completion and get results
             image_result = await self._wait_for_job_completion(job_id)
 
             if image_result is None:
-                debug_print("[ERROR] Image generation failed, returning empty result")
-                return [{
-                    "error": "Image generation failed, unable to get image result",
-                    "content_type": "text/plain"
-                }]
+                logger.error("Image generation failed, returning empty result")
+                return self._err("Image generation failed, unable to get image result")
 
-            debug_print(f"[DEBUG] Image generation successful: image_url={image_result.get('url', 'No URL')}")
+            logger.debug("Image generation successful: image_url=%s", image_result.get('url', 'No URL'))
 
             if not image_result.get("image_data"):
-                debug_print("[ERROR] Image data is empty")
-                return [{
-                    "error": "Image data is empty",
-                    "content_type": "text/plain"
-                }]
-
-            try:
-                encoded_image = base64.b64encode(image_result["image_data"]).decode('utf-8')
-                debug_print(f"[DEBUG] Image successfully encoded to base64, length: {len(encoded_image)}")
-            except Exception as e:
-                error_msg = str(e)
-                debug_print(f"[ERROR] Image encoding failed: {error_msg}")
-                return [{
-                    "error": f"Image encoding failed: {error_msg}",
-                    "content_type": "text/plain"
-                }]
+                logger.error("Image data is empty")
+                return self._err("Image data is empty")
 
+            # Raw bytes; transports base64-encode only when building image blocks.
             result = [{
-                "content": encoded_image,
+                "content_bytes": image_result["image_data"],
                 "content_type": "image/jpeg",
                 "description": query,
                 "style": style,
                 "provider": self.get_provider_name()
             }]
-            debug_print(f"[DEBUG] Returning result: {result[0].keys()}")
+            logger.debug("Returning result: %s", result[0].keys())
 
             return result
 
+        except ImageTooLargeError as err:
+            logger.error(str(err))
+            return self._err(str(err))
         except TencentCloudSDKException as err:
             error_msg = str(err)
-            debug_print(f"[ERROR] Failed to generate image: {error_msg}, Error type: {type(err)}")
-            return [{
-                "error": f"Hunyuan API call failed: {error_msg}",
-                "content_type": "text/plain"
-            }]
+            logger.error("Failed to generate image: %s, Error type: %s", error_msg, type(err))
+            return self._err(f"Hunyuan API call failed: {error_msg}")
         except Exception as e:
             error_msg = str(e)
-            debug_print(f"[ERROR] Unexpected error: {error_msg}, Error type: {type(e)}")
-            import traceback
-            traceback.print_exc(file=sys.stderr)
-            return [{
-                "error": f"Error occurred during Hunyuan image generation: {error_msg}",
-                "content_type": "text/plain"
-            }]
+            logger.exception("Unexpected error: %s, Error type: %s", error_msg, type(e))
+            return self._err(f"Error occurred during Hunyuan image generation: {error_msg}")
 
     async def _wait_for_job_completion(self, job_id: str, max_retries: int = 60) -> Optional[Dict]:
         """Wait for task completion and get results"""
         try:
-            debug_print(f"[DEBUG] Start waiting for task completion, JobId={job_id}, max_retries={max_retries}")
-            loop = asyncio.get_event_loop()
-
-            for attempt in range(max_retries):
-                req = aiart_models.QueryTextToImageJobRequest()
-                req.JobId = job_id
-
-                debug_print(f"[DEBUG] Query task status, attempt #{attempt+1}, JobId={job_id}")
-                try:
-                    resp = await loop.run_in_executor(None, self.client.QueryTextToImageJob, req)
-                    debug_print(f"[DEBUG] Task status response: {resp.to_json_string()}")
-
-                    status_code = resp.JobStatusCode
-                    debug_print(f"[DEBUG] Task status code: {status_code}")
-
-                    if status_code == "5":   # 1: Waiting, 2: Running, 4: Failed, 5: Completed
-                        image_url = self._extract_result_image_url(resp.ResultImage)
-                        if image_url:
-                            debug_print(f"[DEBUG] Image generation completed, ResultImage: {image_url}")
-                            debug_print(f"[DEBUG] Start downloading image: {image_url}")
-
-                            for download_attempt in range(3):
-                                image_data = await self._download_image(image_url)
-                                if image_data:
-                                    debug_print(f"[DEBUG] Image download successful, size: {len(image_data)} bytes")
-                                    return {
-                                        "image_data": image_data,
-                                        "url": image_url
-                                    }
-                                else:
-                                    debug_print(f"[WARNING] Image download failed, attempt #{download_attempt+1}/3")
-                                    await asyncio.sleep(1)
-
-                            debug_print("[ERROR] Image download failed, maximum retry count reached")
-                            return None
-                        else:
-                            debug_print(
-                                f"[ERROR] Task completed but no usable image result, "
-                                f"ResultImage={resp.ResultImage!r}"
-                            )
-                            return None
-                    elif status_code == "4":  # Processing failed
-                        debug_print("[ERROR] Task processing failed")
-                        return None
-                    else:
-                        debug_print(f"[DEBUG] Task still in progress, status code: {status_code}, waiting...")
-                        await asyncio.sleep(2)
-                except TencentCloudSDKException as e:
-                    error_msg = str(e)
-                    debug_print(f"[ERROR] Error querying task status: {error_msg}")
-                    await asyncio.sleep(2)
-
-            debug_print(f"[ERROR] Task not completed after {max_retries} retries")
+            logger.debug("Start waiting for task completion, JobId=%s, max_retries=%s", job_id, max_retries)
+            resp = await _POLL_SCHEDULER.wait_for_job(
+                self.client,
+                job_id,
+                timeout=max_retries * _POLL_SCHEDULER.interval,
+            )
+
+            if resp is None:
+                logger.error("Task not completed after %s retries", max_retries)
+                return None
+
+            if resp.JobStatusCode == "4":  # Processing failed
+                logger.error("Task processing failed")
+                return None
+
+            image_url = self._extract_result_image_url(resp.ResultImage)
+            if not image_url:
+                logger.error("Task completed but no usable image result, ResultImage=%r", resp.ResultImage)
+                return None
+
+            logger.debug("Image generation completed, ResultImage: %s", image_url)
+            logger.debug("Start downloading image: %s", image_url)
+
+            for download_attempt in range(3):
+                image_data = await self._download_image(image_url)
+                if image_data:
+                    logger.debug("Image download successful, size: %s bytes", len(image_data))
+                    return {
+                        "image_data": image_data,
+                        "url": image_url
+                    }
+                else:
+                    logger.warning("Image download failed, attempt #%s/3", download_attempt+1)
+                    await asyncio.sleep(1)
+
+            logger.error("Image download failed, maximum retry count reached")
             return None
+        except ImageTooLargeError:
+            raise
         except Exception as e:
             error_msg = str(e)
-            debug_print(f"[ERROR] Error waiting for task completion: {error_msg}")
-            import traceback
-            traceback.print_exc(file=sys.stderr)
+            logger.exception("Error waiting for task completion: %s", error_msg)
             return None
 
-    async def _download_image(self, url: str) -> Optional[bytes]:
-        """Download image from URL"""
-        debug_print(f"[DEBUG] Downloading image from URL: {url}")
+    async def _download_image(self, url: str, max_bytes: Optional[int] = None) -> Optional[bytes]:
+        """Download image from URL, aborting mid-stream once max_bytes is exceeded"""
+        logger.debug("Downloading image from URL: %s", url)
+        limit = max_bytes or self.max_image_bytes
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        image_data = await response.read()
-                        debug_print(f"[DEBUG] Image downloaded successfully, size: {len(image_data)} bytes")
-                        return image_data
-                    else:
-                        debug_print(f"[ERROR] Failed to download image, status code: {response.status}")
-                        return None
+            session = get_http_session()
+            async with session.get(url) as response:
+                if response.status != 200:
+                    logger.error("Failed to download image, status code: %s", response.status)
+                    return None
+
+                image_data = await read_limited(response, limit)
+                logger.debug("Image downloaded successfully, size: %s bytes", len(image_data))
+                return image_data
+        except ImageTooLargeError:
+            raise
         except Exception as e:
             error_msg = str(e)
-            debug_print(f"[ERROR] Error downloading image: {error_msg}")
-            import traceback
-            traceback.print_exc(file=sys.stderr)
+            logger.exception("Error downloading image: %s", error_msg)
             return None
@@ -1,61 +1,333 @@
+import httpx
 import openai
-from typing import Dict, List, Optional
-import sys
-from .base import BaseImageProvider, debug_print
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import logging
+import random
+from functools import lru_cache, partial
+from .base import BaseImageProvider
+
+logger = logging.getLogger(__name__)
+
+# (api_key, base_url) -> AsyncOpenAI, shared by every provider instance so the
+# underlying httpx connection pool (and its keep-alive TLS sessions) survives
+# provider re-creation on reload_config.
+_CLIENT_CACHE: Dict[Tuple[str, Optional[str]], openai.AsyncOpenAI] = {}
+
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=60)
+_HTTP_TIMEOUT = httpx.Timeout(connect=5.0, read=120.0, write=30.0, pool=5.0)
+
+_STYLES: Mapping[str, str] = MappingProxyType({
+    "natural": "自然风格",
+    "vivid": "生动风格",
+    "realistic": "写实风格",
+    "artistic": "艺术风格",
+    "cartoon": "卡通风格",
+    "anime": "动漫风格",
+    "oil_painting": "油画风格",
+    "watercolor": "水彩风格",
+    "sketch": "素描风格",
+    "digital_art": "数字艺术",
+    "photographic": "摄影风格",
+    "minimalist": "极简风格",
+})
+
+_RESOLUTIONS: Mapping[str, str] = MappingProxyType({
+    "1024x1024": "1024x1024 (1:1 正方形)",
+    "1536x1024": "1536x1024 (3:2 横向)",
+    "1024x1536": "1024x1536 (2:3 竖向)",
+    "auto": "auto (由模型自动选择最佳尺寸)",
+})
+
+
+def _get_client(api_key: str, base_url: Optional[str]) -> openai.AsyncOpenAI:
+    """Return the shared AsyncOpenAI client for these credentials, creating it on first use."""
+    key = (api_key, base_url)
+    client = _CLIENT_CACHE.get(key)
+    if client is None:
+        # Retries are handled by OpenAIProvider._call_images_generate, so disable the SDK's own loop.
+        client = openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,
+            http_client=openai.DefaultAsyncHttpxClient(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+        )
+        _CLIENT_CACHE[key] = client
+    return client
+
+
+async def close_openai_clients() -> None:
+    """Close and forget every shared AsyncOpenAI client (called once on shutdown)"""
+    clients = list(_CLIENT_CACHE.values())
+    _CLIENT_CACHE.clear()
+    for client in clients:
+        await client.close()
+
 
 class OpenAIProvider(BaseImageProvider):
     """OpenAI image generation provider (GPT Image series)"""
-    _ALLOWED_BACKGROUNDS = {"transparent", "opaque", "auto"}
-    _ALLOWED_OUTPUT_FORMATS = {"png", "jpeg", "webp"}
-    _ALLOWED_MODERATION = {"low", "auto"}
+    _ALLOWED_BACKGROUNDS = frozenset({"transparent", "opaque", "auto"})
+    _ALLOWED_OUTPUT_FORMATS = frozenset({"png", "jpeg", "webp"})
+    _ALLOWED_MODERATION = frozenset({"low", "auto"})
+    _COMPRESSIBLE_OUTPUT_FORMATS = frozenset({"jpeg", "webp"})
+    # Sorted once for error messages.
+    _ALLOWED_BACKGROUNDS_SORTED = tuple(sorted(_ALLOWED_BACKGROUNDS))
+    _ALLOWED_OUTPUT_FORMATS_SORTED = tuple(sorted(_ALLOWED_OUTPUT_FORMATS))
+    _ALLOWED_MODERATION_SORTED = tuple(sorted(_ALLOWED_MODERATION))
     _OUTPUT_MIME_BY_FORMAT = {
         "png": "image/png",
         "jpeg": "image/jpeg",
         "webp": "image/webp",
     }
 
-    def __init__(self, api_key: str, model: str, base_url: Optional[str] = None, **kwargs):
+    # Status codes worth retrying: request timeout, conflict, rate limit and server errors.
+    _RETRYABLE_STATUS_CODES = frozenset({408, 409, 429})
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        base_url: Optional[str] = None,
+        max_retries: int = 5,
+        backoff_max: float = 60.0,
+        cache_size: int = 0,
+        **kwargs
+    ):
         super().__init__(**kwargs)
-        self.client = openai.AsyncOpenAI(
-            api_key=api_key,
-            base_url=base_url
-        )
-        self.model = model.strip()
-        if not self.model:
+        self.model = self.validate_model(model)
+        self.client = _get_client(api_key, base_url)
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_max = float(backoff_max)
+        # Exact-match response cache (disabled when cache_size <= 0) plus in-flight coalescing.
+        self.cache_size = int(cache_size)
+        self._cache: "OrderedDict[Tuple, List[Dict]]" = OrderedDict()
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+
+    def get_provider_name(self) -> str:
+        return "openai"
+
+    @staticmethod
+    def validate_model(model: str) -> str:
+        """Return the stripped model name, raising ValueError for non GPT Image models."""
+        model = model.strip()
+        if not model:
             raise ValueError("OpenAI model must be provided via OPENAI_MODEL")
-        if not self.model.startswith("gpt-image"):
+        if not model.startswith("gpt-image"):
             raise ValueError(
                 "Unsupported OpenAI image model. "
                 "Only GPT Image models are supported (for example: gpt-image-1.5). "
-                f"Got: {self.model}"
+                f"Got: {model}"
             )
+        return model
 
-    def get_provider_name(self) -> str:
-        return "openai"
+    @staticmethod
+    def _build_prompt(query: str, style: str, negative_prompt: str) -> str:
+        """Decorate the query with its style description and negative prompt."""
+        styled = bool(style) and style != "natural"
+        if not styled and not negative_prompt:
+            return query
+        if not negative_prompt:
+            return f"{query}, {_STYLES.get(style, style)}"
+        if not styled:
+            return f"{query}. Avoid: {negative_prompt}"
+        return f"{query}, {_STYLES.get(style, style)}. Avoid: {negative_prompt}"
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _normalize_request_options(
+        background: Optional[str],
+        output_format: Optional[str],
+        output_compression,
+        moderation: Optional[str],
+    ) -> Tuple[Optional[str], Optional[Tuple]]:
+        """
+        Normalize and validate the optional gpt-image request fields.
+
+        Tool callers usually repeat the same values, so results are memoized.
+        Returns (error_message, None) on invalid input, otherwise
+        (None, (background, output_format, output_compression, moderation)).
+        """
+        cls = OpenAIProvider
+        if isinstance(background, str):
+            background = background.strip().lower() or None
+        if isinstance(output_format, str):
+            output_format = output_format.strip().lower() or None
+        if isinstance(moderation, str):
+            moderation = moderation.strip().lower() or None
+
+        if background and background not in cls._ALLOWED_BACKGROUNDS:
+            return (
+                f"Invalid OpenAI background '{background}'. "
+                f"Allowed values: {list(cls._ALLOWED_BACKGROUNDS_SORTED)}"
+            ), None
+
+        if output_format and output_format not in cls._ALLOWED_OUTPUT_FORMATS:
+            return (
+                f"Invalid OpenAI output_format '{output_format}'. "
+                f"Allowed values: {list(cls._ALLOWED_OUTPUT_FORMATS_SORTED)}"
+            ), None
+
+        if moderation and moderation not in cls._ALLOWED_MODERATION:
+            return (
+                f"Invalid OpenAI moderation '{moderation}'. "
+                f"Allowed values: {list(cls._ALLOWED_MODERATION_SORTED)}"
+            ), None
+
+        if output_compression == "":
+            output_compression = None
+        if output_compression is not None:
+            try:
+                output_compression = int(output_compression)
+            except (TypeError, ValueError):
+                return "Invalid OpenAI output_compression. Expected integer between 0 and 100.", None
+            if output_compression < 0 or output_compression > 100:
+                return "Invalid OpenAI output_compression. Expected integer between 0 and 100.", None
+            if output_format not in cls._COMPRESSIBLE_OUTPUT_FORMATS:
+                return "OpenAI output_compression requires output_format to be 'jpeg' or 'webp'.", None
+
+        return None, (background, output_format, output_compression, moderation)
+
+    @classmethod
+    def _is_retryable_error(cls, error: Exception) -> bool:
+        if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+            return True
+        status_code = getattr(error, "status_code", None)
+        if status_code is None:
+            return False
+        return status_code in cls._RETRYABLE_STATUS_CODES or status_code >= 500
+
+    async def _call_images_generate(self, request_kwargs: Dict):
+        """Call images.generate, retrying transient failures with jittered exponential backoff."""
+        attempt = 0
+        while True:
+            try:
+                return await self.client.images.generate(**request_kwargs)
+            except openai.APIError as e:
+                if attempt >= self.max_retries or not self._is_retryable_error(e):
+                    raise
+                # Full jitter, floored at 1s: uniform(0, min(backoff_max, 2**attempt)).
+                delay = max(1.0, random.uniform(0, min(self.backoff_max, 2 ** attempt)))
+                attempt += 1
+                logger.warning(
+                    "OpenAI request failed (%s), retry %d/%d in %.1fs",
+                    type(e).__name__, attempt, self.max_retries, delay,
+                )
+                await asyncio.sleep(delay)
+
+    def get_available_styles(self) -> Mapping[str, str]:
+        return _STYLES
+
+    def get_available_resolutions(self) -> Mapping[str, str]:
+        return _RESOLUTIONS
+
+    @classmethod
+    def catalog_styles(cls, **config) -> Mapping[str, str]:
+        return _STYLES
 
-    def get_available_styles(self) -> Dict[str, str]:
-        return {
-            "natural": "自然风格",
-            "vivid": "生动风格",
-            "realistic": "写实风格",
-            "artistic": "艺术风格",
-            "cartoon": "卡通风格",
-            "anime": "动漫风格",
-            "oil_painting": "油画风格",
-            "watercolor": "水彩风格",
-            "sketch": "素描风格",
-            "digital_art": "数字艺术",
-            "photographic": "摄影风格",
-            "minimalist": "极简风格"
-        }
-
-    def get_available_resolutions(self) -> Dict[str, str]:
-        return {
-            "1024x1024": "1024x1024 (1:1 正方形)",
-            "1536x1024": "1536x1024 (3:2 横向)",
-            "1024x1536": "1024x1536 (2:3 竖向)",
-            "auto": "auto (由模型自动选择最佳尺寸)",
-        }
+    @classmethod
+    def catalog_resolutions(cls, **config) -> Mapping[str, str]:
+        return _RESOLUTIONS
+
+    async def _request_images(
+        self,
+        request_kwargs: Dict,
+        output_format: Optional[str],
+        query: str,
+        style: str,
+    ) -> List[Dict]:
+        """Call the API and convert the first returned image into a provider result."""
+        response = await self._call_images_generate(request_kwargs)
+
+        logger.debug("OpenAI API call successful")
+
+        if not response.data:
+            logger.error("No image data returned from OpenAI")
+            return self._err("No image data returned from OpenAI API")
+
+        image_data = response.data[0]
+
+        if not image_data.b64_json:
+            logger.error("No base64 image data in OpenAI response")
+            return self._err("No base64 image data in OpenAI response")
+
+        b64_json = image_data.b64_json
+        logger.debug("Image successfully generated, base64 length: %d", len(b64_json))
+
+        # The SDK's Image model always defines revised_prompt (None when absent).
+        result = [{
+            "content": b64_json,
+            "content_type": self._OUTPUT_MIME_BY_FORMAT.get(output_format, "image/png"),
+            "description": query,
+            "style": style,
+            "provider": self.get_provider_name(),
+            "revised_prompt": image_data.revised_prompt
+        }]
+
+        logger.debug("Returning OpenAI result: %s", result[0].keys())
+        return result
+
+    async def _request_images_cached(
+        self,
+        cache_key: Tuple,
+        request_kwargs: Dict,
+        output_format: Optional[str],
+        query: str,
+        style: str,
+    ) -> List[Dict]:
+        """Serve exact-match repeats from the LRU cache, coalescing identical in-flight requests."""
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            self._cache.move_to_end(cache_key)
+            logger.debug("OpenAI response cache hit")
+            return self._restamp_result(cached, query, style)
+
+        pending = self._inflight.get(cache_key)
+        if pending is None:
+            # The request runs as its own task so no single caller owns it.
+            pending = asyncio.ensure_future(
+                self._request_and_cache(cache_key, request_kwargs, output_format, query, style)
+            )
+            self._inflight[cache_key] = pending
+            pending.add_done_callback(partial(self._finish_inflight, cache_key))
+        else:
+            logger.debug("Joining in-flight OpenAI request with identical parameters")
+
+        # Shielded: a cancelled caller (e.g. its client disconnected) stops waiting,
+        # but the shared request keeps running for the other callers.
+        result = await asyncio.shield(pending)
+        # Hand out a copy so callers can't mutate the cached entry.
+        return self._restamp_result(result, query, style)
+
+    async def _request_and_cache(
+        self,
+        cache_key: Tuple,
+        request_kwargs: Dict,
+        output_format: Optional[str],
+        query: str,
+        style: str,
+    ) -> List[Dict]:
+        """Run one upstream request and cache its result unless it is an error."""
+        result = await self._request_images(request_kwargs, output_format, query, style)
+        if "error" not in result[0]:
+            self._cache[cache_key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def _finish_inflight(self, cache_key: Tuple, task: asyncio.Task) -> None:
+        """Forget a finished in-flight request."""
+        if self._inflight.get(cache_key) is task:
+            del self._inflight[cache_key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller has gone away
+
+    @staticmethod
+    def _restamp_result(result: List[Dict], query: str, style: str) -> List[Dict]:
+        if "error" in result[0]:
+            return result
+        return [{**result[0], "description": query, "style": style}]
 
     async def generate_images(
         self,
@@ -67,151 +339,70 @@ class OpenAIProvider(BaseImageProvider):
     ) -> List[Dict]:
         """Generate images using OpenAI image generation API"""
         try:
-            debug_print(f"[DEBUG] OpenAI generate_images call started: model={self.model}, query={query}, style={style}, resolution={resolution}")
-
-            # Prepare the prompt with style
-            styled_prompt = query
-            if style and style != "natural":
-                style_desc = self.get_available_styles().get(style, style)
-                styled_prompt = f"{query}, {style_desc}"
-
-            if negative_prompt:
-                styled_prompt = f"{styled_prompt}. Avoid: {negative_prompt}"
-
-            background = kwargs.get("background")
-            output_format = kwargs.get("output_format")
-            output_compression = kwargs.get("output_compression")
-            moderation = kwargs.get("moderation")
-
-            if isinstance(background, str):
-                background = background.strip().lower()
-            if isinstance(output_format, str):
-                output_format = output_format.strip().lower()
-            if isinstance(moderation, str):
-                moderation = moderation.strip().lower()
-
-            if background and background not in self._ALLOWED_BACKGROUNDS:
-                return [{
-                    "error": (
-                        f"Invalid OpenAI background '{background}'. "
-                        f"Allowed values: {sorted(self._ALLOWED_BACKGROUNDS)}"
-                    ),
-                    "content_type": "text/plain",
-                }]
-
-            if output_format and output_format not in self._ALLOWED_OUTPUT_FORMATS:
-                return [{
-                    "error": (
-                        f"Invalid OpenAI output_format '{output_format}'. "
-                        f"Allowed values: {sorted(self._ALLOWED_OUTPUT_FORMATS)}"
-                    ),
-                    "content_type": "text/plain",
-                }]
-
-            if moderation and moderation not in self._ALLOWED_MODERATION:
-                return [{
-                    "error": (
-                        f"Invalid OpenAI moderation '{moderation}'. "
-                        f"Allowed values: {sorted(self._ALLOWED_MODERATION)}"
-                    ),
-                    "content_type": "text/plain",
-                }]
-
-            if output_compression is not None and output_compression != "":
-                try:
-                    output_compression = int(output_compression)
-                except (TypeError, ValueError):
-                    return [{
-                        "error": "Invalid OpenAI output_compression. Expected integer between 0 and 100.",
-                        "content_type": "text/plain",
-                    }]
-                if output_compression < 0 or output_compression > 100:
-                    return [{
-                        "error": "Invalid OpenAI output_compression. Expected integer between 0 and 100.",
-                        "content_type": "text/plain",
-                    }]
-                if output_format not in {"jpeg", "webp"}:
-                    return [{
-                        "error": "OpenAI output_compression requires output_format to be 'jpeg' or 'webp'.",
-                        "content_type": "text/plain",
-                    }]
-
-            debug_print(f"[DEBUG] Calling OpenAI API with model={self.model}, prompt: {styled_prompt}")
+            logger.debug(
+                "OpenAI generate_images call started: model=%s, query=%s, style=%s, resolution=%s",
+                self.model, query, style, resolution,
+            )
+
+            styled_prompt = self._build_prompt(query, style, negative_prompt)
+
+            option_args = (
+                kwargs.get("background"),
+                kwargs.get("output_format"),
+                kwargs.get("output_compression"),
+                kwargs.get("moderation"),
+            )
+            try:
+                error, options = self._normalize_request_options(*option_args)
+            except TypeError:
+                # Unhashable tool argument (e.g. a list): validate without the memo.
+                error, options = self._normalize_request_options.__wrapped__(*option_args)
+            if error:
+                return self._err(error)
+            background, output_format, output_compression, moderation = options
+
+            logger.debug("Calling OpenAI API with model=%s, prompt: %s", self.model, styled_prompt)
 
             # GPT Image models: no legacy DALL-E style/response_format parameters.
+            # Normalized options use None for "not set"; 0 is a valid compression.
+            optional = {
+                "background": background,
+                "output_format": output_format,
+                "output_compression": output_compression,
+                "moderation": moderation,
+            }
             request_kwargs = {
                 "model": self.model,
                 "prompt": styled_prompt,
                 "size": resolution,
                 "quality": "auto",
                 "n": 1,
+                **{key: value for key, value in optional.items() if value is not None},
             }
-            if background:
-                request_kwargs["background"] = background
-            if output_format:
-                request_kwargs["output_format"] = output_format
-            if output_compression is not None and output_compression != "":
-                request_kwargs["output_compression"] = output_compression
-            if moderation:
-                request_kwargs["moderation"] = moderation
-
-            response = await self.client.images.generate(
-                **request_kwargs
-            )
 
-            debug_print(f"[DEBUG] OpenAI API call successful")
-
-            if not response.data:
-                debug_print("[ERROR] No image data returned from OpenAI")
-                return [{
-                    "error": "No image data returned from OpenAI API",
-                    "content_type": "text/plain"
-                }]
-
-            image_data = response.data[0]
-
-            if not image_data.b64_json:
-                debug_print("[ERROR] No base64 image data in response")
-                return [{
-                    "error": "No base64 image data in OpenAI response",
-                    "content_type": "text/plain"
-                }]
-
-            debug_print(f"[DEBUG] Image successfully generated, base64 length: {len(image_data.b64_json)}")
-            image_mime_type = self._OUTPUT_MIME_BY_FORMAT.get(output_format, "image/png")
-
-            result = [{
-                "content": image_data.b64_json,
-                "content_type": image_mime_type,
-                "description": query,
-                "style": style,
-                "provider": self.get_provider_name(),
-                "revised_prompt": getattr(image_data, 'revised_prompt', None)
-            }]
-
-            debug_print(f"[DEBUG] Returning OpenAI result: {result[0].keys()}")
-            return result
+            if self.cache_size <= 0:
+                return await self._request_images(request_kwargs, output_format, query, style)
+
+            cache_key = (
+                self.model,
+                styled_prompt,
+                resolution,
+                background,
+                output_format,
+                output_compression,
+                moderation,
+            )
+            return await self._request_images_cached(cache_key, request_kwargs, output_format, query, style)
 
         except openai.RateLimitError as e:
             error_msg = f"OpenAI API rate limit exceeded: {str(e)}"
-            debug_print(f"[ERROR] {error_msg}")
-            return [{
-                "error": error_msg,
-                "content_type": "text/plain"
-            }]
+            logger.error(error_msg)
+            return self._err(error_msg)
         except openai.APIError as e:
             error_msg = f"OpenAI API error: {str(e)}"
-            debug_print(f"[ERROR] {error_msg}")
-            return [{
-                "error": error_msg,
-                "content_type": "text/plain"
-            }]
+            logger.error(error_msg)
+            return self._err(error_msg)
         except Exception as e:
             error_msg = str(e)
-            debug_print(f"[ERROR] Unexpected error in OpenAI provider: {error_msg}")
-            import traceback
-            traceback.print_exc(file=sys.stderr)
-            return [{
-                "error": f"Error occurred during OpenAI image generation: {error_msg}",
-                "content_type": "text/plain"
-            }]
+            logger.exception("Unexpected error in OpenAI provider")
+            return self._err(f"Error occurred during OpenAI image generation: {error_msg}")
@@ -1,5 +1,5 @@
-from typing import Dict, Optional, List
-from .base import BaseImageProvider, debug_print
+from typing import Any, Callable, Dict, Optional, List, Mapping, Tuple
+from .base import BaseImageProvider, close_http_session, debug_print, error_result
 from ..config import ServerConfig
 
 HunyuanProvider = None
@@ -34,135 +34,191 @@ def _resolve_doubao_provider():
 class ProviderManager:
     """Manages multiple image generation API providers"""
 
-    SUPPORTED_PROVIDERS = frozenset({"hunyuan", "openai", "doubao"})
-
     def __init__(self, config: Optional[ServerConfig] = None):
         self.config = config or ServerConfig()
+        # Instantiated providers; others are built from _specs on first get_provider().
         self.providers: Dict[str, BaseImageProvider] = {}
+        # Registered providers: (class resolver, constructor kwargs). The resolver imports
+        # the provider module on demand, so a missing SDK only drops that provider.
+        self._specs: Dict[str, Tuple[Callable[[], type], Dict[str, Any]]] = {}
         self.default_provider: Optional[str] = None
         self._initialize_providers()
 
     def _initialize_providers(self):
-        """Initialize available providers based on parsed server config."""
+        """Register available providers based on parsed server config.
+
+        Only the default provider is constructed up front; the others are built
+        lazily so configured-but-unused providers never create SDK/HTTP clients.
+        """
 
-        # Initialize Hunyuan provider
+        # Register Hunyuan provider
         if self.config.tencent_secret_id and self.config.tencent_secret_key:
-            try:
-                provider_cls = _resolve_hunyuan_provider()
-                self.providers["hunyuan"] = provider_cls(
-                    secret_id=self.config.tencent_secret_id,
-                    secret_key=self.config.tencent_secret_key
-                )
-                debug_print("[INFO] Hunyuan provider initialized successfully")
-                # Set as default if no default is set
-                if not self.default_provider:
-                    self.default_provider = "hunyuan"
-            except Exception as e:
-                debug_print(f"[ERROR] Failed to initialize Hunyuan provider: {e}")
-        
-        # Initialize OpenAI provider
+            self._specs["hunyuan"] = (_resolve_hunyuan_provider, {
+                "secret_id": self.config.tencent_secret_id,
+                "secret_key": self.config.tencent_secret_key
+            })
+
+        # Register OpenAI provider
         if self.config.openai_api_key:
             openai_model = self.config.openai_model.strip()
             if not openai_model:
                 debug_print("[WARNING] OPENAI_MODEL is empty. Skipping OpenAI provider initialization.")
             else:
                 try:
+                    # Already imported to validate the model, so bind the class itself.
                     provider_cls = _resolve_openai_provider()
-                    self.providers["openai"] = provider_cls(
-                        api_key=self.config.openai_api_key,
-                        base_url=self.config.openai_base_url,
-                        model=openai_model
-                    )
-                    debug_print("[INFO] OpenAI provider initialized successfully")
-                    # Set as default if no default is set
-                    if not self.default_provider:
-                        self.default_provider = "openai"
+                    provider_cls.validate_model(openai_model)
+                    self._specs["openai"] = (lambda: provider_cls, {
+                        "api_key": self.config.openai_api_key,
+                        "base_url": self.config.openai_base_url,
+                        "model": openai_model,
+                        "max_retries": self.config.openai_max_retries,
+                        "backoff_max": self.config.openai_backoff_max,
+                        "cache_size": self.config.openai_cache_size
+                    })
                 except Exception as e:
                     debug_print(f"[ERROR] Failed to initialize OpenAI provider: {e}")
 
-        # Initialize Doubao provider (New Ark API)
+        # Register Doubao provider (New Ark API)
         if self.config.doubao_api_key:
             doubao_model = self.config.doubao_model.strip()
             doubao_fallback_model = self.config.doubao_fallback_model.strip()
             if not doubao_model:
                 debug_print("[WARNING] DOUBAO_MODEL is empty. Skipping Doubao provider initialization.")
             else:
-                try:
-                    provider_cls = _resolve_doubao_provider()
-                    self.providers["doubao"] = provider_cls(
-                        api_key=self.config.doubao_api_key,
-                        endpoint=self.config.doubao_endpoint,
-                        model=doubao_model,
-                        fallback_model=doubao_fallback_model or None
-                    )
-                    debug_print("[INFO] Doubao provider initialized successfully")
-                    #Set as default if no default is set
-                    if not self.default_provider:
-                        self.default_provider = "doubao"
-                except Exception as e:
-                    debug_print(f"[ERROR] Failed to initialize Doubao provider: {e}")
-
-        # Check if any provider was initialized
-        if not self.providers:
-            debug_print("[WARNING] No image generation providers were initialized. Please check your environment variables.")
+                self._specs["doubao"] = (_resolve_doubao_provider, {
+                    "api_key": self.config.doubao_api_key,
+                    "endpoint": self.config.doubao_endpoint,
+                    "model": doubao_model,
+                    "fallback_model": doubao_fallback_model or None
+                })
 
-        configured_default_raw = getattr(self.config, "default_provider", None)
-        configured_default = (
-            configured_default_raw.strip().lower()
-            if isinstance(configured_default_raw, str)
-            else configured_default_raw
-        )
-        if configured_default == "":
-            configured_default = None
+        # ServerConfig already stripped, lower-cased and validated this value.
+        configured_default = getattr(self.config, "default_provider", None)
         if configured_default:
-            if configured_default not in self.SUPPORTED_PROVIDERS:
-                raise ValueError(
-                    "Invalid MCP_DEFAULT_PROVIDER. "
-                    f"Supported values: {sorted(self.SUPPORTED_PROVIDERS)}; got: {configured_default!r}"
-                )
-            if configured_default not in self.providers:
+            if self._materialize_provider(configured_default) is None:
                 raise ValueError(
                     f"MCP_DEFAULT_PROVIDER={configured_default!r} is configured but unavailable. "
-                    f"Initialized providers: {sorted(self.providers.keys()) or 'none'}. "
+                    f"Initialized providers: {sorted(self._specs.keys()) or 'none'}. "
                     "Check API credentials and model settings."
                 )
             self.default_provider = configured_default
-        elif len(self.providers) > 1:
-            debug_print(
-                "[WARNING] Multiple providers are initialized but MCP_DEFAULT_PROVIDER is not set. "
-                f"Using implicit default provider: {self.default_provider}"
-            )
-
-        if self.providers:
-            debug_print(f"[INFO] Initialized providers: {list(self.providers.keys())}")
+        else:
+            # Implicit default: first provider (hunyuan, openai, doubao order) that constructs.
+            for provider_name in list(self._specs):
+                if self._materialize_provider(provider_name) is not None:
+                    self.default_provider = provider_name
+                    break
+            if len(self._specs) > 1:
+                debug_print(
+                    "[WARNING] Multiple providers are initialized but MCP_DEFAULT_PROVIDER is not set. "
+                    f"Using implicit default provider: {self.default_provider}"
+                )
+
+        # Check if any provider was registered
+        if not self._specs:
+            debug_print("[WARNING] No image generation providers were initialized. Please check your environment variables.")
+        else:
+            debug_print(f"[INFO] Initialized providers: {list(self._specs.keys())}")
             debug_print(f"[INFO] Default provider: {self.default_provider}")
 
+    def _materialize_provider(self, provider_name: str) -> Optional[BaseImageProvider]:
+        """Construct a registered provider on first use; drop it if construction fails."""
+        provider = self.providers.get(provider_name)
+        if provider is not None:
+            return provider
+
+        spec = self._specs.get(provider_name)
+        if spec is None:
+            return None
+
+        resolve_cls, kwargs = spec
+        try:
+            provider = resolve_cls()(**kwargs)
+        except Exception as e:
+            debug_print(f"[ERROR] Failed to initialize {provider_name} provider: {e}")
+            del self._specs[provider_name]
+            return None
+
+        self.providers[provider_name] = provider
+        debug_print(f"[INFO] {provider_name} provider initialized successfully")
+        return provider
+
     def get_provider(self, provider_name: Optional[str] = None) -> Optional[BaseImageProvider]:
         """Get a specific provider or the default provider"""
         if provider_name:
-            return self.providers.get(provider_name)
+            return self._materialize_provider(provider_name)
         elif self.default_provider:
-            return self.providers.get(self.default_provider)
+            return self._materialize_provider(self.default_provider)
         else:
             return None
 
+    async def aclose(self) -> None:
+        """Close network clients held by initialized providers (call on shutdown)"""
+        for provider_name, provider in self.providers.items():
+            try:
+                await provider.aclose()
+            except Exception as e:
+                debug_print(f"[WARNING] Failed to close {provider_name} provider: {e}")
+        # Pooled HTTP clients are shared across provider instances, so close them once here.
+        await close_http_session()
+        if OpenAIProvider is not None:
+            from .openai_provider import close_openai_clients
+            await close_openai_clients()
+
     def get_available_providers(self) -> List[str]:
-        """Get list of available provider names"""
-        return list(self.providers.keys())
+        """Get names of constructed providers plus configured ones not yet built.
 
-    def get_all_styles(self) -> Dict[str, Dict[str, str]]:
-        """Get styles from all providers"""
-        all_styles = {}
-        for provider_name, provider in self.providers.items():
-            all_styles[provider_name] = provider.get_available_styles()
-        return all_styles
+        A lazily built provider whose construction fails is logged and removed
+        on first use, so it can appear here until then.
+        """
+        return list(self._specs.keys())
 
-    def get_all_resolutions(self) -> Dict[str, Dict[str, str]]:
-        """Get resolutions from all providers"""
-        all_resolutions = {}
-        for provider_name, provider in self.providers.items():
-            all_resolutions[provider_name] = provider.get_available_resolutions()
-        return all_resolutions
+    def _iter_catalogs(self):
+        """Yield (name, provider instance or class, constructor kwargs) without building providers.
+
+        Catalog lookups (styles, resolutions, models) must not construct unused
+        providers, so unbuilt ones are answered from their class-level tables.
+        """
+        for provider_name, (resolve_cls, kwargs) in list(self._specs.items()):
+            provider = self.providers.get(provider_name)
+            if provider is None:
+                try:
+                    provider = resolve_cls()
+                except Exception as e:
+                    debug_print(f"[ERROR] Failed to initialize {provider_name} provider: {e}")
+                    del self._specs[provider_name]
+                    continue
+            yield provider_name, provider, kwargs
+
+    def get_all_styles(self) -> Dict[str, Mapping[str, str]]:
+        """Get styles from all providers (shared read-only mappings, not copies)"""
+        return {
+            provider_name: provider.catalog_styles(**kwargs)
+            for provider_name, provider, kwargs in self._iter_catalogs()
+        }
+
+    def get_all_resolutions(self) -> Dict[str, Mapping[str, str]]:
+        """Get resolutions from all providers (shared read-only mappings, not copies)"""
+        return {
+            provider_name: provider.catalog_resolutions(**kwargs)
+            for provider_name, provider, kwargs in self._iter_catalogs()
+        }
+
+    def get_provider_models(self) -> Dict[str, Dict[str, Optional[str]]]:
+        """Get OpenAI/Doubao model settings for diagnostics, without building providers"""
+        summary: Dict[str, Dict[str, Optional[str]]] = {}
+        for provider_name, fields in (("openai", ("model",)), ("doubao", ("model", "fallback_model"))):
+            spec = self._specs.get(provider_name)
+            if spec is None:
+                continue
+            # A built provider reports its normalized values; otherwise use the registered kwargs.
+            provider = self.providers.get(provider_name)
+            summary[provider_name] = {
+                field: getattr(provider, field) if provider is not None else spec[1].get(field)
+                for field in fields
+            }
+        return summary
 
     def validate_provider_style(self, provider_name: str, style: str) -> bool:
         """Validate if a style is supported by a specific provider"""
@@ -194,10 +250,7 @@ class ProviderManager:
             available = ", ".join(self.get_available_providers())
             error_msg = f"Provider '{provider_name}' not available. Available providers: {available}"
             debug_print(f"[ERROR] {error_msg}")
-            return [{
-                "error": error_msg,
-                "content_type": "text/plain"
-            }]
+            return error_result(error_msg)
 
         debug_print(f"[INFO] Using provider: {provider.get_provider_name()}")
         return await provider.generate_images(
@@ -7,3 +7,14 @@ Supports:
 """
 
 __all__ = ["stdio_server", "http_server", "http", "auth", "session_manager"]
+
+import importlib
+
+
+def __getattr__(name):
+    """Import transport submodules on first attribute access (PEP 562)."""
+    if name in __all__:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
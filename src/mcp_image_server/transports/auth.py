@@ -1,319 +1,260 @@
 """
 Authentication and authorization for MCP HTTP server.
 
-This module provides:
-- Bearer token authentication
+This module provides RequestGuardMiddleware, a single ASGI layer for:
 - Origin header validation (prevents DNS rebinding attacks)
-- Starlette middleware integration
+- Bearer token authentication
 """
 
+import json
 import secrets
-from typing import List, Optional
-from starlette.authentication import (
-    AuthenticationBackend,
-    AuthenticationError,
-    AuthCredentials,
-    BaseUser,
-    SimpleUser
-)
-from starlette.middleware import Middleware
-from starlette.middleware.authentication import AuthenticationMiddleware
-from starlette.requests import HTTPConnection, Request
-from starlette.responses import JSONResponse, Response
+from typing import FrozenSet, List, NamedTuple, Optional, Tuple
 from starlette.types import ASGIApp
 
 
-def _is_whitelisted_path(path: str, whitelist_paths: List[str]) -> bool:
+def _compile_whitelist(whitelist_paths: List[str]) -> Tuple[FrozenSet[str], Tuple[str, ...]]:
     """
-    Check if request path is whitelisted.
+    Split whitelist patterns into exact paths and prefixes.
 
     Supports exact match and prefix wildcard pattern:
     - exact: /health
     - prefix: /images*
     """
-    for pattern in whitelist_paths:
-        if pattern.endswith("*"):
-            prefix = pattern[:-1]
-            if path.startswith(prefix):
-                return True
-        elif path == pattern:
-            return True
-    return False
-
-
-class BearerTokenUser(BaseUser):
-    """User authenticated via Bearer token."""
-
-    def __init__(self, username: str = "api_user"):
-        self.username = username
-
-    @property
-    def is_authenticated(self) -> bool:
-        return True
-
-    @property
-    def display_name(self) -> str:
-        return self.username
+    exact = frozenset(p for p in whitelist_paths if not p.endswith("*"))
+    prefixes = tuple(p[:-1] for p in whitelist_paths if p.endswith("*"))
+    return exact, prefixes
 
 
-class BearerTokenAuthBackend(AuthenticationBackend):
-    """Authentication backend that validates Bearer tokens."""
+def _is_whitelisted_path(
+    path: str,
+    whitelist: Tuple[FrozenSet[str], Tuple[str, ...]]
+) -> bool:
+    """Check if request path matches a whitelist compiled by _compile_whitelist."""
+    exact, prefixes = whitelist
+    return path in exact or path.startswith(prefixes)
 
-    def __init__(self, expected_token: str):
-        """
-        Initialize authentication backend.
-
-        Args:
-            expected_token: The expected Bearer token
-        """
-        self.expected_token = expected_token
-
-    async def authenticate(
-        self, conn: HTTPConnection
-    ) -> Optional[tuple[AuthCredentials, BaseUser]]:
-        """
-        Authenticate request based on Authorization header.
-
-        Args:
-            conn: HTTP connection
 
-        Returns:
-            Optional tuple of (credentials, user) if authenticated, None otherwise
-        """
-        # Skip authentication for health check endpoint
-        if conn.url.path == "/health":
-            return None
+def _bearer_token_matches(auth_header: str, expected: bytes) -> bool:
+    """
+    Check an Authorization header value against the expected token bytes.
 
-        # Get Authorization header
-        auth_header = conn.headers.get("Authorization")
+    Returns False for anything that is not exactly "Bearer <token>".
+    """
+    scheme, sep, token = auth_header.partition(" ")
+    token = token.strip()
+    if not sep or not token or scheme.lower() != "bearer" or " " in token:
+        # Invalid format
+        return False
 
-        if not auth_header:
-            # No auth header provided
-            return None
+    return secrets.compare_digest(token.encode("utf-8", errors="replace"), expected)
 
-        # Parse Bearer token
-        parts = auth_header.split()
-        if len(parts) != 2 or parts[0].lower() != "bearer":
-            # Invalid format
-            return None
 
-        token = parts[1]
+_LOCALHOST_ORIGINS = frozenset({
+    "http://localhost",
+    "http://127.0.0.1",
+    "https://localhost",
+    "https://127.0.0.1",
+})
 
-        # Validate token using constant-time comparison (prevents timing attacks)
-        if not secrets.compare_digest(token, self.expected_token):
-            # Invalid token
-            return None
 
-        # Token is valid
-        return AuthCredentials(["authenticated"]), BearerTokenUser()
+# Characters a wildcard may not match: "https://*.example.com" must not accept
+# "https://evil.com/?x=.example.com".
+_URL_DELIMITERS = ("/", "?", "#", "@")
 
 
-def validate_bearer_token(token: str, expected: str) -> bool:
-    """
-    Validate a Bearer token using constant-time comparison.
+class _CompiledOrigins(NamedTuple):
+    """Allowed origins preprocessed once for per-request checks."""
+    allow_all: bool
+    exact: FrozenSet[str]
+    allow_localhost: bool
+    patterns: Tuple[Tuple[str, ...], ...]
 
-    Args:
-        token: The token to validate
-        expected: The expected token
 
-    Returns:
-        bool: True if token is valid
+def _compile_origins(allowed_origins: List[str]) -> _CompiledOrigins:
     """
-    if not token or not expected:
-        return False
-
-    return secrets.compare_digest(token, expected)
-
-
-def validate_origin(origin: str, allowed_origins: List[str]) -> bool:
+    Preprocess allowed origins: exact entries go into a frozenset and
+    wildcard entries (e.g. "https://*.example.com") are split on "*".
     """
-    Validate Origin header against allowed origins.
-
-    This prevents DNS rebinding attacks and ensures requests come from
-    trusted origins.
+    return _CompiledOrigins(
+        allow_all="*" in allowed_origins,
+        exact=frozenset(allowed_origins),
+        allow_localhost=not _LOCALHOST_ORIGINS.isdisjoint(allowed_origins),
+        patterns=tuple(
+            tuple(o.split("*"))
+            for o in allowed_origins
+            if "*" in o and o != "*"
+        ),
+    )
 
-    Args:
-        origin: The Origin header value
-        allowed_origins: List of allowed origins (supports wildcards)
 
-    Returns:
-        bool: True if origin is allowed
-    """
+def _is_origin_allowed(origin: str, compiled: _CompiledOrigins) -> bool:
+    """Check an Origin header value against origins compiled by _compile_origins."""
     if not origin:
         # No origin header - allow (typically for non-browser clients)
         return True
 
-    # Check if wildcard is allowed
-    if "*" in allowed_origins:
+    if compiled.allow_all or origin in compiled.exact:
         return True
 
-    # Check exact match
-    if origin in allowed_origins:
+    # Check for localhost variants (development)
+    if compiled.allow_localhost and origin in _LOCALHOST_ORIGINS:
         return True
 
-    # Check for localhost variants (development)
-    if origin in ["http://localhost", "http://127.0.0.1", "https://localhost", "https://127.0.0.1"]:
-        localhost_found = any(
-            o in ["http://localhost", "http://127.0.0.1", "https://localhost", "https://127.0.0.1", "*"]
-            for o in allowed_origins
-        )
-        if localhost_found:
-            return True
+    return any(_match_wildcard(origin, parts) for parts in compiled.patterns)
 
-    # Check for pattern matching (basic wildcard support)
-    for allowed in allowed_origins:
-        if "*" in allowed:
-            # Simple wildcard matching (e.g., "https://*.example.com")
-            pattern = allowed.replace("*", ".*")
-            import re
-            if re.match(pattern, origin):
-                return True
 
-    return False
+def _is_wildcard_span(text: str) -> bool:
+    """A "*" stands for host/port characters only, never a URL delimiter."""
+    return not any(delimiter in text for delimiter in _URL_DELIMITERS)
 
 
-class AuthRequiredMiddleware:
+def _match_wildcard(origin: str, parts: Tuple[str, ...]) -> bool:
     """
-    Middleware that requires authentication for all requests except whitelisted paths.
+    Match origin against a wildcard pattern pre-split on "*".
 
-    Returns 401 Unauthorized if authentication is missing or invalid.
+    Plain string checks instead of a regex: the common "scheme://*.suffix"
+    form is one startswith and one endswith.
     """
+    head, tail = parts[0], parts[-1]
+    if len(origin) < len(head) + len(tail):
+        return False
+    if not (origin.startswith(head) and origin.endswith(tail)):
+        return False
+    pos, end = len(head), len(origin) - len(tail)
+    for middle in parts[1:-1]:
+        found = origin.find(middle, pos, end)
+        if found < 0 or not _is_wildcard_span(origin[pos:found]):
+            return False
+        pos = found + len(middle)
+    return _is_wildcard_span(origin[pos:end])
+
+
+_UNAUTHORIZED_CONTENT = json.dumps(
+    {
+        "jsonrpc": "2.0",
+        "error": {
+            "code": -32001,
+            "message": "Unauthorized: Missing or invalid authentication"
+        },
+        "id": None
+    },
+    separators=(",", ":"),
+).encode("utf-8")
+
+_UNAUTHORIZED_HEADERS = (
+    (b"content-type", b"application/json"),
+    (b"content-length", str(len(_UNAUTHORIZED_CONTENT)).encode("ascii")),
+    (b"www-authenticate", b"Bearer"),
+)
 
-    def __init__(
-        self,
-        app: ASGIApp,
-        whitelist_paths: Optional[List[str]] = None
-    ):
-        """
-        Initialize auth middleware.
 
-        Args:
-            app: ASGI application
-            whitelist_paths: Paths that don't require authentication
-        """
-        self.app = app
-        self.whitelist_paths = whitelist_paths or ["/health"]
+# 403 body split around the origin so rejections only JSON-escape the origin itself.
+_FORBIDDEN_PREFIX = b'{"jsonrpc":"2.0","error":{"code":-32002,"message":"Forbidden: Origin \''
+_FORBIDDEN_SUFFIX = b'\' is not allowed"},"id":null}'
 
-    async def __call__(self, scope, receive, send):
-        """Process request with authentication check."""
-        if scope["type"] != "http":
-            await self.app(scope, receive, send)
-            return
 
-        # Check if path is whitelisted
-        path = scope["path"]
-        if _is_whitelisted_path(path, self.whitelist_paths):
-            await self.app(scope, receive, send)
-            return
+async def _send_unauthorized(send) -> None:
+    """Send the prebuilt 401 response (no per-request JSON encoding)."""
+    # Fresh message dicts: outer send wrappers (e.g. CORS) may mutate headers.
+    await send({
+        "type": "http.response.start",
+        "status": 401,
+        "headers": list(_UNAUTHORIZED_HEADERS),
+    })
+    await send({"type": "http.response.body", "body": _UNAUTHORIZED_CONTENT})
 
-        # Check if user is authenticated
-        user = scope.get("user")
-        if user is None or not user.is_authenticated:
-            # Return 401 Unauthorized
-            response = JSONResponse(
-                {
-                    "jsonrpc": "2.0",
-                    "error": {
-                        "code": -32001,
-                        "message": "Unauthorized: Missing or invalid authentication"
-                    },
-                    "id": None
-                },
-                status_code=401,
-                headers={"WWW-Authenticate": "Bearer"}
-            )
-            await response(scope, receive, send)
-            return
 
-        # User is authenticated, continue
-        await self.app(scope, receive, send)
+async def _send_forbidden_origin(send, origin: str) -> None:
+    """Send a 403 response; only the JSON-escaped origin is encoded per request."""
+    escaped_origin = json.dumps(origin, ensure_ascii=False)[1:-1].encode("utf-8")
+    body = b"".join((_FORBIDDEN_PREFIX, escaped_origin, _FORBIDDEN_SUFFIX))
+    await send({
+        "type": "http.response.start",
+        "status": 403,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
 
 
-class OriginValidationMiddleware:
+class RequestGuardMiddleware:
     """
-    Middleware that validates Origin header to prevent DNS rebinding attacks.
+    Single ASGI layer combining Origin validation and Bearer token authentication.
 
-    Returns 403 Forbidden if origin is not allowed.
+    A disallowed Origin gets 403 before the token is checked (401). The
+    whitelist is matched once and the request headers are scanned once.
     """
 
     def __init__(
         self,
         app: ASGIApp,
-        allowed_origins: List[str],
+        allowed_origins: Optional[List[str]] = None,
+        expected_token: Optional[str] = None,
         whitelist_paths: Optional[List[str]] = None
     ):
         """
-        Initialize origin validation middleware.
+        Initialize combined guard middleware.
 
         Args:
             app: ASGI application
-            allowed_origins: List of allowed origins
-            whitelist_paths: Paths that don't require origin validation
+            allowed_origins: Allowed origins; None or a "*" entry disables the check
+            expected_token: Bearer token to require; None disables authentication
+            whitelist_paths: Paths that skip both checks
         """
         self.app = app
-        self.allowed_origins = allowed_origins
+        compiled = _compile_origins(allowed_origins) if allowed_origins else None
+        self._allowed_origins = None if compiled is None or compiled.allow_all else compiled
+        # Raw header forms of the common cases, so matching requests never decode a header.
+        self._allowed_origin_values = (
+            frozenset(o.encode("utf-8") for o in self._allowed_origins.exact)
+            if self._allowed_origins is not None else frozenset()
+        )
+        self._expected_bytes = expected_token.encode("utf-8") if expected_token else None
+        self._expected_header = b"Bearer " + self._expected_bytes if self._expected_bytes else None
         self.whitelist_paths = whitelist_paths or ["/health"]
+        self._whitelist = _compile_whitelist(self.whitelist_paths)
 
     async def __call__(self, scope, receive, send):
-        """Process request with origin validation."""
-        if scope["type"] != "http":
-            await self.app(scope, receive, send)
-            return
-
-        # Check if path is whitelisted
-        path = scope["path"]
-        if _is_whitelisted_path(path, self.whitelist_paths):
+        """Process request with origin and authentication checks."""
+        if scope["type"] != "http" or _is_whitelisted_path(scope["path"], self._whitelist):
             await self.app(scope, receive, send)
             return
 
-        # Get Origin header
-        headers = dict(scope.get("headers", []))
-        origin = headers.get(b"origin", b"").decode("utf-8")
-
-        # Validate origin
-        if not validate_origin(origin, self.allowed_origins):
-            # Return 403 Forbidden
-            response = JSONResponse(
-                {
-                    "jsonrpc": "2.0",
-                    "error": {
-                        "code": -32002,
-                        "message": f"Forbidden: Origin '{origin}' is not allowed"
-                    },
-                    "id": None
-                },
-                status_code=403
+        # First occurrence of each header wins.
+        origin = None
+        authorization = None
+        for name, value in scope.get("headers", ()):
+            if name == b"origin":
+                if origin is None:
+                    origin = value
+            elif name == b"authorization":
+                if authorization is None:
+                    authorization = value
+
+        if (
+            self._allowed_origins is not None
+            and origin is not None
+            and origin not in self._allowed_origin_values
+        ):
+            origin_text = origin.decode("utf-8", "replace")
+            if not _is_origin_allowed(origin_text, self._allowed_origins):
+                await _send_forbidden_origin(send, origin_text)
+                return
+
+        if self._expected_header is not None and (
+            authorization is None
+            or not (
+                secrets.compare_digest(authorization, self._expected_header)
+                or _bearer_token_matches(authorization.decode("latin-1"), self._expected_bytes)
             )
-            await response(scope, receive, send)
+        ):
+            await _send_unauthorized(send)
             return
 
-        # Origin is valid, continue
         await self.app(scope, receive, send)
 
 
-def create_auth_middleware(auth_token: str) -> Middleware:
-    """
-    Create authentication middleware with Bearer token backend.
-
-    Args:
-        auth_token: Expected Bearer token
-
-    Returns:
-        Middleware: Starlette authentication middleware
-    """
-    return Middleware(
-        AuthenticationMiddleware,
-        backend=BearerTokenAuthBackend(auth_token)
-    )
-
-
 # Export for convenience
-__all__ = [
-    "BearerTokenAuthBackend",
-    "BearerTokenUser",
-    "validate_bearer_token",
-    "validate_origin",
-    "AuthRequiredMiddleware",
-    "OriginValidationMiddleware",
-    "create_auth_middleware"
-]
+__all__ = ["RequestGuardMiddleware"]
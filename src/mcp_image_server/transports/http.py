@@ -9,6 +9,7 @@ This module implements the MCP Streamable HTTP transport protocol:
 
 import asyncio
 import json
+import re
 import sys
 from typing import Dict, Any, Optional, List
 from starlette.requests import Request
@@ -18,6 +19,118 @@ from sse_starlette import EventSourceResponse
 
 from .session_manager import SessionManager, Session
 
+# Reused compact encoder: json.dumps(...) with custom options builds a new
+# JSONEncoder on every call.
+_encode_json = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+# Static SSE payloads serialized once.
+_CONNECTED_EVENT_DATA = _encode_json({"status": "connected"})
+_KEEPALIVE_EVENT_DATA = _encode_json({"type": "keepalive"})
+
+# Queue marker translated into an SSE ping event
+_KEEPALIVE = object()
+
+# Base64 text needs no JSON escaping, so it can be streamed into a response verbatim.
+_BASE64_BYTES = re.compile(rb"[A-Za-z0-9+/=]*")
+
+DEFAULT_MAX_BODY_BYTES = 10 * 1024 * 1024
+
+
+class PreEncodedJSON(bytes):
+    """
+    A JSON-RPC ``result`` that is already serialized to UTF-8 JSON.
+
+    The JSON-RPC handler may return one as ``response["result"]``; it is spliced
+    into the response envelope verbatim instead of being encoded again.
+    """
+
+    __slots__ = ()
+
+
+def _encode_result_envelope_head(response: Dict[str, Any]) -> bytes:
+    """Encode a response without its result, ending right before the result value."""
+    envelope = {key: value for key, value in response.items() if key != "result"}
+    # Drop the closing brace of the encoded envelope and open the "result" member.
+    head = _encode_json(envelope).encode("utf-8")[:-1]
+    separator = b"," if len(envelope) else b""
+    return head + separator + b'"result":'
+
+
+def _encode_jsonrpc_response(response: Dict[str, Any]) -> bytes:
+    """Serialize a JSON-RPC response, embedding a PreEncodedJSON result as-is."""
+    result = response.get("result")
+    if isinstance(result, PreEncodedJSON):
+        return _encode_result_envelope_head(response) + result + b"}"
+    return _encode_json(response).encode("utf-8")
+
+
+def _base64_image_bytes(block: Any) -> Optional[bytes]:
+    """Return an image content block's data as bytes if it can be written without JSON escaping."""
+    if not isinstance(block, dict) or block.get("type") != "image":
+        return None
+    data = block.get("data")
+    if not isinstance(data, str) or not data.isascii():
+        return None
+    data_bytes = data.encode("ascii")
+    return data_bytes if _BASE64_BYTES.fullmatch(data_bytes) else None
+
+
+def _jsonrpc_response_parts(response: Dict[str, Any]) -> Optional[List[bytes]]:
+    """
+    Split a response carrying inline base64 image blocks into body chunks.
+
+    Each image's data becomes its own chunk instead of going through the JSON
+    encoder, so the body is never built as one string and then encoded again.
+    Returns None for results without such blocks.
+    """
+    result = response.get("result") if isinstance(response, dict) else None
+    content = result.get("content") if isinstance(result, dict) else None
+    if not isinstance(content, list):
+        return None
+    images = [_base64_image_bytes(block) for block in content]
+    if not any(images):
+        return None
+
+    parts: List[bytes] = [_encode_result_envelope_head(response), b'{"content":[']
+    for index, (block, data_bytes) in enumerate(zip(content, images)):
+        if index:
+            parts.append(b",")
+        if data_bytes is None:
+            parts.append(_encode_json(block).encode("utf-8"))
+            continue
+        meta = {key: value for key, value in block.items() if key not in ("type", "data")}
+        parts.append(b'{"type":"image","data":"')
+        parts.append(data_bytes)
+        parts.append(b'"' + (b"," + _encode_json(meta).encode("utf-8")[1:] if meta else b"}"))
+    rest = {key: value for key, value in result.items() if key != "content"}
+    parts.append(b"]" + (b"," + _encode_json(rest).encode("utf-8")[1:] if rest else b"}"))
+    parts.append(b"}")
+    return parts
+
+
+async def _iterate_parts(parts: List[bytes]):
+    """Yield pre-encoded body chunks to a StreamingResponse."""
+    for part in parts:
+        yield part
+
+
+class _BodyTooLarge(Exception):
+    """Raised while reading a request body that exceeds max_body_bytes."""
+
+
+def _json_response(
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Build a JSON response with the shared encoder instead of JSONResponse's per-call json.dumps."""
+    return Response(
+        _encode_json(content).encode("utf-8"),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json"
+    )
+
 
 class MCPHTTPHandler:
     """
@@ -28,12 +141,40 @@ class MCPHTTPHandler:
 
     # MCP Session header name
     SESSION_HEADER = "Mcp-Session-Id"
+    _SESSION_HEADER_BYTES = SESSION_HEADER.lower().encode("latin-1")
+
+    # Static error body for a non-object JSON-RPC message (no id to echo back)
+    _NOT_AN_OBJECT_BODY = _encode_json({
+        "jsonrpc": "2.0",
+        "error": {
+            "code": -32600,
+            "message": "Invalid Request: Message must be a JSON object"
+        },
+        "id": None
+    }).encode("utf-8")
+
+    # Static error body for a request body above max_body_bytes
+    _BODY_TOO_LARGE_BODY = _encode_json({
+        "jsonrpc": "2.0",
+        "error": {
+            "code": -32600,
+            "message": "Invalid Request: Request body too large"
+        },
+        "id": None
+    }).encode("utf-8")
+
+    # Pending server messages per SSE stream before new ones are dropped
+    SSE_QUEUE_MAXSIZE = 1024
+
+    # Seconds between keepalive pings on an SSE stream
+    SSE_KEEPALIVE_INTERVAL = 30.0
 
     def __init__(
         self,
         session_manager: SessionManager,
         enable_sse: bool = True,
-        debug: bool = False
+        debug: bool = False,
+        max_body_bytes: int = DEFAULT_MAX_BODY_BYTES
     ):
         """
         Initialize MCP HTTP handler.
@@ -42,10 +183,12 @@ class MCPHTTPHandler:
             session_manager: Session management instance
             enable_sse: Enable Server-Sent Events support
             debug: Enable debug logging
+            max_body_bytes: Largest POST body accepted before answering 413
         """
         self.session_manager = session_manager
         self.enable_sse = enable_sse
         self.debug = debug
+        self.max_body_bytes = max_body_bytes
 
         # Store message handlers (will be set by server)
         self.json_rpc_handler: Optional[callable] = None
@@ -62,10 +205,10 @@ class MCPHTTPHandler:
         """
         self.json_rpc_handler = handler
 
-    def _debug_print(self, *args, **kwargs) -> None:
-        """Print debug message to stderr."""
+    def _debug_print(self, message: str, *args) -> None:
+        """Print debug message to stderr; %-style args are only formatted when debug is on."""
         if self.debug:
-            print(*args, file=sys.stderr, **kwargs)
+            print(message % args if args else message, file=sys.stderr)
 
     def _extract_session_id(self, request: Request) -> Optional[str]:
         """
@@ -77,7 +220,11 @@ class MCPHTTPHandler:
         Returns:
             Optional[str]: Session ID if present
         """
-        return request.headers.get(self.SESSION_HEADER)
+        # Scan raw ASGI headers (lower-cased bytes) instead of building request.headers
+        for name, value in request.scope["headers"]:
+            if name == self._SESSION_HEADER_BYTES:
+                return value.decode("latin-1")
+        return None
 
     async def _create_or_get_session(self, session_id: Optional[str]) -> Session:
         """
@@ -92,7 +239,7 @@ class MCPHTTPHandler:
         if session_id:
             session = await self.session_manager.get_session(session_id)
             if session:
-                await self.session_manager.update_access_time(session_id)
+                session.update_access_time()
                 return session
 
         # Create new session
@@ -131,6 +278,33 @@ class MCPHTTPHandler:
 
         return error
 
+    async def _read_body(self, request: Request) -> bytes:
+        """
+        Read the request body, refusing anything above max_body_bytes.
+
+        A declared Content-Length is checked before reading; chunked bodies
+        are accumulated and abandoned as soon as they cross the limit.
+
+        Raises:
+            _BodyTooLarge: If the body exceeds max_body_bytes
+        """
+        limit = self.max_body_bytes
+        content_length = request.headers.get("content-length")
+        if content_length is not None:
+            try:
+                if int(content_length) > limit:
+                    raise _BodyTooLarge()
+            except ValueError:
+                pass
+            return await request.body()
+
+        body = bytearray()
+        async for chunk in request.stream():
+            body += chunk
+            if len(body) > limit:
+                raise _BodyTooLarge()
+        return bytes(body)
+
     async def handle_post(self, request: Request) -> Response:
         """
         Handle POST /mcp/v1/messages - Receive JSON-RPC messages from client.
@@ -143,7 +317,7 @@ class MCPHTTPHandler:
         """
         # Extract session ID
         session_id = self._extract_session_id(request)
-        self._debug_print(f"[POST] Session ID: {session_id}")
+        self._debug_print("[POST] Session ID: %s", session_id)
 
         # Get or create session
         session = await self._create_or_get_session(session_id)
@@ -152,9 +326,19 @@ class MCPHTTPHandler:
         try:
             # Parse JSON body
             try:
-                body = await request.json()
-            except json.JSONDecodeError as e:
-                return JSONResponse(
+                raw_body = await self._read_body(request)
+            except _BodyTooLarge:
+                return Response(
+                    self._BODY_TOO_LARGE_BODY,
+                    status_code=413,
+                    media_type="application/json"
+                )
+
+            try:
+                body = json.loads(raw_body)
+            except ValueError as e:
+                # JSONDecodeError, or UnicodeDecodeError for non-UTF body bytes
+                return _json_response(
                     self._create_jsonrpc_error(
                         -32700,
                         "Parse error: Invalid JSON",
@@ -163,20 +347,19 @@ class MCPHTTPHandler:
                     status_code=400
                 )
 
-            self._debug_print(f"[POST] Request body: {json.dumps(body, indent=2)}")
+            if self.debug:
+                self._debug_print("[POST] Request body: %s", json.dumps(body, indent=2))
 
             # Validate JSON-RPC structure
             if not isinstance(body, dict):
-                return JSONResponse(
-                    self._create_jsonrpc_error(
-                        -32600,
-                        "Invalid Request: Message must be a JSON object"
-                    ),
-                    status_code=400
+                return Response(
+                    self._NOT_AN_OBJECT_BODY,
+                    status_code=400,
+                    media_type="application/json"
                 )
 
             if body.get("jsonrpc") != "2.0":
-                return JSONResponse(
+                return _json_response(
                     self._create_jsonrpc_error(
                         -32600,
                         "Invalid Request: Missing or invalid 'jsonrpc' field",
@@ -190,7 +373,7 @@ class MCPHTTPHandler:
             request_id = body.get("id")
 
             if not method:
-                return JSONResponse(
+                return _json_response(
                     self._create_jsonrpc_error(
                         -32600,
                         "Invalid Request: Missing 'method' field",
@@ -199,11 +382,25 @@ class MCPHTTPHandler:
                     status_code=400
                 )
 
-            self._debug_print(f"[POST] Method: {method}, ID: {request_id}")
+            if not isinstance(method, str):
+                return _json_response(
+                    self._create_jsonrpc_error(
+                        -32600,
+                        "Invalid Request: 'method' must be a string",
+                        request_id=request_id
+                    ),
+                    status_code=400
+                )
+
+            # Intern so the dispatcher's string comparisons against method-name
+            # literals short-circuit on identity.
+            method = body["method"] = sys.intern(method)
+
+            self._debug_print("[POST] Method: %s, ID: %s", method, request_id)
 
             # Check if handler is set
             if not self.json_rpc_handler:
-                return JSONResponse(
+                return _json_response(
                     self._create_jsonrpc_error(
                         -32603,
                         "Internal error: No JSON-RPC handler configured",
@@ -215,10 +412,10 @@ class MCPHTTPHandler:
             # Call JSON-RPC handler
             try:
                 result = await self.json_rpc_handler(body, session)
-                self._debug_print(f"[POST] Handler result: {result}")
+                self._debug_print("[POST] Handler result: %s", result)
             except Exception as e:
-                self._debug_print(f"[POST] Handler error: {e}")
-                return JSONResponse(
+                self._debug_print("[POST] Handler error: %s", e)
+                return _json_response(
                     self._create_jsonrpc_error(
                         -32603,
                         f"Internal error: {str(e)}",
@@ -231,17 +428,28 @@ class MCPHTTPHandler:
             response_headers = {}
             if new_session:
                 response_headers[self.SESSION_HEADER] = session.session_id
-                self._debug_print(f"[POST] New session created: {session.session_id}")
+                self._debug_print("[POST] New session created: %s", session.session_id)
+
+            # Results with inline image data are streamed chunk by chunk (Content-Length still set)
+            parts = _jsonrpc_response_parts(result)
+            if parts is not None:
+                response_headers["content-length"] = str(sum(map(len, parts)))
+                return StreamingResponse(
+                    _iterate_parts(parts),
+                    headers=response_headers,
+                    media_type="application/json"
+                )
 
             # Return success response
-            return JSONResponse(
-                result,
-                headers=response_headers
+            return Response(
+                _encode_jsonrpc_response(result),
+                headers=response_headers,
+                media_type="application/json"
             )
 
         except Exception as e:
-            self._debug_print(f"[POST] Unexpected error: {e}")
-            return JSONResponse(
+            self._debug_print("[POST] Unexpected error: %s", e)
+            return _json_response(
                 self._create_jsonrpc_error(
                     -32603,
                     f"Internal error: {str(e)}"
@@ -281,60 +489,61 @@ class MCPHTTPHandler:
                 status_code=404
             )
 
-        self._debug_print(f"[GET] Opening SSE stream for session: {session_id}")
+        self._debug_print("[GET] Opening SSE stream for session: %s", session_id)
 
-        # Create event queue for this session if not exists
-        if session_id not in self._sse_queues:
-            self._sse_queues[session_id] = asyncio.Queue()
+        # Create event queue for this session if not exists (no await in between)
+        queue = self._sse_queues.get(session_id)
+        if queue is None:
+            queue = asyncio.Queue(maxsize=self.SSE_QUEUE_MAXSIZE)
+            self._sse_queues[session_id] = queue
 
         # Event generator
         async def event_generator():
             """Generate SSE events from queue."""
-            queue = self._sse_queues[session_id]
+            sse_queues = self._sse_queues
             event_id = 0
+            keepalive_task = None
 
             try:
                 # Send initial connection event
                 yield {
                     "event": "connected",
                     "id": str(event_id),
-                    "data": json.dumps({"status": "connected"})
+                    "data": _CONNECTED_EVENT_DATA
                 }
                 event_id += 1
 
-                # Stream events from queue
+                # Stream events from queue; a single background task
+                # enqueues keepalive markers instead of a wait_for per event.
+                keepalive_task = asyncio.create_task(self._keepalive_loop(queue))
                 while True:
-                    try:
-                        # Wait for event with timeout for keepalive
-                        event_data = await asyncio.wait_for(
-                            queue.get(),
-                            timeout=30.0
-                        )
+                    event_data = await queue.get()
 
+                    if event_data is _KEEPALIVE:
+                        # Send keepalive ping
                         yield {
-                            "event": "message",
+                            "event": "ping",
                             "id": str(event_id),
-                            "data": json.dumps(event_data)
+                            "data": _KEEPALIVE_EVENT_DATA
                         }
-                        event_id += 1
-
-                    except asyncio.TimeoutError:
-                        # Send keepalive ping
+                    else:
                         yield {
-                            "event": "ping",
+                            "event": "message",
                             "id": str(event_id),
-                            "data": json.dumps({"type": "keepalive"})
+                            "data": _encode_json(event_data)
                         }
-                        event_id += 1
+                    event_id += 1
 
             except asyncio.CancelledError:
-                self._debug_print(f"[GET] SSE stream cancelled for session: {session_id}")
+                self._debug_print("[GET] SSE stream cancelled for session: %s", session_id)
                 raise
             finally:
-                # Cleanup on disconnect
-                if session_id in self._sse_queues:
-                    del self._sse_queues[session_id]
-                self._debug_print(f"[GET] SSE stream closed for session: {session_id}")
+                if keepalive_task is not None:
+                    keepalive_task.cancel()
+                # Cleanup on disconnect, unless a newer stream replaced the queue
+                if sse_queues.get(session_id) is queue:
+                    del sse_queues[session_id]
+                self._debug_print("[GET] SSE stream closed for session: %s", session_id)
 
         # Return SSE response
         return EventSourceResponse(
@@ -345,6 +554,16 @@ class MCPHTTPHandler:
             }
         )
 
+    async def _keepalive_loop(self, queue: asyncio.Queue) -> None:
+        """Enqueue a keepalive marker every SSE_KEEPALIVE_INTERVAL seconds."""
+        while True:
+            await asyncio.sleep(self.SSE_KEEPALIVE_INTERVAL)
+            try:
+                queue.put_nowait(_KEEPALIVE)
+            except asyncio.QueueFull:
+                # Stream is backed up with real messages; no ping needed
+                pass
+
     async def handle_delete(self, request: Request) -> Response:
         """
         Handle DELETE /mcp/v1/messages - Terminate session.
@@ -363,7 +582,7 @@ class MCPHTTPHandler:
                 status_code=400
             )
 
-        self._debug_print(f"[DELETE] Terminating session: {session_id}")
+        self._debug_print("[DELETE] Terminating session: %s", session_id)
 
         # Delete session
         deleted = await self.session_manager.delete_session(session_id)
@@ -375,8 +594,7 @@ class MCPHTTPHandler:
             )
 
         # Close SSE queue if exists
-        if session_id in self._sse_queues:
-            del self._sse_queues[session_id]
+        self._sse_queues.pop(session_id, None)
 
         # Return 204 No Content
         return Response(status_code=204)
@@ -394,18 +612,23 @@ class MCPHTTPHandler:
             message: JSON-RPC message to send
 
         Returns:
-            bool: True if message was queued successfully
+            bool: True if message was queued successfully, False if there is
+            no stream or its queue is full (slow consumer)
         """
         if not self.enable_sse:
             return False
 
-        if session_id not in self._sse_queues:
-            self._debug_print(f"[SSE] No SSE stream for session: {session_id}")
+        queue = self._sse_queues.get(session_id)
+        if queue is None:
+            self._debug_print("[SSE] No SSE stream for session: %s", session_id)
             return False
 
-        queue = self._sse_queues[session_id]
-        await queue.put(message)
-        self._debug_print(f"[SSE] Message queued for session: {session_id}")
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self._debug_print("[SSE] Queue full, dropping message for session: %s", session_id)
+            return False
+        self._debug_print("[SSE] Message queued for session: %s", session_id)
         return True
 
 
@@ -5,12 +5,18 @@ This module implements the MCP server with Streamable HTTP transport,
 migrated from FastMCP (stdio) to native Server class for remote access support.
 """
 
+import logging
+import re
 import sys
-import base64
+import binascii
+import importlib.util
 import time
 import json
 import asyncio
-from typing import Dict, Any, List, Optional
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from types import MappingProxyType
+from typing import AsyncContextManager, Callable, Dict, Any, List, Mapping, Optional
 from pathlib import Path
 from urllib.parse import quote
 
@@ -23,12 +29,86 @@ from starlette.staticfiles import StaticFiles
 from starlette.middleware import Middleware
 import uvicorn
 
-from ..config import ServerConfig
+from ..config import ServerConfig, load_config
 from .session_manager import SessionManager
-from .auth import create_auth_middleware, AuthRequiredMiddleware, OriginValidationMiddleware
-from .http import MCPHTTPHandler, health_check
+from .auth import RequestGuardMiddleware
+from .http import MCPHTTPHandler, PreEncodedJSON, health_check
 from ..providers import ProviderManager
 
+logger = logging.getLogger(__name__)
+
+
+# Reused encoders: json.dumps with non-default options builds a new
+# JSONEncoder on every call. default=dict serializes read-only mappings.
+_encode_json = json.JSONEncoder(ensure_ascii=False).encode
+_encode_pretty_json = json.JSONEncoder(ensure_ascii=False, indent=2, default=dict).encode
+
+
+def _b64encode(data: bytes) -> str:
+    """Base64-encode image bytes straight through binascii (no newline, no base64-module wrapper)."""
+    return binascii.b2a_base64(data, newline=False).decode("ascii")
+
+
+# The initialize result does not depend on the request; serialized once.
+_INITIALIZE_RESULT = PreEncodedJSON(_encode_json({
+    "protocolVersion": "2024-11-05",
+    "capabilities": {
+        "tools": {},
+        "resources": {},
+        "prompts": {}
+    },
+    "serverInfo": {
+        "name": "multi-api-image-mcp-http",
+        "version": "0.2.0"
+    }
+}).encode("utf-8"))
+
+
+def _jsonrpc_error(request_id: Any, message: str) -> Dict[str, Any]:
+    """Build a JSON-RPC internal-error response."""
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {
+            "code": -32603,
+            "message": message
+        }
+    }
+
+
+# Shared read-only stand-in for omitted prompt arguments.
+_EMPTY_ARGUMENTS: Mapping[str, Any] = MappingProxyType({})
+
+
+def _prompt_cache_key(name: Any, arguments: Any) -> Optional[tuple]:
+    """Hashable cache key for a prompts/get request, or None when the arguments are not hashable."""
+    if not isinstance(arguments, Mapping):
+        return None
+    try:
+        return (name, frozenset(arguments.items()))
+    except TypeError:
+        return None
+
+
+# Internal image fields removed from structured payloads.
+_IMAGE_BYTES_KEYS = ("image_bytes",)
+_BINARY_IMAGE_KEYS = ("image_bytes", "base64_data")
+
+# Anything str.isalnum() rejects, except "_", is replaced in filename prefixes.
+_UNSAFE_PREFIX_CHARS = re.compile(r"\W")
+
+
+def _write_image_file(file_path: Path, data: bytes) -> str:
+    """Create the parent directory, write the image and return its resolved path."""
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_bytes(data)
+    return str(file_path.resolve())
+
+
+def _read_image_base64(file_path: Path) -> str:
+    """Read an image file and return its bytes as base64 text."""
+    return _b64encode(file_path.read_bytes())
+
 
 def debug_print(*args, **kwargs):
     """Print debug messages to stderr."""
@@ -39,6 +119,23 @@ class MCPImageServerHTTP:
     """MCP Image Generation Server with HTTP transport."""
 
     TOOL_RESULT_VERSION = "1.0"
+    IMAGE_EXTENSIONS_BY_MIME = {
+        "image/jpeg": "jpg",
+        "image/jpg": "jpg",
+        "image/png": "png",
+        "image/webp": "webp",
+        "image/gif": "gif",
+        "image/bmp": "bmp",
+    }
+    PROMPT_RESULT_CACHE_SIZE = 128
+    # Seconds between debug progress lines while images are generating
+    PROGRESS_INTERVAL = 5
+    # Resource URIs served straight from a ProviderManager accessor
+    STATIC_RESOURCE_GETTERS = {
+        "providers://list": "get_available_providers",
+        "styles://list": "get_all_styles",
+        "resolutions://list": "get_all_resolutions",
+    }
     RELOADABLE_CONFIG_FIELDS = frozenset(
         {
             "tencent_secret_id",
@@ -46,6 +143,9 @@ class MCPImageServerHTTP:
             "openai_api_key",
             "openai_base_url",
             "openai_model",
+            "openai_max_retries",
+            "openai_backoff_max",
+            "openai_cache_size",
             "doubao_api_key",
             "doubao_endpoint",
             "doubao_model",
@@ -54,6 +154,7 @@ class MCPImageServerHTTP:
             "public_base_url",
             "image_record_ttl",
             "get_image_data_max_bytes",
+            "inline_image_max_bytes",
         }
     )
 
@@ -86,12 +187,37 @@ class MCPImageServerHTTP:
         self.http_handler = MCPHTTPHandler(
             session_manager=self.session_manager,
             enable_sse=config.enable_sse,
-            debug=config.debug
+            debug=config.debug,
+            max_body_bytes=config.max_request_body_bytes
         )
 
         # Set JSON-RPC handler
         self.http_handler.set_json_rpc_handler(self._handle_json_rpc)
 
+        # Debug-only progress heartbeat: one timer shared by all in-flight generations
+        self._active_generations: Counter = Counter()
+        self._progress_handle: Optional[asyncio.TimerHandle] = None
+        self._progress_waited = 0
+        # Tool definitions are static; built on first tools/list
+        self._tools: Optional[list[types.Tool]] = None
+        # Serialized tools/resources/prompts listings, keyed by JSON-RPC method
+        self._list_results: Dict[str, PreEncodedJSON] = {}
+        # Provider catalog section of the image generation prompt; reset on reload
+        self._prompt_catalog_text: Optional[str] = None
+        # Serialized prompts/get results keyed by (name, arguments), LRU-bounded; reset on reload
+        self._prompt_results: "OrderedDict[tuple, PreEncodedJSON]" = OrderedDict()
+
+        # JSON-RPC method dispatch table
+        self._rpc_handlers = {
+            "initialize": self._handle_initialize,
+            "tools/list": self._rpc_list_tools,
+            "tools/call": self._rpc_call_tool,
+            "resources/list": self._rpc_list_resources,
+            "resources/read": self._rpc_read_resource,
+            "prompts/list": self._rpc_list_prompts,
+            "prompts/get": self._rpc_get_prompt,
+        }
+
         # Register server capabilities
         self._register_capabilities()
 
@@ -135,8 +261,22 @@ class MCPImageServerHTTP:
         ) -> types.GetPromptResult:
             return await self._get_prompt(name, arguments)
 
+    async def _get_list_result(self, method: str, key: str, list_items) -> PreEncodedJSON:
+        """Return the encoded result of a static list method, serializing it only once."""
+        result = self._list_results.get(method)
+        if result is None:
+            payload = [item.model_dump(mode="json") for item in await list_items()]
+            result = self._list_results[method] = PreEncodedJSON(_encode_json({key: payload}).encode("utf-8"))
+        return result
+
     async def _list_tools(self) -> list[types.Tool]:
-        """List available tools."""
+        """List available tools (definitions and output schemas are built once)."""
+        if self._tools is None:
+            self._tools = self._build_tools()
+        return list(self._tools)
+
+    def _build_tools(self) -> list[types.Tool]:
+        """Build the static tool definitions."""
         return [
             types.Tool(
                 name="generate_image",
@@ -409,15 +549,14 @@ class MCPImageServerHTTP:
 
         images = result.get("images")
         if isinstance(images, list):
+            stripped_keys = _IMAGE_BYTES_KEYS if preserve_base64 else _BINARY_IMAGE_KEYS
             for image in images:
-                if isinstance(image, dict):
-                    payload["images"].append({
-                        key: value
-                        for key, value in image.items()
-                        if preserve_base64 or key != "base64_data"
-                    })
-                else:
-                    payload["images"].append(image)
+                # Only copy images that actually carry a field to drop.
+                if isinstance(image, dict) and any(key in image for key in stripped_keys):
+                    image = dict(image)
+                    for key in stripped_keys:
+                        image.pop(key, None)
+                payload["images"].append(image)
 
         return payload
 
@@ -444,16 +583,27 @@ class MCPImageServerHTTP:
         include_image_blocks: bool = True
     ) -> list[types.TextContent | types.ImageContent]:
         """Convert fixed tool result to text + optional image content payload."""
-        content: list[types.TextContent | types.ImageContent] = []
+        return [
+            types.TextContent(**block) if block["type"] == "text" else types.ImageContent(**block)
+            for block in self._tool_result_content_blocks(result, text_payload, include_image_blocks)
+        ]
+
+    def _tool_result_content_blocks(
+        self,
+        result: Dict[str, Any],
+        text_payload: Optional[Dict[str, Any]] = None,
+        include_image_blocks: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Build the JSON-ready content blocks for a tool result.
 
+        The JSON-RPC path returns these dicts as-is, so the text payload is
+        serialized exactly once and large base64 strings are never copied
+        through pydantic models.
+        """
         if text_payload is None:
             text_payload = self._strip_binary_fields(result)
-        content.append(
-            types.TextContent(
-                type="text",
-                text=json.dumps(text_payload, ensure_ascii=False)
-            )
-        )
+        content: List[Dict[str, Any]] = [{"type": "text", "text": _encode_json(text_payload)}]
 
         if not include_image_blocks:
             return content
@@ -464,15 +614,15 @@ class MCPImageServerHTTP:
                 if not isinstance(image, dict):
                     continue
                 base64_data = image.get("base64_data")
+                if not base64_data and image.get("image_bytes"):
+                    base64_data = _b64encode(image["image_bytes"])
                 if not base64_data:
                     continue
-                content.append(
-                    types.ImageContent(
-                        type="image",
-                        data=base64_data,
-                        mimeType=image.get("mime_type", "image/jpeg")
-                    )
-                )
+                content.append({
+                    "type": "image",
+                    "data": base64_data,
+                    "mimeType": image.get("mime_type", "image/jpeg")
+                })
 
         return content
 
@@ -523,18 +673,53 @@ class MCPImageServerHTTP:
         except ValueError:
             return False
 
+    def _debug_print(self, message: str, *args) -> None:
+        """Print a per-request trace line; %-style args are only formatted when debug is on."""
+        if self.config.debug:
+            debug_print(message % args if args else message)
+
+    def _begin_generation(self, provider: str) -> None:
+        """Count an in-flight generation and arm the shared progress timer (debug only)."""
+        self._active_generations[provider] += 1
+        if self._progress_handle is None:
+            self._progress_waited = 0
+            self._progress_handle = asyncio.get_running_loop().call_later(
+                self.PROGRESS_INTERVAL, self._report_progress
+            )
+
+    def _end_generation(self, provider: str) -> None:
+        """Uncount a finished generation; the timer stops with the last one."""
+        self._active_generations[provider] -= 1
+        if self._active_generations[provider] <= 0:
+            del self._active_generations[provider]
+        if not self._active_generations and self._progress_handle is not None:
+            self._progress_handle.cancel()
+            self._progress_handle = None
+
+    def _report_progress(self) -> None:
+        """One heartbeat line for all in-flight generations, rescheduled while any remain."""
+        self._progress_waited += self.PROGRESS_INTERVAL
+        active = ", ".join(f"{provider} x{count}" for provider, count in self._active_generations.items())
+        debug_print(f"[Progress] Generating images ({active})... waited {self._progress_waited} seconds")
+        self._progress_handle = asyncio.get_running_loop().call_later(
+            self.PROGRESS_INTERVAL, self._report_progress
+        )
+
+    def _log_exception(self, message: str, error: Exception) -> None:
+        """Log a request failure; the traceback is only formatted in debug mode."""
+        if self.config.debug:
+            logger.exception(message)
+        else:
+            logger.error("%s: %s", message, error)
+
+    def _should_inline_image(self, size_bytes: int) -> bool:
+        """Whether a generated image is small enough to return inline as base64."""
+        limit = self.config.inline_image_max_bytes
+        return limit <= 0 or size_bytes <= limit
+
     def _image_extension_from_mime(self, mime_type: str) -> str:
         """Infer filename extension from image MIME type."""
-        mime = (mime_type or "").lower()
-        extension_map = {
-            "image/jpeg": "jpg",
-            "image/jpg": "jpg",
-            "image/png": "png",
-            "image/webp": "webp",
-            "image/gif": "gif",
-            "image/bmp": "bmp"
-        }
-        return extension_map.get(mime, "img")
+        return self.IMAGE_EXTENSIONS_BY_MIME.get((mime_type or "").lower(), "img")
 
     def _resolve_public_base_url(self) -> Optional[str]:
         """
@@ -617,19 +802,7 @@ class MCPImageServerHTTP:
 
     def _summarize_provider_models(self) -> Dict[str, Any]:
         """Return active provider model mapping for diagnostics."""
-        summary: Dict[str, Any] = {}
-        openai_provider = self.provider_manager.get_provider("openai")
-        if openai_provider:
-            summary["openai"] = {
-                "model": getattr(openai_provider, "model", None)
-            }
-        doubao_provider = self.provider_manager.get_provider("doubao")
-        if doubao_provider:
-            summary["doubao"] = {
-                "model": getattr(doubao_provider, "model", None),
-                "fallback_model": getattr(doubao_provider, "fallback_model", None)
-            }
-        return summary
+        return self.provider_manager.get_provider_models()
 
     async def _reload_config(self, dotenv_override: bool = True) -> Dict[str, Any]:
         """Reload runtime configuration and provider models without process restart."""
@@ -688,6 +861,8 @@ class MCPImageServerHTTP:
 
             self.config = new_config
             self.provider_manager = new_provider_manager
+            self._prompt_catalog_text = None
+            self._prompt_results.clear()
 
             debug_print(
                 "[INFO] Runtime config reloaded. "
@@ -799,7 +974,8 @@ class MCPImageServerHTTP:
             )
 
         try:
-            encoded = base64.b64encode(file_path.read_bytes()).decode("ascii")
+            # Up to get_image_data_max_bytes of disk I/O plus encoding; keep it off the event loop.
+            encoded = await asyncio.to_thread(_read_image_base64, file_path)
         except Exception as e:
             return self._build_tool_error_result(
                 code="read_failed",
@@ -833,10 +1009,10 @@ class MCPImageServerHTTP:
         moderation: str = "",
     ) -> Dict[str, Any]:
         """Generate image using provider APIs."""
-        debug_print(
-            f"generate_image called: prompt={prompt}, provider={provider}, style={style}, "
-            f"resolution={resolution}, background={background}, output_format={output_format}, "
-            f"output_compression={output_compression}, moderation={moderation}"
+        self._debug_print(
+            "generate_image called: prompt=%s, provider=%s, style=%s, resolution=%s, background=%s, "
+            "output_format=%s, output_compression=%s, moderation=%s",
+            prompt, provider, style, resolution, background, output_format, output_compression, moderation
         )
 
         # Parse provider from style/resolution if not explicitly specified
@@ -845,15 +1021,16 @@ class MCPImageServerHTTP:
         actual_resolution = resolution
 
         # Parse provider:style format
-        if ":" in style and not actual_provider:
-            provider_from_style, actual_style = style.split(":", 1)
-            actual_provider = provider_from_style
+        if not actual_provider:
+            provider_from_style, sep, style_name = style.partition(":")
+            if sep:
+                actual_provider, actual_style = provider_from_style, style_name
 
         # Parse provider:resolution format
-        if ":" in resolution and not actual_provider:
-            provider_from_res, actual_resolution = resolution.split(":", 1)
-            if not actual_provider:
-                actual_provider = provider_from_res
+        if not actual_provider:
+            provider_from_res, sep, resolution_name = resolution.partition(":")
+            if sep:
+                actual_provider, actual_resolution = provider_from_res, resolution_name
 
         # Use default provider if none specified
         if not actual_provider:
@@ -883,10 +1060,13 @@ class MCPImageServerHTTP:
                 }
             )
 
+        available_styles = provider_instance.get_available_styles()
+        available_resolutions = provider_instance.get_available_resolutions()
+
         #  Validate style
         if actual_style and not provider_instance.validate_style(actual_style):
-            available_styles = provider_instance.get_available_styles()
-            error_text = f"Invalid style '{actual_style}' for provider '{actual_provider}'. Available styles: {list(available_styles.keys())}"
+            style_names = list(available_styles)
+            error_text = f"Invalid style '{actual_style}' for provider '{actual_provider}'. Available styles: {style_names}"
             debug_print(f"[ERROR] {error_text}")
             return self._build_tool_error_result(
                 code="invalid_style",
@@ -894,14 +1074,14 @@ class MCPImageServerHTTP:
                 details={
                     "provider": actual_provider,
                     "style": actual_style,
-                    "available_styles": list(available_styles.keys())
+                    "available_styles": style_names
                 }
             )
 
         # Validate resolution
         if actual_resolution and not provider_instance.validate_resolution(actual_resolution):
-            available_resolutions = provider_instance.get_available_resolutions()
-            error_text = f"Invalid resolution '{actual_resolution}' for provider '{actual_provider}'. Available resolutions: {list(available_resolutions.keys())}"
+            resolution_names = list(available_resolutions)
+            error_text = f"Invalid resolution '{actual_resolution}' for provider '{actual_provider}'. Available resolutions: {resolution_names}"
             debug_print(f"[ERROR] {error_text}")
             return self._build_tool_error_result(
                 code="invalid_resolution",
@@ -909,18 +1089,16 @@ class MCPImageServerHTTP:
                 details={
                     "provider": actual_provider,
                     "resolution": actual_resolution,
-                    "available_resolutions": list(available_resolutions.keys())
+                    "available_resolutions": resolution_names
                 }
             )
 
-        # Set defaults if not provided
+        # Set defaults if not provided (first key, without materializing the key list)
         if not actual_style:
-            default_styles = provider_instance.get_available_styles()
-            actual_style = list(default_styles.keys())[0] if default_styles else "default"
+            actual_style = next(iter(available_styles), "default")
 
         if not actual_resolution:
-            default_resolutions = provider_instance.get_available_resolutions()
-            actual_resolution = list(default_resolutions.keys())[0] if default_resolutions else "1024x1024"
+            actual_resolution = next(iter(available_resolutions), "1024x1024")
 
         openai_options: Dict[str, Any] = {}
         if isinstance(background, str):
@@ -948,22 +1126,19 @@ class MCPImageServerHTTP:
                 }
             )
 
-        debug_print(f"Using provider: {actual_provider}, style: {actual_style}, resolution: {actual_resolution}")
+        self._debug_print(
+            "Using provider: %s, style: %s, resolution: %s", actual_provider, actual_style, actual_resolution
+        )
 
         try:
-            # Progress tracking
-            async def print_progress():
-                count = 0
-                while True:
-                    count += 1
-                    debug_print(f"[Progress] Generating image with {actual_provider}... waited {count*5} seconds")
-                    await asyncio.sleep(5)
-
-            progress_task = asyncio.create_task(print_progress())
+            # Progress tracking (debug only) through the shared heartbeat timer
+            track_progress = self.config.debug
+            if track_progress:
+                self._begin_generation(actual_provider)
 
             try:
                 # Call image generation
-                debug_print(f"Calling {actual_provider} provider...")
+                self._debug_print("Calling %s provider...", actual_provider)
                 result = await self.provider_manager.generate_images(
                     query=prompt,
                     provider_name=actual_provider,
@@ -973,14 +1148,7 @@ class MCPImageServerHTTP:
                     **openai_options,
                 )
 
-                # Cancel progress task
-                progress_task.cancel()
-                try:
-                    await progress_task
-                except asyncio.CancelledError:
-                    pass
-
-                debug_print(f"Image generation completed, result type: {type(result)}")
+                self._debug_print("Image generation completed, result type: %s", type(result))
 
                 # Check result
                 if not result or len(result) == 0:
@@ -1000,29 +1168,30 @@ class MCPImageServerHTTP:
                         details={"provider": actual_provider}
                     )
 
-                # Check image content
-                if "content" in result[0]:
-                    # Base64 encoded image
-                    image_data = result[0]["content"]
+                # Check image content: raw bytes, or a base64 string
+                if "content_bytes" in result[0] or "content" in result[0]:
+                    image_data = result[0].get("content")
+                    image_data_bytes = result[0].get("content_bytes")
                     image_mime_type = result[0].get("content_type", "image/jpeg")
 
-                    try:
-                        # Decode image first so errors are explicit and size is available.
-                        image_data_bytes = base64.b64decode(image_data)
-                    except Exception as e:
-                        error_msg = f"Failed to decode image content: {str(e)}"
-                        debug_print(f"[ERROR] {error_msg}")
-                        return self._build_tool_error_result(
-                            code="decode_failed",
-                            message=error_msg,
-                            details={"provider": actual_provider}
-                        )
+                    if image_data_bytes is None:
+                        try:
+                            # Decode image first so errors are explicit and size is available.
+                            image_data_bytes = binascii.a2b_base64(image_data)
+                        except Exception as e:
+                            error_msg = f"Failed to decode image content: {str(e)}"
+                            debug_print(f"[ERROR] {error_msg}")
+                            return self._build_tool_error_result(
+                                code="decode_failed",
+                                message=error_msg,
+                                details={"provider": actual_provider}
+                            )
 
                     # Build filename using MIME type.
                     timestamp = int(time.time())
                     extension = self._image_extension_from_mime(image_mime_type)
                     if file_prefix:
-                        safe_prefix = "".join(c if c.isalnum() or c == "_" else "_" for c in file_prefix)
+                        safe_prefix = _UNSAFE_PREFIX_CHARS.sub("_", file_prefix)
                         filename = f"{safe_prefix}_{actual_provider}_{timestamp}.{extension}"
                     else:
                         filename = f"img_{actual_provider}_{timestamp}.{extension}"
@@ -1033,15 +1202,21 @@ class MCPImageServerHTTP:
                     save_error: Optional[str] = None
 
                     try:
-                        save_dir.mkdir(parents=True, exist_ok=True)
-                        with open(file_path, "wb") as f:
-                            f.write(image_data_bytes)
-                        local_path = str(file_path.resolve())
-                        debug_print(f"Image successfully saved to {local_path}")
+                        # Disk I/O runs in a worker thread so other requests keep being served.
+                        local_path = await asyncio.to_thread(_write_image_file, file_path, image_data_bytes)
+                        self._debug_print("Image successfully saved to %s", local_path)
                     except Exception as e:
                         save_error = str(e)
                         debug_print(f"[ERROR] Failed to save image to disk: {save_error}")
 
+                    size_bytes = len(image_data_bytes)
+                    if local_path and not self._should_inline_image(size_bytes):
+                        # Large saved images are referenced by local_path/url instead of inline base64.
+                        image_data = None
+                        inline_bytes = None
+                    else:
+                        inline_bytes = image_data_bytes if image_data is None else None
+
                     image_info = {
                         "id": f"img_{actual_provider}_{timestamp}",
                         "provider": actual_provider,
@@ -1049,9 +1224,11 @@ class MCPImageServerHTTP:
                         "file_name": filename if local_path else None,
                         "local_path": local_path,
                         "url": self._build_public_image_url(filename) if local_path else None,
-                        "size_bytes": len(image_data_bytes),
-                        # Internal field used to build ImageContent, stripped from structured output.
+                        "size_bytes": size_bytes,
+                        # Internal fields used to build ImageContent, stripped from structured output.
+                        # Raw bytes are only base64-encoded when the image block is built.
                         "base64_data": image_data,
+                        "image_bytes": inline_bytes,
                         "revised_prompt": result[0].get("revised_prompt"),
                         "save_error": save_error
                     }
@@ -1066,12 +1243,11 @@ class MCPImageServerHTTP:
                         details={"provider": actual_provider}
                     )
             finally:
-                if not progress_task.done():
-                    progress_task.cancel()
+                if track_progress:
+                    self._end_generation(actual_provider)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc(file=sys.stderr)
+            self._log_exception("Image generation failed", e)
             error_msg = f"Exception during image generation: {str(e)}"
             return self._build_tool_error_result(
                 code="internal_error",
@@ -1103,26 +1279,18 @@ class MCPImageServerHTTP:
 
     async def _read_resource(self, uri: str) -> str:
         """Read resource content by URI."""
-        debug_print(f"Reading resource: {uri}")
+        self._debug_print("Reading resource: %s", uri)
 
-        if uri == "providers://list":
-            providers = self.provider_manager.get_available_providers()
-            return json.dumps(providers, ensure_ascii=False, indent=2)
+        getter_name = self.STATIC_RESOURCE_GETTERS.get(uri)
+        if getter_name is not None:
+            return _encode_pretty_json(getattr(self.provider_manager, getter_name)())
 
-        elif uri == "styles://list":
-            styles = self.provider_manager.get_all_styles()
-            return json.dumps(styles, ensure_ascii=False, indent=2)
-
-        elif uri == "resolutions://list":
-            resolutions = self.provider_manager.get_all_resolutions()
-            return json.dumps(resolutions, ensure_ascii=False, indent=2)
-
-        elif uri.startswith("styles://provider/"):
+        if uri.startswith("styles://provider/"):
             provider_name = uri.replace("styles://provider/", "")
             provider = self.provider_manager.get_provider(provider_name)
             if provider:
                 styles = provider.get_available_styles()
-                return json.dumps(styles, ensure_ascii=False, indent=2)
+                return _encode_pretty_json(styles)
             else:
                 raise ValueError(f"Provider '{provider_name}' not found")
 
@@ -1131,7 +1299,7 @@ class MCPImageServerHTTP:
             provider = self.provider_manager.get_provider(provider_name)
             if provider:
                 resolutions = provider.get_available_resolutions()
-                return json.dumps(resolutions, ensure_ascii=False, indent=2)
+                return _encode_pretty_json(resolutions)
             else:
                 raise ValueError(f"Provider '{provider_name}' not found")
 
@@ -1174,10 +1342,20 @@ class MCPImageServerHTTP:
             )
         ]
 
+    def _get_prompt_catalog_text(self) -> str:
+        """Return the providers/styles/resolutions block of the prompt, serialized once per provider set."""
+        if self._prompt_catalog_text is None:
+            self._prompt_catalog_text = (
+                f"Available Providers: {self.provider_manager.get_available_providers()}\n\n"
+                f"Available Styles by Provider:\n{_encode_pretty_json(self.provider_manager.get_all_styles())}\n\n"
+                f"Available Resolutions by Provider:\n{_encode_pretty_json(self.provider_manager.get_all_resolutions())}"
+            )
+        return self._prompt_catalog_text
+
     async def _get_prompt(
         self,
         name: str,
-        arguments: dict
+        arguments: Mapping[str, Any]
     ) -> types.GetPromptResult:
         """Get prompt template by name."""
         if name == "image_generation_prompt":
@@ -1188,8 +1366,6 @@ class MCPImageServerHTTP:
             file_prefix = arguments.get("file_prefix", "")
 
             available_providers = self.provider_manager.get_available_providers()
-            all_styles = self.provider_manager.get_all_styles()
-            all_resolutions = self.provider_manager.get_all_resolutions()
 
             provider_text = f"Provider: {provider}" if provider else f"Provider: Auto-select from {available_providers}"
             style_text = f"Style: {style}" if style else "Style: Default for selected provider"
@@ -1206,13 +1382,7 @@ Description: {description}
 Save Path: {self.config.image_save_dir}
 {prefix_text}
 
-Available Providers: {available_providers}
-
-Available Styles by Provider:
-{json.dumps(all_styles, ensure_ascii=False, indent=2)}
-
-Available Resolutions by Provider:
-{json.dumps(all_resolutions, ensure_ascii=False, indent=2)}
+{self._get_prompt_catalog_text()}
 
 You can use the generate_image tool to generate this image and save it.
 You can specify provider:style or provider:resolution format, or let the system auto-select.
@@ -1249,54 +1419,17 @@ You can specify provider:style or provider:resolution format, or let the system
         params = message.get("params", {})
         request_id = message.get("id")
 
-        debug_print(f"[JSON-RPC] Method: {method}, ID: {request_id}")
+        self._debug_print("[JSON-RPC] Method: %s, ID: %s", method, request_id)
+
+        # A non-string method (e.g. a list) is unhashable; treat it as unknown instead of raising.
+        handler = self._rpc_handlers.get(method) if isinstance(method, str) else None
+        if handler is None:
+            # Client mistake, not a server failure: answer without raising or logging an error.
+            logger.debug("Unknown JSON-RPC method: %s", method)
+            return _jsonrpc_error(request_id, f"Unknown method: {method}")
 
         try:
-            # Route to appropriate handler
-            if method == "initialize":
-                result = await self._handle_initialize(params)
-            elif method == "tools/list":
-                tools = await self._list_tools()
-                result = {"tools": [tool.model_dump(mode='json') for tool in tools]}
-            elif method == "tools/call":
-                tool_name = params.get("name")
-                tool_arguments = params.get("arguments", {})
-                structured_result = await self._call_tool_structured(tool_name, tool_arguments)
-                safe_structured_result = self._build_structured_payload_for_tool(tool_name, structured_result)
-                include_image_blocks = tool_name != "get_image_data"
-                content_result = self._tool_result_to_content(
-                    structured_result,
-                    text_payload=safe_structured_result,
-                    include_image_blocks=include_image_blocks
-                )
-                result = {
-                    "content": [c.model_dump(mode="json") for c in content_result],
-                    "structuredContent": safe_structured_result,
-                    "isError": not safe_structured_result.get("ok", False)
-                }
-            elif method == "resources/list":
-                resources = await self._list_resources()
-                result = {"resources": [r.model_dump(mode='json') for r in resources]}
-            elif method == "resources/read":
-                uri = params.get("uri")
-                content = await self._read_resource(uri)
-                result = {
-                    "contents": [{
-                        "uri": uri,
-                        "mimeType": "application/json",
-                        "text": content
-                    }]
-                }
-            elif method == "prompts/list":
-                prompts = await self._list_prompts()
-                result = {"prompts": [p.model_dump(mode='json') for p in prompts]}
-            elif method == "prompts/get":
-                prompt_name = params.get("name")
-                prompt_arguments = params.get("arguments", {})
-                prompt_result = await self._get_prompt(prompt_name, prompt_arguments)
-                result = prompt_result.model_dump(mode='json')
-            else:
-                raise ValueError(f"Unknown method: {method}")
+            result = await handler(params)
 
             # Return success response
             return {
@@ -1306,42 +1439,106 @@ You can specify provider:style or provider:resolution format, or let the system
             }
 
         except Exception as e:
-            debug_print(f"[JSON-RPC] Error: {e}")
-            import traceback
-            traceback.print_exc(file=sys.stderr)
+            self._log_exception(f"JSON-RPC {method} failed", e)
+            return _jsonrpc_error(request_id, str(e))
+
+    async def _rpc_list_tools(self, params: Dict[str, Any]) -> PreEncodedJSON:
+        """Handle tools/list."""
+        return await self._get_list_result("tools/list", "tools", self._list_tools)
+
+    async def _rpc_call_tool(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle tools/call."""
+        tool_name = params.get("name")
+        tool_arguments = params.get("arguments", {})
+        structured_result = await self._call_tool_structured(tool_name, tool_arguments)
+        safe_structured_result = self._build_structured_payload_for_tool(tool_name, structured_result)
+        include_image_blocks = tool_name != "get_image_data"
+        return {
+            "content": self._tool_result_content_blocks(
+                structured_result,
+                text_payload=safe_structured_result,
+                include_image_blocks=include_image_blocks
+            ),
+            "structuredContent": safe_structured_result,
+            "isError": not safe_structured_result.get("ok", False)
+        }
 
-            return {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "error": {
-                    "code": -32603,
-                    "message": str(e)
-                }
-            }
+    async def _rpc_list_resources(self, params: Dict[str, Any]) -> PreEncodedJSON:
+        """Handle resources/list."""
+        return await self._get_list_result("resources/list", "resources", self._list_resources)
+
+    async def _rpc_read_resource(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle resources/read."""
+        uri = params.get("uri")
+        content = await self._read_resource(uri)
+        return {
+            "contents": [{
+                "uri": uri,
+                "mimeType": "application/json",
+                "text": content
+            }]
+        }
+
+    async def _rpc_list_prompts(self, params: Dict[str, Any]) -> PreEncodedJSON:
+        """Handle prompts/list."""
+        return await self._get_list_result("prompts/list", "prompts", self._list_prompts)
 
-    async def _handle_initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+    async def _rpc_get_prompt(self, params: Dict[str, Any]) -> PreEncodedJSON:
+        """Handle prompts/get."""
+        try:
+            prompt_name = params["name"]
+        except KeyError:
+            raise ValueError("Missing prompt name") from None
+        prompt_arguments = params.get("arguments") or _EMPTY_ARGUMENTS
+
+        cache_key = _prompt_cache_key(prompt_name, prompt_arguments)
+        if cache_key is not None:
+            cached = self._prompt_results.get(cache_key)
+            if cached is not None:
+                self._prompt_results.move_to_end(cache_key)
+                return cached
+
+        prompt_result = await self._get_prompt(prompt_name, prompt_arguments)
+        # Serialized once by pydantic-core; the HTTP handler splices the bytes into the envelope.
+        payload = PreEncodedJSON(prompt_result.model_dump_json().encode("utf-8"))
+
+        if cache_key is not None:
+            self._prompt_results[cache_key] = payload
+            if len(self._prompt_results) > self.PROMPT_RESULT_CACHE_SIZE:
+                self._prompt_results.popitem(last=False)
+        return payload
+
+    async def _handle_initialize(self, params: Dict[str, Any]) -> PreEncodedJSON:
         """Handle initialize handshake."""
-        protocol_version = params.get("protocolVersion", "unknown")
-        client_info = params.get("clientInfo", {})
+        self._debug_print(
+            "[Initialize] Protocol: %s, Client: %s",
+            params.get("protocolVersion", "unknown"),
+            params.get("clientInfo", {})
+        )
 
-        debug_print(f"[Initialize] Protocol: {protocol_version}, Client: {client_info}")
+        return _INITIALIZE_RESULT
 
-        return {
-            "protocolVersion": "2024-11-05",
-            "capabilities": {
-                "tools": {},
-                "resources": {},
-                "prompts": {}
-            },
-            "serverInfo": {
-                "name": "multi-api-image-mcp-http",
-                "version": "0.2.0"
-            }
-        }
+    def create_app(self, lifespan: Optional[Callable[[Starlette], AsyncContextManager[None]]] = None) -> Starlette:
+        """
+        Create Starlette application with routes and middleware.
 
-    def create_app(self) -> Starlette:
-        """Create Starlette application with routes and middleware."""
-        middleware_whitelist_paths = ["/health", "/images*"]
+        Args:
+            lifespan: Optional lifespan context manager run around the app's lifetime
+        """
+        # Origin validation (a bare "*" allows every origin, so it is skipped) and
+        # Bearer token authentication share one ASGI layer and one header scan.
+        # The guard is attached to the MCP routes only, so /health probes and
+        # /images downloads never enter it.
+        guard = []
+        check_origins = bool(self.config.allowed_origins) and "*" not in self.config.allowed_origins
+        if check_origins or self.config.auth_enabled():
+            guard.append(
+                Middleware(
+                    RequestGuardMiddleware,
+                    allowed_origins=self.config.allowed_origins if check_origins else None,
+                    expected_token=self.config.auth_token if self.config.auth_enabled() else None
+                )
+            )
 
         routes = [
             Mount(
@@ -1349,35 +1546,13 @@ You can specify provider:style or provider:resolution format, or let the system
                 app=StaticFiles(directory=str(self.image_save_dir), check_dir=False),
                 name="generated-images"
             ),
-            Route("/mcp/v1/messages", self.http_handler.handle_post, methods=["POST"]),
-            Route("/mcp/v1/messages", self.http_handler.handle_get, methods=["GET"]),
-            Route("/mcp/v1/messages", self.http_handler.handle_delete, methods=["DELETE"]),
+            Route("/mcp/v1/messages", self.http_handler.handle_post, methods=["POST"], middleware=guard),
+            Route("/mcp/v1/messages", self.http_handler.handle_get, methods=["GET"], middleware=guard),
+            Route("/mcp/v1/messages", self.http_handler.handle_delete, methods=["DELETE"], middleware=guard),
             Route("/health", health_check, methods=["GET"]),
         ]
 
-        middleware = []
-
-        # Add origin validation middleware
-        if self.config.allowed_origins:
-            middleware.append(
-                Middleware(
-                    OriginValidationMiddleware,
-                    allowed_origins=self.config.allowed_origins,
-                    whitelist_paths=middleware_whitelist_paths
-                )
-            )
-
-        # Add authentication middleware
-        if self.config.auth_enabled():
-            middleware.append(create_auth_middleware(self.config.auth_token))
-            middleware.append(
-                Middleware(
-                    AuthRequiredMiddleware,
-                    whitelist_paths=middleware_whitelist_paths
-                )
-            )
-
-        return Starlette(routes=routes, middleware=middleware)
+        return Starlette(routes=routes, lifespan=lifespan)
 
     async def start(self) -> None:
         """Start the HTTP server."""
@@ -1408,12 +1583,13 @@ You can specify provider:style or provider:resolution format, or let the system
     async def stop(self) -> None:
         """Stop the HTTP server."""
         await self.session_manager.stop_cleanup_task()
+        await self.provider_manager.aclose()
         debug_print("Server stopped")
 
 
-def run_http_server(config: ServerConfig) -> None:
+def build_http_app(config: ServerConfig) -> Starlette:
     """
-    Run MCP image generation server with HTTP transport.
+    Create the server and its Starlette app with a lifespan that starts and stops the server.
 
     Args:
         config: Server configuration
@@ -1421,26 +1597,88 @@ def run_http_server(config: ServerConfig) -> None:
     # Create server instance
     server = MCPImageServerHTTP(config)
 
-    # Create Starlette app
-    app = server.create_app()
-
-    # Add startup/shutdown handlers
-    @app.on_event("startup")
-    async def startup():
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
         await server.start()
+        try:
+            yield
+        finally:
+            await server.stop()
 
-    @app.on_event("shutdown")
-    async def shutdown():
-        await server.stop()
+    return server.create_app(lifespan=lifespan)
 
-    # Run server
-    uvicorn.run(
-        app,
+
+def create_worker_app() -> Starlette:
+    """App factory for multi-worker mode: each worker process loads its own config and server."""
+    from ..main import configure_logging
+
+    config = load_config()
+    configure_logging(config)
+    return build_http_app(config)
+
+
+def _available_uvicorn_impl(requested: str, module_name: str, setting: str) -> str:
+    """
+    Return the requested uvicorn loop/parser, or "auto" when its optional module is missing.
+
+    uvloop and httptools come from the optional "performance" extra (and uvloop
+    does not exist on Windows); a missing one should not stop the server.
+    """
+    if requested == module_name and importlib.util.find_spec(module_name) is None:
+        logger.warning(
+            "%s=%s but %s is not installed; falling back to 'auto'. "
+            "Install the performance extra to use it",
+            setting, requested, module_name
+        )
+        return "auto"
+    return requested
+
+
+def run_http_server(config: ServerConfig) -> None:
+    """
+    Run MCP image generation server with HTTP transport.
+
+    With http_workers > 1 only the uvicorn options (host, port, loop, ...) are
+    taken from ``config``; each worker process loads its own configuration from
+    the environment/.env, so settings passed in code are not seen by workers.
+
+    Args:
+        config: Server configuration
+    """
+    # Image URLs come from MCP_PUBLIC_BASE_URL, never from forwarded headers,
+    # so uvicorn's proxy-header middleware is left out of the request path.
+    uvicorn_options = dict(
         host=config.host,
         port=config.port,
-        log_level=config.log_level.lower()
+        log_level=config.log_level.lower(),
+        loop=_available_uvicorn_impl(config.http_loop, "uvloop", "MCP_HTTP_LOOP"),
+        http=_available_uvicorn_impl(config.http_parser, "httptools", "MCP_HTTP_PARSER"),
+        access_log=config.http_access_log,
+        proxy_headers=False,
+        # Admission control: uvicorn answers 503 above the limit instead of queueing work in Python.
+        limit_concurrency=config.http_max_concurrency or None
     )
 
+    if config.http_workers > 1:
+        # uvicorn needs an import string to spawn workers; every worker re-reads
+        # the environment/.env and builds its own server, sessions and image records.
+        if config != ServerConfig():
+            logger.warning(
+                "MCP_HTTP_WORKERS=%d: the config passed to run_http_server differs from the "
+                "environment/.env; worker processes load their own config and ignore it",
+                config.http_workers
+            )
+        uvicorn.run(
+            f"{__name__}:create_worker_app",
+            factory=True,
+            workers=config.http_workers,
+            **uvicorn_options
+        )
+        return
+
+    # Run server
+    uvicorn.run(build_http_app(config), **uvicorn_options)
+
 
 # Export for convenience
-__all__ = ["MCPImageServerHTTP", "run_http_server"]
+__all__ = ["MCPImageServerHTTP", "build_http_app", "create_worker_app", "run_http_server"]
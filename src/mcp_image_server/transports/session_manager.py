@@ -3,12 +3,13 @@ Session management for MCP HTTP server.
 
 This module provides session management functionality including:
 - Session creation with secure UUIDs
-- Session storage and retrieval (thread-safe)
+- Session storage and retrieval (lock-free on the event loop)
 - Session validation and expiration
 - Automatic cleanup of expired sessions
 """
 
 import asyncio
+import sys
 import time
 import uuid
 from typing import Dict, Optional, Any
@@ -49,7 +50,10 @@ class SessionManager:
     """
     Manages MCP client sessions with automatic expiration and cleanup.
 
-    This class is thread-safe and can be used in concurrent environments.
+    Sessions live in a plain dict owned by the event loop. None of the
+    operations await between reading and writing the dict, so they are atomic
+    with respect to other coroutines and need no lock. The async API is kept
+    so callers do not depend on that detail. Not safe to share across threads.
     """
 
     def __init__(self, timeout: int = 3600, cleanup_interval: int = 300):
@@ -61,7 +65,6 @@ class SessionManager:
             cleanup_interval: Interval between cleanup runs in seconds (default: 5 minutes)
         """
         self._sessions: Dict[str, Session] = {}
-        self._lock = asyncio.Lock()
         self._timeout = timeout
         self._cleanup_interval = cleanup_interval
         self._cleanup_task: Optional[asyncio.Task] = None
@@ -83,9 +86,7 @@ class SessionManager:
             metadata=metadata or {}
         )
 
-        async with self._lock:
-            self._sessions[session_id] = session
-
+        self._sessions[session_id] = session
         return session
 
     async def get_session(self, session_id: str) -> Optional[Session]:
@@ -98,19 +99,18 @@ class SessionManager:
         Returns:
             Optional[Session]: The session if found and not expired, None otherwise
         """
-        async with self._lock:
-            session = self._sessions.get(session_id)
+        session = self._sessions.get(session_id)
 
-            if session is None:
-                return None
+        if session is None:
+            return None
 
-            # Check if session has expired
-            if session.is_expired(self._timeout):
-                # Remove expired session
-                del self._sessions[session_id]
-                return None
+        # Check if session has expired
+        if session.is_expired(self._timeout):
+            # Remove expired session
+            del self._sessions[session_id]
+            return None
 
-            return session
+        return session
 
     async def update_access_time(self, session_id: str) -> bool:
         """
@@ -124,8 +124,7 @@ class SessionManager:
         """
         session = await self.get_session(session_id)
         if session:
-            async with self._lock:
-                session.update_access_time()
+            session.update_access_time()
             return True
         return False
 
@@ -139,11 +138,7 @@ class SessionManager:
         Returns:
             bool: True if session was found and deleted, False otherwise
         """
-        async with self._lock:
-            if session_id in self._sessions:
-                del self._sessions[session_id]
-                return True
-            return False
+        return self._sessions.pop(session_id, None) is not None
 
     async def get_session_count(self) -> int:
         """
@@ -152,8 +147,7 @@ class SessionManager:
         Returns:
             int: Number of active sessions
         """
-        async with self._lock:
-            return len(self._sessions)
+        return len(self._sessions)
 
     async def get_all_sessions(self) -> Dict[str, Session]:
         """
@@ -162,8 +156,7 @@ class SessionManager:
         Returns:
             Dict[str, Session]: Dictionary of all active sessions
         """
-        async with self._lock:
-            return self._sessions.copy()
+        return self._sessions.copy()
 
     async def cleanup_expired_sessions(self) -> int:
         """
@@ -172,15 +165,14 @@ class SessionManager:
         Returns:
             int: Number of sessions that were cleaned up
         """
-        expired_ids = []
-
-        async with self._lock:
-            for session_id, session in self._sessions.items():
-                if session.is_expired(self._timeout):
-                    expired_ids.append(session_id)
+        expired_ids = [
+            session_id
+            for session_id, session in self._sessions.items()
+            if session.is_expired(self._timeout)
+        ]
 
-            for session_id in expired_ids:
-                del self._sessions[session_id]
+        for session_id in expired_ids:
+            del self._sessions[session_id]
 
         return len(expired_ids)
 
@@ -191,7 +183,6 @@ class SessionManager:
                 await asyncio.sleep(self._cleanup_interval)
                 cleaned_count = await self.cleanup_expired_sessions()
                 if cleaned_count > 0:
-                    import sys
                     print(
                         f"Session cleanup: Removed {cleaned_count} expired session(s)",
                         file=sys.stderr
@@ -199,7 +190,6 @@ class SessionManager:
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                import sys
                 print(f"Error in session cleanup loop: {e}", file=sys.stderr)
 
     async def start_cleanup_task(self) -> None:
@@ -231,10 +221,9 @@ class SessionManager:
         Returns:
             int: Number of sessions that were cleared
         """
-        async with self._lock:
-            count = len(self._sessions)
-            self._sessions.clear()
-            return count
+        count = len(self._sessions)
+        self._sessions.clear()
+        return count
 
     def __repr__(self) -> str:
         """String representation of the session manager."""
@@ -8,29 +8,112 @@ start quickly and remain compatible with local Codex stdio hosting.
 from __future__ import annotations
 
 import asyncio
-import base64
+import binascii
 import json
+import logging
 import os
+import re
 import sys
 import time
+from collections import Counter
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
 from urllib.parse import quote
 
 from dotenv import load_dotenv
 
 from ..config import ServerConfig
 
+logger = logging.getLogger(__name__)
+
+
+# Internal image fields removed from structured payloads.
+_IMAGE_BYTES_KEYS = ("image_bytes",)
+_BINARY_IMAGE_KEYS = ("image_bytes", "base64_data")
+
+
+# Reused encoder for resource bodies; default=dict serializes read-only mappings.
+_encode_pretty_json = json.JSONEncoder(ensure_ascii=False, indent=2, default=dict).encode
+
+
+# Anything str.isalnum() rejects, except "_", is replaced in filename prefixes.
+_UNSAFE_PREFIX_CHARS = re.compile(r"\W")
+
+
+# The initialize result does not depend on the request; shared, never mutated.
+_INITIALIZE_RESULT: Dict[str, Any] = {
+    "protocolVersion": "2024-11-05",
+    "capabilities": {
+        "tools": {},
+        "resources": {},
+        "prompts": {},
+    },
+    "serverInfo": {
+        "name": "multi-api-image-mcp-stdio",
+        "version": "0.2.0",
+    },
+}
+
+
+def _b64encode(data: bytes) -> str:
+    """Base64-encode image bytes straight through binascii (no newline, no base64-module wrapper)."""
+    return binascii.b2a_base64(data, newline=False).decode("ascii")
+
+
+def _read_image_base64(file_path: Path) -> str:
+    """Read an image file and return its bytes as base64 text."""
+    return _b64encode(file_path.read_bytes())
+
+
+def _write_image_file(file_path: Path, data: bytes) -> str:
+    """Create the parent directory, write the image and return its resolved path."""
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_bytes(data)
+    return str(file_path.resolve())
+
 
 def debug_print(*args, **kwargs) -> None:
     """Print debug messages to stderr."""
     print(*args, file=sys.stderr, flush=True, **kwargs)
 
 
+# Shared read-only stand-in for omitted prompt arguments.
+_EMPTY_ARGUMENTS: Mapping[str, Any] = MappingProxyType({})
+
+
+def _jsonrpc_error(request_id: Any, message: str) -> Dict[str, Any]:
+    """Build a JSON-RPC internal-error response."""
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {
+            "code": -32603,
+            "message": message,
+        },
+    }
+
+
 class MCPImageServerStdio:
     """MCP image generation server over raw stdio JSON-RPC."""
 
     TOOL_RESULT_VERSION = "1.0"
+    IMAGE_EXTENSIONS_BY_MIME = {
+        "image/jpeg": "jpg",
+        "image/jpg": "jpg",
+        "image/png": "png",
+        "image/webp": "webp",
+        "image/gif": "gif",
+        "image/bmp": "bmp",
+    }
+    # Seconds between debug progress lines while images are generating
+    PROGRESS_INTERVAL = 5
+    # Resource URIs served straight from a ProviderManager accessor
+    STATIC_RESOURCE_GETTERS = {
+        "providers://list": "get_available_providers",
+        "styles://list": "get_all_styles",
+        "resolutions://list": "get_all_resolutions",
+    }
     RELOADABLE_CONFIG_FIELDS = frozenset(
         {
             "tencent_secret_id",
@@ -38,6 +121,9 @@ class MCPImageServerStdio:
             "openai_api_key",
             "openai_base_url",
             "openai_model",
+            "openai_max_retries",
+            "openai_backoff_max",
+            "openai_cache_size",
             "doubao_api_key",
             "doubao_endpoint",
             "doubao_model",
@@ -46,6 +132,7 @@ class MCPImageServerStdio:
             "public_base_url",
             "image_record_ttl",
             "get_image_data_max_bytes",
+            "inline_image_max_bytes",
         }
     )
 
@@ -54,6 +141,23 @@ class MCPImageServerStdio:
         self.image_save_dir = Path(self.config.image_save_dir).resolve()
         self._image_records: Dict[str, Dict[str, Any]] = {}
         self._provider_manager = None
+        # Debug-only progress heartbeat: one timer shared by all in-flight generations
+        self._active_generations: Counter = Counter()
+        self._progress_handle: Optional[asyncio.TimerHandle] = None
+        self._progress_waited = 0
+        # Static tools/resources/prompts listings, built on first request
+        self._list_payloads: Dict[str, List[Dict[str, Any]]] = {}
+        # JSON-RPC method dispatch table
+        self._rpc_handlers = {
+            "initialize": self._rpc_initialize,
+            "ping": self._rpc_ping,
+            "tools/list": self._rpc_list_tools,
+            "tools/call": self._rpc_call_tool,
+            "resources/list": self._rpc_list_resources,
+            "resources/read": self._rpc_read_resource,
+            "prompts/list": self._rpc_list_prompts,
+            "prompts/get": self._rpc_get_prompt,
+        }
 
     @property
     def provider_manager(self):
@@ -192,6 +296,13 @@ class MCPImageServerStdio:
             "required": ["version", "ok", "result", "error"],
         }
 
+    def _get_list_payload(self, method: str, build_payload) -> List[Dict[str, Any]]:
+        """Return the listing for a static list method, building it only once."""
+        payload = self._list_payloads.get(method)
+        if payload is None:
+            payload = self._list_payloads[method] = build_payload()
+        return payload
+
     def _list_tools_payload(self) -> List[Dict[str, Any]]:
         return [
             {
@@ -351,17 +462,14 @@ class MCPImageServerStdio:
 
         images = result.get("images")
         if isinstance(images, list):
+            stripped_keys = _IMAGE_BYTES_KEYS if preserve_base64 else _BINARY_IMAGE_KEYS
             for image in images:
-                if isinstance(image, dict):
-                    payload["images"].append(
-                        {
-                            key: value
-                            for key, value in image.items()
-                            if preserve_base64 or key != "base64_data"
-                        }
-                    )
-                else:
-                    payload["images"].append(image)
+                # Only copy images that actually carry a field to drop.
+                if isinstance(image, dict) and any(key in image for key in stripped_keys):
+                    image = dict(image)
+                    for key in stripped_keys:
+                        image.pop(key, None)
+                payload["images"].append(image)
 
         return payload
 
@@ -396,6 +504,8 @@ class MCPImageServerStdio:
                 if not isinstance(image, dict):
                     continue
                 base64_data = image.get("base64_data")
+                if not base64_data and image.get("image_bytes"):
+                    base64_data = _b64encode(image["image_bytes"])
                 if not base64_data:
                     continue
                 content.append(
@@ -451,17 +561,51 @@ class MCPImageServerStdio:
         except ValueError:
             return False
 
+    def _debug_print(self, message: str, *args) -> None:
+        """Print a per-request trace line; %-style args are only formatted when debug is on."""
+        if self.config.debug:
+            debug_print(message % args if args else message)
+
+    def _begin_generation(self, provider: str) -> None:
+        """Count an in-flight generation and arm the shared progress timer (debug only)."""
+        self._active_generations[provider] += 1
+        if self._progress_handle is None:
+            self._progress_waited = 0
+            self._progress_handle = asyncio.get_running_loop().call_later(
+                self.PROGRESS_INTERVAL, self._report_progress
+            )
+
+    def _end_generation(self, provider: str) -> None:
+        """Uncount a finished generation; the timer stops with the last one."""
+        self._active_generations[provider] -= 1
+        if self._active_generations[provider] <= 0:
+            del self._active_generations[provider]
+        if not self._active_generations and self._progress_handle is not None:
+            self._progress_handle.cancel()
+            self._progress_handle = None
+
+    def _report_progress(self) -> None:
+        """One heartbeat line for all in-flight generations, rescheduled while any remain."""
+        self._progress_waited += self.PROGRESS_INTERVAL
+        active = ", ".join(f"{provider} x{count}" for provider, count in self._active_generations.items())
+        debug_print(f"[Progress] Generating images ({active})... waited {self._progress_waited} seconds")
+        self._progress_handle = asyncio.get_running_loop().call_later(
+            self.PROGRESS_INTERVAL, self._report_progress
+        )
+
+    def _log_exception(self, message: str, error: Exception) -> None:
+        # Formatting a traceback walks every frame and reads source files; only pay for it in debug mode.
+        if self.config.debug:
+            logger.exception(message)
+        else:
+            logger.error("%s: %s", message, error)
+
+    def _should_inline_image(self, size_bytes: int) -> bool:
+        limit = self.config.inline_image_max_bytes
+        return limit <= 0 or size_bytes <= limit
+
     def _image_extension_from_mime(self, mime_type: str) -> str:
-        mime = (mime_type or "").lower()
-        extension_map = {
-            "image/jpeg": "jpg",
-            "image/jpg": "jpg",
-            "image/png": "png",
-            "image/webp": "webp",
-            "image/gif": "gif",
-            "image/bmp": "bmp",
-        }
-        return extension_map.get(mime, "img")
+        return self.IMAGE_EXTENSIONS_BY_MIME.get((mime_type or "").lower(), "img")
 
     def _resolve_public_base_url(self) -> Optional[str]:
         configured = (self.config.public_base_url or "").strip()
@@ -531,17 +675,7 @@ class MCPImageServerStdio:
         }
 
     def _summarize_provider_models(self) -> Dict[str, Any]:
-        summary: Dict[str, Any] = {}
-        openai_provider = self.provider_manager.get_provider("openai")
-        if openai_provider:
-            summary["openai"] = {"model": getattr(openai_provider, "model", None)}
-        doubao_provider = self.provider_manager.get_provider("doubao")
-        if doubao_provider:
-            summary["doubao"] = {
-                "model": getattr(doubao_provider, "model", None),
-                "fallback_model": getattr(doubao_provider, "fallback_model", None),
-            }
-        return summary
+        return self.provider_manager.get_provider_models()
 
     async def _reload_config(self, dotenv_override: bool = True) -> Dict[str, Any]:
         if not isinstance(dotenv_override, bool):
@@ -684,7 +818,8 @@ class MCPImageServerStdio:
             )
 
         try:
-            encoded = base64.b64encode(file_path.read_bytes()).decode("ascii")
+            # Up to get_image_data_max_bytes of disk I/O plus encoding; keep it off the event loop.
+            encoded = await asyncio.to_thread(_read_image_base64, file_path)
         except Exception as e:
             return self._build_tool_error_result(
                 code="read_failed",
@@ -717,24 +852,25 @@ class MCPImageServerStdio:
         output_compression: Optional[int] = None,
         moderation: str = "",
     ) -> Dict[str, Any]:
-        debug_print(
-            f"generate_image called: prompt={prompt}, provider={provider}, style={style}, "
-            f"resolution={resolution}, background={background}, output_format={output_format}, "
-            f"output_compression={output_compression}, moderation={moderation}"
+        self._debug_print(
+            "generate_image called: prompt=%s, provider=%s, style=%s, resolution=%s, background=%s, "
+            "output_format=%s, output_compression=%s, moderation=%s",
+            prompt, provider, style, resolution, background, output_format, output_compression, moderation
         )
 
         actual_provider = provider
         actual_style = style
         actual_resolution = resolution
 
-        if ":" in style and not actual_provider:
-            provider_from_style, actual_style = style.split(":", 1)
-            actual_provider = provider_from_style
+        if not actual_provider:
+            provider_from_style, sep, style_name = style.partition(":")
+            if sep:
+                actual_provider, actual_style = provider_from_style, style_name
 
-        if ":" in resolution and not actual_provider:
-            provider_from_res, actual_resolution = resolution.split(":", 1)
-            if not actual_provider:
-                actual_provider = provider_from_res
+        if not actual_provider:
+            provider_from_res, sep, resolution_name = resolution.partition(":")
+            if sep:
+                actual_provider, actual_resolution = provider_from_res, resolution_name
 
         if not actual_provider:
             actual_provider = self.provider_manager.default_provider
@@ -768,11 +904,14 @@ class MCPImageServerStdio:
                 },
             )
 
+        available_styles = provider_instance.get_available_styles()
+        available_resolutions = provider_instance.get_available_resolutions()
+
         if actual_style and not provider_instance.validate_style(actual_style):
-            available_styles = provider_instance.get_available_styles()
+            style_names = list(available_styles)
             error_text = (
                 f"Invalid style '{actual_style}' for provider '{actual_provider}'. "
-                f"Available styles: {list(available_styles.keys())}"
+                f"Available styles: {style_names}"
             )
             debug_print(f"[ERROR] {error_text}")
             return self._build_tool_error_result(
@@ -781,15 +920,15 @@ class MCPImageServerStdio:
                 details={
                     "provider": actual_provider,
                     "style": actual_style,
-                    "available_styles": list(available_styles.keys()),
+                    "available_styles": style_names,
                 },
             )
 
         if actual_resolution and not provider_instance.validate_resolution(actual_resolution):
-            available_resolutions = provider_instance.get_available_resolutions()
+            resolution_names = list(available_resolutions)
             error_text = (
                 f"Invalid resolution '{actual_resolution}' for provider '{actual_provider}'. "
-                f"Available resolutions: {list(available_resolutions.keys())}"
+                f"Available resolutions: {resolution_names}"
             )
             debug_print(f"[ERROR] {error_text}")
             return self._build_tool_error_result(
@@ -798,17 +937,15 @@ class MCPImageServerStdio:
                 details={
                     "provider": actual_provider,
                     "resolution": actual_resolution,
-                    "available_resolutions": list(available_resolutions.keys()),
+                    "available_resolutions": resolution_names,
                 },
             )
 
         if not actual_style:
-            default_styles = provider_instance.get_available_styles()
-            actual_style = list(default_styles.keys())[0] if default_styles else "default"
+            actual_style = next(iter(available_styles), "default")
 
         if not actual_resolution:
-            default_resolutions = provider_instance.get_available_resolutions()
-            actual_resolution = list(default_resolutions.keys())[0] if default_resolutions else "1024x1024"
+            actual_resolution = next(iter(available_resolutions), "1024x1024")
 
         openai_options: Dict[str, Any] = {}
         if isinstance(background, str):
@@ -836,26 +973,18 @@ class MCPImageServerStdio:
                 },
             )
 
-        debug_print(
-            f"Using provider: {actual_provider}, style: {actual_style}, resolution: {actual_resolution}"
+        self._debug_print(
+            "Using provider: %s, style: %s, resolution: %s", actual_provider, actual_style, actual_resolution
         )
 
         try:
-            progress_task = None
-
-            async def print_progress():
-                count = 0
-                while True:
-                    count += 1
-                    debug_print(
-                        f"[Progress] Generating image with {actual_provider}... waited {count*5} seconds"
-                    )
-                    await asyncio.sleep(5)
-
-            progress_task = asyncio.create_task(print_progress())
+            # Debug-only progress heartbeat through the shared timer; no task per request.
+            track_progress = self.config.debug
+            if track_progress:
+                self._begin_generation(actual_provider)
 
             try:
-                debug_print(f"Calling {actual_provider} provider...")
+                self._debug_print("Calling %s provider...", actual_provider)
                 result = await self.provider_manager.generate_images(
                     query=prompt,
                     provider_name=actual_provider,
@@ -865,12 +994,6 @@ class MCPImageServerStdio:
                     **openai_options,
                 )
 
-                progress_task.cancel()
-                try:
-                    await progress_task
-                except asyncio.CancelledError:
-                    pass
-
                 if not result or len(result) == 0:
                     return self._build_tool_error_result(
                         code="generation_failed",
@@ -886,31 +1009,34 @@ class MCPImageServerStdio:
                         details={"provider": actual_provider},
                     )
 
-                if "content" not in result[0]:
+                if "content_bytes" not in result[0] and "content" not in result[0]:
                     return self._build_tool_error_result(
                         code="missing_content",
                         message="No image content in the generation result",
                         details={"provider": actual_provider},
                     )
 
-                image_data = result[0]["content"]
+                # Providers return raw bytes, or a base64 string
+                image_data = result[0].get("content")
+                image_data_bytes = result[0].get("content_bytes")
                 image_mime_type = result[0].get("content_type", "image/jpeg")
 
-                try:
-                    image_data_bytes = base64.b64decode(image_data)
-                except Exception as e:
-                    error_msg = f"Failed to decode image content: {str(e)}"
-                    debug_print(f"[ERROR] {error_msg}")
-                    return self._build_tool_error_result(
-                        code="decode_failed",
-                        message=error_msg,
-                        details={"provider": actual_provider},
-                    )
+                if image_data_bytes is None:
+                    try:
+                        image_data_bytes = binascii.a2b_base64(image_data)
+                    except Exception as e:
+                        error_msg = f"Failed to decode image content: {str(e)}"
+                        debug_print(f"[ERROR] {error_msg}")
+                        return self._build_tool_error_result(
+                            code="decode_failed",
+                            message=error_msg,
+                            details={"provider": actual_provider},
+                        )
 
                 timestamp = int(time.time())
                 extension = self._image_extension_from_mime(image_mime_type)
                 if file_prefix:
-                    safe_prefix = "".join(c if c.isalnum() or c == "_" else "_" for c in file_prefix)
+                    safe_prefix = _UNSAFE_PREFIX_CHARS.sub("_", file_prefix)
                     filename = f"{safe_prefix}_{actual_provider}_{timestamp}.{extension}"
                 else:
                     filename = f"img_{actual_provider}_{timestamp}.{extension}"
@@ -921,15 +1047,21 @@ class MCPImageServerStdio:
                 save_error: Optional[str] = None
 
                 try:
-                    save_dir.mkdir(parents=True, exist_ok=True)
-                    with open(file_path, "wb") as f:
-                        f.write(image_data_bytes)
-                    local_path = str(file_path.resolve())
-                    debug_print(f"Image successfully saved to {local_path}")
+                    # Disk I/O runs in a worker thread so the event loop stays responsive.
+                    local_path = await asyncio.to_thread(_write_image_file, file_path, image_data_bytes)
+                    self._debug_print("Image successfully saved to %s", local_path)
                 except Exception as e:
                     save_error = str(e)
                     debug_print(f"[ERROR] Failed to save image to disk: {save_error}")
 
+                size_bytes = len(image_data_bytes)
+                if local_path and not self._should_inline_image(size_bytes):
+                    # Large saved images are referenced by local_path/url instead of inline base64.
+                    image_data = None
+                    inline_bytes = None
+                else:
+                    inline_bytes = image_data_bytes if image_data is None else None
+
                 image_info = {
                     "id": f"img_{actual_provider}_{timestamp}",
                     "provider": actual_provider,
@@ -937,8 +1069,10 @@ class MCPImageServerStdio:
                     "file_name": filename if local_path else None,
                     "local_path": local_path,
                     "url": self._build_public_image_url(filename) if local_path else None,
-                    "size_bytes": len(image_data_bytes),
+                    "size_bytes": size_bytes,
+                    # Raw bytes are only base64-encoded when the image block is built.
                     "base64_data": image_data,
+                    "image_bytes": inline_bytes,
                     "revised_prompt": result[0].get("revised_prompt"),
                     "save_error": save_error,
                 }
@@ -946,12 +1080,10 @@ class MCPImageServerStdio:
                     self._register_image_record(image_info)
                 return self._build_tool_success_result(images=[image_info])
             finally:
-                if progress_task is not None and not progress_task.done():
-                    progress_task.cancel()
+                if track_progress:
+                    self._end_generation(actual_provider)
         except Exception as e:
-            import traceback
-
-            traceback.print_exc(file=sys.stderr)
+            self._log_exception("Image generation failed", e)
             return self._build_tool_error_result(
                 code="internal_error",
                 message=f"Exception during image generation: {str(e)}",
@@ -980,26 +1112,20 @@ class MCPImageServerStdio:
         ]
 
     def _read_resource_content(self, uri: str) -> str:
-        if uri == "providers://list":
-            providers = self.provider_manager.get_available_providers()
-            return json.dumps(providers, ensure_ascii=False, indent=2)
-        if uri == "styles://list":
-            styles = self.provider_manager.get_all_styles()
-            return json.dumps(styles, ensure_ascii=False, indent=2)
-        if uri == "resolutions://list":
-            resolutions = self.provider_manager.get_all_resolutions()
-            return json.dumps(resolutions, ensure_ascii=False, indent=2)
+        getter_name = self.STATIC_RESOURCE_GETTERS.get(uri)
+        if getter_name is not None:
+            return _encode_pretty_json(getattr(self.provider_manager, getter_name)())
         if uri.startswith("styles://provider/"):
             provider_name = uri.replace("styles://provider/", "")
             provider = self.provider_manager.get_provider(provider_name)
             if provider:
-                return json.dumps(provider.get_available_styles(), ensure_ascii=False, indent=2)
+                return _encode_pretty_json(provider.get_available_styles())
             raise ValueError(f"Provider '{provider_name}' not found")
         if uri.startswith("resolutions://provider/"):
             provider_name = uri.replace("resolutions://provider/", "")
             provider = self.provider_manager.get_provider(provider_name)
             if provider:
-                return json.dumps(provider.get_available_resolutions(), ensure_ascii=False, indent=2)
+                return _encode_pretty_json(provider.get_available_resolutions())
             raise ValueError(f"Provider '{provider_name}' not found")
         raise ValueError(f"Unknown resource URI: {uri}")
 
@@ -1018,7 +1144,7 @@ class MCPImageServerStdio:
             }
         ]
 
-    def _get_prompt_payload(self, name: str, arguments: dict) -> Dict[str, Any]:
+    def _get_prompt_payload(self, name: str, arguments: Mapping[str, Any]) -> Dict[str, Any]:
         if name != "image_generation_prompt":
             raise ValueError(f"Unknown prompt: {name}")
 
@@ -1050,10 +1176,10 @@ Save Path: {self.config.image_save_dir}
 Available Providers: {available_providers}
 
 Available Styles by Provider:
-{json.dumps(all_styles, ensure_ascii=False, indent=2)}
+{json.dumps(all_styles, ensure_ascii=False, indent=2, default=dict)}
 
 Available Resolutions by Provider:
-{json.dumps(all_resolutions, ensure_ascii=False, indent=2)}
+{json.dumps(all_resolutions, ensure_ascii=False, indent=2, default=dict)}
 
 You can use the generate_image tool to generate this image and save it.
 You can specify provider:style or provider:resolution format, or let the system auto-select.
@@ -1073,21 +1199,12 @@ You can specify provider:style or provider:resolution format, or let the system
         }
 
     def _handle_initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        protocol_version = params.get("protocolVersion", "unknown")
-        client_info = params.get("clientInfo", {})
-        debug_print(f"[Initialize] Protocol: {protocol_version}, Client: {client_info}")
-        return {
-            "protocolVersion": "2024-11-05",
-            "capabilities": {
-                "tools": {},
-                "resources": {},
-                "prompts": {},
-            },
-            "serverInfo": {
-                "name": "multi-api-image-mcp-stdio",
-                "version": "0.2.0",
-            },
-        }
+        self._debug_print(
+            "[Initialize] Protocol: %s, Client: %s",
+            params.get("protocolVersion", "unknown"),
+            params.get("clientInfo", {}),
+        )
+        return _INITIALIZE_RESULT
 
     async def _handle_json_rpc(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         method = message.get("method")
@@ -1097,51 +1214,15 @@ You can specify provider:style or provider:resolution format, or let the system
         if method == "notifications/initialized":
             return None
 
+        # A non-string method (e.g. a list) is unhashable; treat it as unknown instead of raising.
+        handler = self._rpc_handlers.get(method) if isinstance(method, str) else None
+        if handler is None:
+            # Client mistake, not a server failure: answer without raising or logging an error.
+            logger.debug("Unknown JSON-RPC method: %s", method)
+            return _jsonrpc_error(request_id, f"Unknown method: {method}")
+
         try:
-            if method == "initialize":
-                result = self._handle_initialize(params)
-            elif method == "ping":
-                result = {}
-            elif method == "tools/list":
-                result = {"tools": self._list_tools_payload()}
-            elif method == "tools/call":
-                tool_name = params.get("name")
-                tool_arguments = params.get("arguments", {})
-                structured_result = await self._call_tool_structured(tool_name, tool_arguments)
-                safe_structured_result = self._build_structured_payload_for_tool(tool_name, structured_result)
-                include_image_blocks = tool_name != "get_image_data"
-                content_result = self._tool_result_to_content(
-                    structured_result,
-                    text_payload=safe_structured_result,
-                    include_image_blocks=include_image_blocks,
-                )
-                result = {
-                    "content": content_result,
-                    "structuredContent": safe_structured_result,
-                    "isError": not safe_structured_result.get("ok", False),
-                }
-            elif method == "resources/list":
-                result = {"resources": self._list_resources_payload()}
-            elif method == "resources/read":
-                uri = params.get("uri")
-                content = self._read_resource_content(uri)
-                result = {
-                    "contents": [
-                        {
-                            "uri": uri,
-                            "mimeType": "application/json",
-                            "text": content,
-                        }
-                    ]
-                }
-            elif method == "prompts/list":
-                result = {"prompts": self._list_prompts_payload()}
-            elif method == "prompts/get":
-                prompt_name = params.get("name")
-                prompt_arguments = params.get("arguments", {})
-                result = self._get_prompt_payload(prompt_name, prompt_arguments)
-            else:
-                raise ValueError(f"Unknown method: {method}")
+            result = await handler(params)
 
             return {
                 "jsonrpc": "2.0",
@@ -1149,18 +1230,61 @@ You can specify provider:style or provider:resolution format, or let the system
                 "result": result,
             }
         except Exception as e:
-            debug_print(f"[JSON-RPC] Error: {e}")
-            import traceback
+            self._log_exception(f"JSON-RPC {method} failed", e)
+            return _jsonrpc_error(request_id, str(e))
+
+    async def _rpc_initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self._handle_initialize(params)
+
+    async def _rpc_ping(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {}
+
+    async def _rpc_list_tools(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"tools": self._get_list_payload("tools/list", self._list_tools_payload)}
+
+    async def _rpc_call_tool(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        tool_name = params.get("name")
+        tool_arguments = params.get("arguments", {})
+        structured_result = await self._call_tool_structured(tool_name, tool_arguments)
+        safe_structured_result = self._build_structured_payload_for_tool(tool_name, structured_result)
+        include_image_blocks = tool_name != "get_image_data"
+        content_result = self._tool_result_to_content(
+            structured_result,
+            text_payload=safe_structured_result,
+            include_image_blocks=include_image_blocks,
+        )
+        return {
+            "content": content_result,
+            "structuredContent": safe_structured_result,
+            "isError": not safe_structured_result.get("ok", False),
+        }
 
-            traceback.print_exc(file=sys.stderr)
-            return {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "error": {
-                    "code": -32603,
-                    "message": str(e),
-                },
-            }
+    async def _rpc_list_resources(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"resources": self._get_list_payload("resources/list", self._list_resources_payload)}
+
+    async def _rpc_read_resource(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        uri = params.get("uri")
+        content = self._read_resource_content(uri)
+        return {
+            "contents": [
+                {
+                    "uri": uri,
+                    "mimeType": "application/json",
+                    "text": content,
+                }
+            ]
+        }
+
+    async def _rpc_list_prompts(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"prompts": self._get_list_payload("prompts/list", self._list_prompts_payload)}
+
+    async def _rpc_get_prompt(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            prompt_name = params["name"]
+        except KeyError:
+            raise ValueError("Missing prompt name") from None
+        prompt_arguments = params.get("arguments") or _EMPTY_ARGUMENTS
+        return self._get_prompt_payload(prompt_name, prompt_arguments)
 
     def serve_forever(self) -> None:
         debug_print("=" * 50)
@@ -1171,23 +1295,32 @@ You can specify provider:style or provider:resolution format, or let the system
         debug_print("Provider manager: lazy initialization")
         debug_print("=" * 50)
 
-        for line in sys.stdin:
-            line = line.strip()
-            if not line:
-                continue
+        # One event loop for the whole session so pooled provider clients stay usable
+        # across messages (asyncio.run per line would close their loop every time).
+        loop = asyncio.new_event_loop()
+        try:
+            for line in sys.stdin:
+                line = line.strip()
+                if not line:
+                    continue
 
-            try:
-                message = json.loads(line)
-            except json.JSONDecodeError as exc:
-                debug_print(f"[STDIO] Invalid JSON-RPC line: {exc}")
-                continue
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError as exc:
+                    debug_print(f"[STDIO] Invalid JSON-RPC line: {exc}")
+                    continue
 
-            response = asyncio.run(self._handle_json_rpc(message))
-            if response is None:
-                continue
+                response = loop.run_until_complete(self._handle_json_rpc(message))
+                if response is None:
+                    continue
 
-            sys.stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
-            sys.stdout.flush()
+                sys.stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+                sys.stdout.flush()
+        finally:
+            if self._provider_manager is not None:
+                loop.run_until_complete(self._provider_manager.aclose())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
 
         debug_print("Server stopped")
 
@@ -0,0 +1,87 @@
+import sys
+import unittest
+from pathlib import Path
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from mcp_image_server.transports.auth import RequestGuardMiddleware
+
+
+class RequestGuardMiddlewareTests(unittest.TestCase):
+    def _build_client(self, **guard_kwargs) -> TestClient:
+        async def ok(request):
+            return PlainTextResponse("ok")
+
+        app = Starlette(
+            routes=[
+                Route("/mcp/v1/messages", ok),
+                Route("/health", ok),
+                Route("/images/{name}", ok),
+            ],
+            middleware=[Middleware(RequestGuardMiddleware, whitelist_paths=["/health", "/images*"], **guard_kwargs)],
+        )
+        return TestClient(app)
+
+    def test_missing_or_wrong_token_is_rejected_with_401(self):
+        client = self._build_client(expected_token="secret-token")
+
+        missing = client.get("/mcp/v1/messages")
+        wrong = client.get("/mcp/v1/messages", headers={"Authorization": "Bearer wrong-token"})
+        not_bearer = client.get("/mcp/v1/messages", headers={"Authorization": "Basic secret-token"})
+        tab_separated = client.get("/mcp/v1/messages", headers={"Authorization": "Bearer\tsecret-token"})
+
+        for response in (missing, wrong, not_bearer, tab_separated):
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(response.headers["www-authenticate"], "Bearer")
+            self.assertEqual(response.json()["error"]["code"], -32001)
+
+    def test_valid_token_is_accepted(self):
+        client = self._build_client(expected_token="secret-token")
+
+        exact = client.get("/mcp/v1/messages", headers={"Authorization": "Bearer secret-token"})
+        lower_scheme = client.get("/mcp/v1/messages", headers={"Authorization": "bearer secret-token"})
+
+        self.assertEqual(exact.status_code, 200)
+        self.assertEqual(lower_scheme.status_code, 200)
+
+    def test_whitelisted_paths_pass_without_token(self):
+        client = self._build_client(expected_token="secret-token", allowed_origins=["https://app.example.com"])
+
+        self.assertEqual(client.get("/health").status_code, 200)
+        self.assertEqual(client.get("/images/cat.png", headers={"Origin": "https://evil.com"}).status_code, 200)
+        self.assertEqual(client.get("/health/extra").status_code, 401)
+
+    def test_disallowed_origin_is_rejected_with_403_before_auth(self):
+        client = self._build_client(expected_token="secret-token", allowed_origins=["https://app.example.com"])
+
+        response = client.get("/mcp/v1/messages", headers={"Origin": "https://evil.com"})
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()["error"]["message"], "Forbidden: Origin 'https://evil.com' is not allowed")
+
+    def test_wildcard_origin_matches_subdomains_only(self):
+        client = self._build_client(allowed_origins=["https://*.example.com"])
+
+        def status(origin: str) -> int:
+            return client.get("/mcp/v1/messages", headers={"Origin": origin}).status_code
+
+        self.assertEqual(status("https://app.example.com"), 200)
+        self.assertEqual(status("https://a.b.example.com"), 200)
+        self.assertEqual(status("https://evil.com/?x=.example.com"), 403)
+        self.assertEqual(status("https://evil.com#.example.com"), 403)
+        self.assertEqual(status("https://app.example.com.evil.com"), 403)
+        self.assertEqual(status("http://app.example.com"), 403)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
+import asyncio
 import sys
 import unittest
 from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
 
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
@@ -8,7 +11,10 @@ SRC_DIR = PROJECT_ROOT / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
+from mcp_image_server.providers.base import ImageTooLargeError, get_http_session, read_limited
+from mcp_image_server.config import ServerConfig
 from mcp_image_server.providers.doubao_provider import DoubaoProvider
+from mcp_image_server.providers.provider_manager import ProviderManager
 
 
 class DoubaoFallbackLogicTests(unittest.TestCase):
@@ -59,6 +65,53 @@ class DoubaoFallbackLogicTests(unittest.TestCase):
         self.assertIn("2560x1440", resolutions)
         self.assertIn("2048x2048", resolutions)
 
+    def test_rejects_base64_payload_larger_than_max_image_bytes(self):
+        provider = DoubaoProvider(
+            api_key="test-key",
+            model="doubao-seedream-4.5",
+            max_image_bytes=16,
+        )
+        oversized = {"data": [{"b64_json": "A" * 64}]}
+
+        with patch.object(provider, "_request_generation", AsyncMock(return_value=(oversized, 200, ""))):
+            result = asyncio.run(provider.generate_images(query="a cat", resolution="2048x2048"))
+
+        self.assertEqual(len(result), 1)
+        self.assertIn("Image too large", result[0]["error"])
+
+    def test_read_limited_aborts_once_streamed_body_exceeds_limit(self):
+        def fake_response(chunks):
+            async def iter_chunked(size):
+                for chunk in chunks:
+                    yield chunk
+
+            return SimpleNamespace(content_length=None, content=SimpleNamespace(iter_chunked=iter_chunked))
+
+        self.assertEqual(asyncio.run(read_limited(fake_response([b"ab", b"cd"]), 4)), b"abcd")
+        with self.assertRaises(ImageTooLargeError):
+            asyncio.run(read_limited(fake_response([b"ab", b"cd", b"e"]), 4))
+
+    def test_shares_pooled_http_session_until_manager_aclose(self):
+        config = ServerConfig(
+            default_provider="doubao", doubao_api_key="test-key", doubao_model="doubao-seedream-4.5"
+        )
+
+        async def scenario():
+            manager = ProviderManager(config=config)
+            provider = manager.get_provider("doubao")
+            session = get_http_session()
+            self.assertIs(get_http_session(), session)
+
+            await provider.aclose()
+            self.assertFalse(session.closed)
+
+            await manager.aclose()
+            self.assertTrue(session.closed)
+            self.assertIsNot(get_http_session(), session)
+            await manager.aclose()
+
+        asyncio.run(scenario())
+
 
 if __name__ == "__main__":
     unittest.main()
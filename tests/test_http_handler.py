@@ -0,0 +1,100 @@
+import sys
+import unittest
+from pathlib import Path
+
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from mcp_image_server.transports.http import MCPHTTPHandler, PreEncodedJSON
+from mcp_image_server.transports.session_manager import SessionManager
+
+
+class MCPHTTPHandlerTests(unittest.TestCase):
+    def _build_client(self, **handler_kwargs) -> TestClient:
+        handler = MCPHTTPHandler(SessionManager(), **handler_kwargs)
+
+        async def echo(body, session):
+            return {"jsonrpc": "2.0", "id": body.get("id"), "result": {"method": body["method"]}}
+
+        handler.set_json_rpc_handler(echo)
+        app = Starlette(routes=[Route("/mcp/v1/messages", handler.handle_post, methods=["POST"])])
+        return TestClient(app)
+
+    def test_post_within_body_limit_is_dispatched(self):
+        client = self._build_client(max_body_bytes=1024)
+
+        response = client.post("/mcp/v1/messages", json={"jsonrpc": "2.0", "id": 1, "method": "ping"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["result"], {"method": "ping"})
+
+    def test_post_over_body_limit_is_rejected_with_413(self):
+        client = self._build_client(max_body_bytes=64)
+        payload = {"jsonrpc": "2.0", "id": 1, "method": "ping", "params": {"pad": "x" * 128}}
+
+        response = client.post("/mcp/v1/messages", json=payload)
+
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.json()["error"]["code"], -32600)
+
+    def test_chunked_post_over_body_limit_is_rejected_with_413(self):
+        client = self._build_client(max_body_bytes=64)
+
+        def chunks():
+            yield b'{"jsonrpc": "2.0", "id": 1, "method": "ping", "params": {"pad": "'
+            yield b"x" * 128
+            yield b'"}}'
+
+        response = client.post("/mcp/v1/messages", content=chunks())
+
+        self.assertEqual(response.status_code, 413)
+
+    def test_pre_encoded_result_is_embedded_verbatim(self):
+        handler = MCPHTTPHandler(SessionManager())
+
+        async def pre_encoded(body, session):
+            return {"jsonrpc": "2.0", "id": body.get("id"), "result": PreEncodedJSON('{"text":"猫"}'.encode("utf-8"))}
+
+        handler.set_json_rpc_handler(pre_encoded)
+        app = Starlette(routes=[Route("/mcp/v1/messages", handler.handle_post, methods=["POST"])])
+        client = TestClient(app)
+
+        response = client.post("/mcp/v1/messages", json={"jsonrpc": "2.0", "id": "req-1", "method": "prompts/get"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"jsonrpc": "2.0", "id": "req-1", "result": {"text": "猫"}})
+
+    def test_inline_image_result_is_streamed_with_exact_length(self):
+        handler = MCPHTTPHandler(SessionManager())
+        result = {
+            "content": [
+                {"type": "text", "text": "猫"},
+                {"type": "image", "data": "aGVsbG8=", "mimeType": "image/png"},
+                {"type": "image", "data": "not\"base64", "mimeType": "image/png"},
+            ],
+            "isError": False,
+        }
+
+        async def with_images(body, session):
+            return {"jsonrpc": "2.0", "id": body.get("id"), "result": result}
+
+        handler.set_json_rpc_handler(with_images)
+        app = Starlette(routes=[Route("/mcp/v1/messages", handler.handle_post, methods=["POST"])])
+        client = TestClient(app)
+
+        response = client.post("/mcp/v1/messages", json={"jsonrpc": "2.0", "id": 5, "method": "tools/call"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(int(response.headers["content-length"]), len(response.content))
+        self.assertEqual(response.json(), {"jsonrpc": "2.0", "id": 5, "result": result})
+
+
+if __name__ == "__main__":
+    unittest.main()
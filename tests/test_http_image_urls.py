@@ -5,6 +5,7 @@ import sys
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 from starlette.testclient import TestClient
 
@@ -15,7 +16,8 @@ if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
 from mcp_image_server.config import ServerConfig
-from mcp_image_server.transports.http_server import MCPImageServerHTTP
+from mcp_image_server.transports.auth import RequestGuardMiddleware
+from mcp_image_server.transports.http_server import MCPImageServerHTTP, build_http_app, run_http_server
 
 
 class _FakeProvider:
@@ -33,8 +35,9 @@ class _FakeProvider:
 
 
 class _FakeProviderManager:
-    def __init__(self, provider_name: str = "fake"):
+    def __init__(self, provider_name: str = "fake", raw_bytes: bool = False):
         self.default_provider = provider_name
+        self.raw_bytes = raw_bytes
         self.provider_name = provider_name
         self._provider = _FakeProvider()
         self.last_generate_kwargs = None
@@ -49,6 +52,8 @@ class _FakeProviderManager:
 
     async def generate_images(self, query: str, provider_name: str, **kwargs):
         self.last_generate_kwargs = kwargs
+        if self.raw_bytes:
+            return [{"content_bytes": b"fake-image-bytes", "content_type": "image/png"}]
         image_data = base64.b64encode(b"fake-image-bytes").decode("ascii")
         return [
             {
@@ -85,6 +90,24 @@ class HTTPImageURLTests(unittest.IsolatedAsyncioTestCase):
                 f"https://mcp.example.com/images/{image.get('file_name')}",
             )
 
+    async def test_generate_image_sanitizes_file_prefix(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config = ServerConfig(
+                transport="http",
+                host="127.0.0.1",
+                port=8123,
+                image_save_dir=tmpdir,
+            )
+            server = MCPImageServerHTTP(config)
+            server.provider_manager = _FakeProviderManager()
+
+            result = await server._generate_image(prompt="test prompt", file_prefix="../猫 cat-1_x")
+
+            self.assertTrue(result.get("ok"))
+            file_name = result["images"][0]["file_name"]
+            self.assertTrue(file_name.startswith("___猫_cat_1_x_fake_"))
+            self.assertEqual(Path(result["images"][0]["local_path"]).parent, Path(tmpdir).resolve())
+
     async def test_generate_image_url_is_none_for_wildcard_host_without_public_base(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             config = ServerConfig(
@@ -228,6 +251,190 @@ class HTTPImageURLTests(unittest.IsolatedAsyncioTestCase):
             text_payload = json.loads(result["content"][0]["text"])
             self.assertIn("base64_data", text_payload["images"][0])
 
+    async def test_tools_call_generate_image_encodes_raw_provider_bytes_once(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config = ServerConfig(
+                transport="http",
+                host="127.0.0.1",
+                port=8123,
+                image_save_dir=tmpdir,
+            )
+            server = MCPImageServerHTTP(config)
+            server.provider_manager = _FakeProviderManager(raw_bytes=True)
+
+            rpc_response = await server._handle_json_rpc(
+                {
+                    "jsonrpc": "2.0",
+                    "id": 12,
+                    "method": "tools/call",
+                    "params": {
+                        "name": "generate_image",
+                        "arguments": {"prompt": "test prompt"}
+                    }
+                },
+                session=None
+            )
+
+            result = rpc_response["result"]
+            self.assertFalse(result["isError"])
+            image = result["structuredContent"]["images"][0]
+            self.assertEqual(image["size_bytes"], len(b"fake-image-bytes"))
+            self.assertNotIn("image_bytes", image)
+            self.assertNotIn("base64_data", image)
+            self.assertEqual(Path(image["local_path"]).read_bytes(), b"fake-image-bytes")
+
+            image_blocks = [item for item in result["content"] if item["type"] == "image"]
+            self.assertEqual(len(image_blocks), 1)
+            self.assertEqual(base64.b64decode(image_blocks[0]["data"]), b"fake-image-bytes")
+
+    async def test_list_methods_reuse_serialized_payloads(self):
+        config = ServerConfig(
+            transport="http",
+            host="127.0.0.1",
+            port=8123,
+            image_save_dir="./generated_images",
+        )
+        server = MCPImageServerHTTP(config)
+
+        for method, key in (("tools/list", "tools"), ("resources/list", "resources"), ("prompts/list", "prompts")):
+            first = await server._handle_json_rpc({"jsonrpc": "2.0", "id": 1, "method": method}, session=None)
+            second = await server._handle_json_rpc({"jsonrpc": "2.0", "id": 2, "method": method}, session=None)
+            self.assertTrue(json.loads(first["result"])[key])
+            self.assertIs(first["result"], second["result"])
+
+        tools = json.loads(server._list_results["tools/list"])["tools"]
+        self.assertIn("get_image_data", [tool["name"] for tool in tools])
+
+    async def test_concurrent_generations_share_one_progress_timer(self):
+        config = ServerConfig(
+            transport="http",
+            host="127.0.0.1",
+            port=8123,
+            image_save_dir="./generated_images",
+        )
+        server = MCPImageServerHTTP(config)
+
+        server._begin_generation("openai")
+        first_handle = server._progress_handle
+        server._begin_generation("openai")
+        server._begin_generation("doubao")
+        self.assertIs(server._progress_handle, first_handle)
+        self.assertEqual(server._active_generations, {"openai": 2, "doubao": 1})
+
+        server._end_generation("openai")
+        server._end_generation("doubao")
+        self.assertIs(server._progress_handle, first_handle)
+        server._end_generation("openai")
+        self.assertIsNone(server._progress_handle)
+        self.assertTrue(first_handle.cancelled())
+        self.assertFalse(server._active_generations)
+
+    async def test_unknown_method_returns_error_without_logging_failure(self):
+        config = ServerConfig(
+            transport="http",
+            host="127.0.0.1",
+            port=8123,
+            image_save_dir="./generated_images",
+        )
+        server = MCPImageServerHTTP(config)
+
+        with patch.object(server, "_log_exception") as log_exception:
+            response = await server._handle_json_rpc(
+                {"jsonrpc": "2.0", "id": 9, "method": "no/such/method"},
+                session=None,
+            )
+
+        log_exception.assert_not_called()
+        self.assertEqual(response["id"], 9)
+        self.assertEqual(response["error"]["code"], -32603)
+        self.assertEqual(response["error"]["message"], "Unknown method: no/such/method")
+
+    async def test_tools_call_generate_image_omits_inline_data_above_limit(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config = ServerConfig(
+                transport="http",
+                host="127.0.0.1",
+                port=8123,
+                image_save_dir=tmpdir,
+                inline_image_max_bytes=4,
+            )
+            server = MCPImageServerHTTP(config)
+            server.provider_manager = _FakeProviderManager(raw_bytes=True)
+
+            rpc_response = await server._handle_json_rpc(
+                {
+                    "jsonrpc": "2.0",
+                    "id": 13,
+                    "method": "tools/call",
+                    "params": {
+                        "name": "generate_image",
+                        "arguments": {"prompt": "test prompt"}
+                    }
+                },
+                session=None
+            )
+
+            result = rpc_response["result"]
+            self.assertFalse(result["isError"])
+            self.assertEqual([item["type"] for item in result["content"]], ["text"])
+            image = result["structuredContent"]["images"][0]
+            self.assertEqual(Path(image["local_path"]).read_bytes(), b"fake-image-bytes")
+            self.assertIsNotNone(image["url"])
+
+            image_data = await server._get_image_data(image_id=image["id"])
+            self.assertTrue(image_data.get("ok"), msg=image_data)
+
+    async def test_prompts_get_reuses_serialized_result_per_arguments(self):
+        config = ServerConfig(
+            transport="http",
+            host="127.0.0.1",
+            port=8123,
+            image_save_dir="./generated_images",
+        )
+        server = MCPImageServerHTTP(config)
+
+        def prompt_request(description):
+            return {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "prompts/get",
+                "params": {"name": "image_generation_prompt", "arguments": {"description": description}},
+            }
+
+        first = await server._handle_json_rpc(prompt_request("a cat"), session=None)
+        second = await server._handle_json_rpc(prompt_request("a cat"), session=None)
+        other = await server._handle_json_rpc(prompt_request("a dog"), session=None)
+
+        self.assertIs(first["result"], second["result"])
+        self.assertIn("a dog", json.loads(other["result"])["description"])
+        self.assertIsNot(first["result"], other["result"])
+
+    async def test_prompts_get_handles_missing_name_and_null_arguments(self):
+        config = ServerConfig(
+            transport="http",
+            host="127.0.0.1",
+            port=8123,
+            image_save_dir="./generated_images",
+        )
+        server = MCPImageServerHTTP(config)
+
+        missing_name = await server._handle_json_rpc(
+            {"jsonrpc": "2.0", "id": 1, "method": "prompts/get", "params": {}},
+            session=None,
+        )
+        self.assertEqual(missing_name["error"]["message"], "Missing prompt name")
+
+        null_arguments = await server._handle_json_rpc(
+            {
+                "jsonrpc": "2.0",
+                "id": 2,
+                "method": "prompts/get",
+                "params": {"name": "image_generation_prompt", "arguments": None},
+            },
+            session=None,
+        )
+        self.assertIn("messages", json.loads(null_arguments["result"]))
+
     async def test_get_image_data_rejects_large_payload(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             config = ServerConfig(
@@ -312,6 +519,152 @@ class HTTPStaticRouteTests(unittest.TestCase):
                 mcp_response = client.get("/mcp/v1/messages")
                 self.assertEqual(mcp_response.status_code, 401)
 
+    def test_origin_is_checked_before_auth_in_single_guard_layer(self):
+        config = ServerConfig(
+            transport="http",
+            host="127.0.0.1",
+            port=8123,
+            image_save_dir="./generated_images",
+            auth_token="test-token",
+            allowed_origins=["https://app.example.com"],
+        )
+        app = MCPImageServerHTTP(config).create_app()
+        # The guard wraps the MCP routes only; nothing runs app-wide.
+        self.assertEqual(app.user_middleware, [])
+        for route in app.routes:
+            if getattr(route, "path", None) == "/mcp/v1/messages":
+                self.assertIsInstance(route.app, RequestGuardMiddleware)
+
+        with TestClient(app) as client:
+            bad_origin = client.get("/mcp/v1/messages", headers={"Origin": "https://evil.example.com"})
+            self.assertEqual(bad_origin.status_code, 403)
+
+            missing_token = client.get("/mcp/v1/messages", headers={"Origin": "https://app.example.com"})
+            self.assertEqual(missing_token.status_code, 401)
+
+            health = client.get("/health", headers={"Origin": "https://evil.example.com"})
+            self.assertEqual(health.status_code, 200)
+
+            authorized = client.post(
+                "/mcp/v1/messages",
+                headers={"Origin": "https://app.example.com", "Authorization": "Bearer test-token"},
+                json={"jsonrpc": "2.0", "id": 1, "method": "tools/list"},
+            )
+            self.assertEqual(authorized.status_code, 200)
+
+            lowercase_scheme = client.post(
+                "/mcp/v1/messages",
+                headers={"Origin": "https://app.example.com", "Authorization": "bearer test-token"},
+                json={"jsonrpc": "2.0", "id": 2, "method": "tools/list"},
+            )
+            self.assertEqual(lowercase_scheme.status_code, 200)
+
+            wrong_token = client.post(
+                "/mcp/v1/messages",
+                headers={"Origin": "https://app.example.com", "Authorization": "Bearer test-tokem"},
+                json={"jsonrpc": "2.0", "id": 3, "method": "tools/list"},
+            )
+            self.assertEqual(wrong_token.status_code, 401)
+
+    def test_tools_call_with_image_block_streams_valid_json(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config = ServerConfig(
+                transport="http",
+                host="127.0.0.1",
+                port=8123,
+                image_save_dir=tmpdir,
+            )
+            server = MCPImageServerHTTP(config)
+            server.provider_manager = _FakeProviderManager(raw_bytes=True)
+
+            with TestClient(server.create_app()) as client:
+                response = client.post(
+                    "/mcp/v1/messages",
+                    json={
+                        "jsonrpc": "2.0",
+                        "id": 7,
+                        "method": "tools/call",
+                        "params": {"name": "generate_image", "arguments": {"prompt": "test prompt"}},
+                    },
+                )
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(int(response.headers["content-length"]), len(response.content))
+            body = response.json()
+            self.assertEqual(body["id"], 7)
+            image_blocks = [item for item in body["result"]["content"] if item["type"] == "image"]
+            self.assertEqual(base64.b64decode(image_blocks[0]["data"]), b"fake-image-bytes")
+            self.assertEqual(image_blocks[0]["mimeType"], "image/png")
+            self.assertFalse(body["result"]["isError"])
+
+    def test_build_http_app_starts_and_stops_server_via_lifespan(self):
+        config = ServerConfig(
+            transport="http",
+            host="127.0.0.1",
+            port=8123,
+            image_save_dir="./generated_images",
+        )
+        with patch.object(MCPImageServerHTTP, "start") as start, patch.object(MCPImageServerHTTP, "stop") as stop:
+            app = build_http_app(config)
+            with TestClient(app):
+                start.assert_awaited_once()
+                stop.assert_not_awaited()
+            stop.assert_awaited_once()
+
+
+class HTTPRunServerTests(unittest.TestCase):
+    def test_run_http_server_uses_app_factory_for_multiple_workers(self):
+        config = ServerConfig(
+            transport="http",
+            host="127.0.0.1",
+            port=8123,
+            image_save_dir="./generated_images",
+            http_workers=3,
+        )
+        with patch("mcp_image_server.transports.http_server.uvicorn.run") as uvicorn_run, \
+                self.assertLogs("mcp_image_server.transports.http_server", level="WARNING") as logs:
+            run_http_server(config)
+
+        args, kwargs = uvicorn_run.call_args
+        self.assertEqual(args[0], "mcp_image_server.transports.http_server:create_worker_app")
+        self.assertTrue(kwargs["factory"])
+        self.assertEqual(kwargs["workers"], 3)
+        self.assertEqual(kwargs["port"], 8123)
+        self.assertIsNone(kwargs["limit_concurrency"])
+        self.assertIn("worker processes load their own config", logs.output[0])
+
+    def test_run_http_server_falls_back_when_fast_loop_is_missing(self):
+        config = ServerConfig(
+            transport="http",
+            host="127.0.0.1",
+            port=8123,
+            image_save_dir="./generated_images",
+            http_loop="uvloop",
+            http_parser="httptools",
+        )
+        with patch("mcp_image_server.transports.http_server.importlib.util.find_spec", return_value=None), \
+                patch("mcp_image_server.transports.http_server.uvicorn.run") as uvicorn_run, \
+                self.assertLogs("mcp_image_server.transports.http_server", level="WARNING"):
+            run_http_server(config)
+
+        _, kwargs = uvicorn_run.call_args
+        self.assertEqual(kwargs["loop"], "auto")
+        self.assertEqual(kwargs["http"], "auto")
+
+    def test_run_http_server_passes_concurrency_limit_to_uvicorn(self):
+        config = ServerConfig(
+            transport="http",
+            host="127.0.0.1",
+            port=8123,
+            image_save_dir="./generated_images",
+            http_max_concurrency=64,
+        )
+        with patch("mcp_image_server.transports.http_server.uvicorn.run") as uvicorn_run:
+            run_http_server(config)
+
+        _, kwargs = uvicorn_run.call_args
+        self.assertEqual(kwargs["limit_concurrency"], 64)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -119,6 +119,29 @@ class HTTPReloadConfigTests(unittest.IsolatedAsyncioTestCase):
             self.assertFalse(result.get("ok"), msg=result)
             self.assertEqual(result["error"]["code"], "invalid_config")
 
+    async def test_reload_config_refreshes_prompt_provider_catalog(self):
+        with patch.dict(
+            os.environ,
+            {
+                "MCP_TRANSPORT": "http",
+                "MCP_HOST": "127.0.0.1",
+                "MCP_PORT": "8000",
+                "OPENAI_API_KEY": "openai-test-key",
+                "OPENAI_MODEL": "gpt-image-test-a",
+            },
+            clear=True,
+        ):
+            server = MCPImageServerHTTP(ServerConfig())
+            before = await server._get_prompt("image_generation_prompt", {"description": "cat"})
+            self.assertNotIn("doubao", before.messages[0].content.text)
+
+            os.environ["DOUBAO_API_KEY"] = "doubao-test-key"
+            result = await server._reload_config(dotenv_override=False)
+            self.assertTrue(result.get("ok"), msg=result)
+
+            after = await server._get_prompt("image_generation_prompt", {"description": "cat"})
+            self.assertIn("doubao", after.messages[0].content.text)
+
     def _run(self, coro):
         import asyncio
 
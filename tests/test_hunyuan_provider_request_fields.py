@@ -11,6 +11,7 @@ SRC_DIR = PROJECT_ROOT / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
+from mcp_image_server.providers import hunyuan_provider
 from mcp_image_server.providers.hunyuan_provider import HunyuanProvider
 
 
@@ -25,6 +26,10 @@ class _StrictSubmitTextToImageJobRequest:
 
 
 class HunyuanProviderRequestFieldTests(unittest.TestCase):
+    def setUp(self):
+        hunyuan_provider._CLIENT_CACHE.clear()
+        self.addCleanup(hunyuan_provider._CLIENT_CACHE.clear)
+
     def test_submit_request_only_uses_supported_fields(self):
         fake_client = MagicMock()
         fake_client.SubmitTextToImageJob.return_value = SimpleNamespace(JobId="job-123")
@@ -59,6 +64,54 @@ class HunyuanProviderRequestFieldTests(unittest.TestCase):
         self.assertEqual(submit_request.Revise, 1)
         self.assertEqual(submit_request.LogoAdd, 0)
 
+    def test_client_is_shared_across_instances_with_same_credentials(self):
+        with patch("mcp_image_server.providers.hunyuan_provider.credential.Credential"), patch(
+            "mcp_image_server.providers.hunyuan_provider.aiart_client.AiartClient",
+            side_effect=lambda *args, **kwargs: MagicMock(),
+        ) as mock_client_cls:
+            first = HunyuanProvider(secret_id="sid", secret_key="skey")
+            second = HunyuanProvider(secret_id="sid", secret_key="skey")
+            other = HunyuanProvider(secret_id="sid-2", secret_key="skey")
+
+        self.assertIs(first.client, second.client)
+        self.assertIsNot(first.client, other.client)
+        self.assertEqual(mock_client_cls.call_count, 2)
+
+
+class HunyuanPollSchedulerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_jobs_share_one_polling_loop(self):
+        statuses = {"job-a": iter(["2", "5"]), "job-b": iter(["1", "2", "4"])}
+        queried = []
+
+        def query(req):
+            queried.append(req.JobId)
+            return SimpleNamespace(JobStatusCode=next(statuses[req.JobId]), ResultImage=["https://x/y.jpg"])
+
+        fake_client = MagicMock()
+        fake_client.QueryTextToImageJob.side_effect = query
+        scheduler = hunyuan_provider._JobPollScheduler(interval=0.01)
+
+        done_a, done_b = await asyncio.gather(
+            scheduler.wait_for_job(fake_client, "job-a", timeout=1),
+            scheduler.wait_for_job(fake_client, "job-b", timeout=1),
+        )
+
+        self.assertEqual(done_a.JobStatusCode, "5")
+        self.assertEqual(done_b.JobStatusCode, "4")
+        self.assertEqual(queried.count("job-a"), 2)
+        self.assertEqual(queried.count("job-b"), 3)
+        self.assertEqual(scheduler._pending, {})
+
+    async def test_wait_for_job_returns_none_on_timeout(self):
+        fake_client = MagicMock()
+        fake_client.QueryTextToImageJob.return_value = SimpleNamespace(JobStatusCode="2", ResultImage=None)
+        scheduler = hunyuan_provider._JobPollScheduler(interval=0.01)
+
+        result = await scheduler.wait_for_job(fake_client, "job-slow", timeout=0.05)
+
+        self.assertIsNone(result)
+        self.assertEqual(scheduler._pending, {})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -11,10 +11,24 @@ SRC_DIR = PROJECT_ROOT / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from mcp_image_server.providers.openai_provider import OpenAIProvider
+import httpx
+import openai
+
+from mcp_image_server.providers import openai_provider
+from mcp_image_server.providers.openai_provider import OpenAIProvider, close_openai_clients
+
+
+def _api_status_error(error_cls, status_code):
+    request = httpx.Request("POST", "https://api.openai.com/v1/images/generations")
+    response = httpx.Response(status_code, request=request)
+    return error_cls(f"HTTP {status_code}", response=response, body=None)
 
 
 class OpenAIProviderModelPolicyTests(unittest.TestCase):
+    def setUp(self):
+        openai_provider._CLIENT_CACHE.clear()
+        self.addCleanup(openai_provider._CLIENT_CACHE.clear)
+
     def test_rejects_non_gpt_image_models(self):
         with patch("mcp_image_server.providers.openai_provider.openai.AsyncOpenAI") as mock_async_openai:
             mock_async_openai.return_value = MagicMock()
@@ -106,12 +120,155 @@ class OpenAIProviderModelPolicyTests(unittest.TestCase):
         self.assertIn("Invalid OpenAI background", result[0]["error"])
         mock_client.images.generate.assert_not_awaited()
 
+    def test_request_option_normalization_is_memoized(self):
+        normalize = OpenAIProvider._normalize_request_options
+        normalize.cache_clear()
+        self.addCleanup(normalize.cache_clear)
+
+        first = normalize(" Transparent ", "WEBP", "80", "low")
+        second = normalize(" Transparent ", "WEBP", "80", "low")
+
+        self.assertEqual(first, (None, ("transparent", "webp", 80, "low")))
+        self.assertIs(first, second)
+        self.assertEqual(normalize.cache_info().hits, 1)
+
+        error, options = normalize(None, "png", 50, None)
+        self.assertIn("output_compression requires", error)
+        self.assertIsNone(options)
+
+    def test_unhashable_request_option_is_reported_as_invalid(self):
+        with patch("mcp_image_server.providers.openai_provider.openai.AsyncOpenAI", return_value=MagicMock()):
+            provider = OpenAIProvider(api_key="test-key", model="gpt-image-1.5")
+
+        result = asyncio.run(
+            provider.generate_images(query="a cat", output_format="jpeg", output_compression=[1])
+        )
+
+        self.assertEqual(
+            result[0]["error"],
+            "Invalid OpenAI output_compression. Expected integer between 0 and 100.",
+        )
+
     def test_openai_resolutions_include_auto(self):
         with patch("mcp_image_server.providers.openai_provider.openai.AsyncOpenAI") as mock_async_openai:
             mock_async_openai.return_value = MagicMock()
             provider = OpenAIProvider(api_key="test-key", model="gpt-image-1.5")
             self.assertIn("auto", provider.get_available_resolutions())
 
+    def test_retries_transient_errors_with_backoff(self):
+        mock_client = MagicMock()
+        mock_client.images.generate = AsyncMock(
+            side_effect=[
+                _api_status_error(openai.RateLimitError, 429),
+                _api_status_error(openai.InternalServerError, 503),
+                SimpleNamespace(data=[SimpleNamespace(b64_json="ZmFrZV9pbWFnZQ==", revised_prompt=None)]),
+            ]
+        )
+
+        with patch("mcp_image_server.providers.openai_provider.openai.AsyncOpenAI", return_value=mock_client), patch(
+            "mcp_image_server.providers.openai_provider.asyncio.sleep", AsyncMock()
+        ) as mock_sleep:
+            provider = OpenAIProvider(api_key="test-key", model="gpt-image-1.5", max_retries=3, backoff_max=4)
+            result = asyncio.run(provider.generate_images(query="a cat"))
+
+        self.assertEqual(result[0]["content"], "ZmFrZV9pbWFnZQ==")
+        self.assertEqual(mock_client.images.generate.await_count, 3)
+        self.assertEqual(mock_sleep.await_count, 2)
+        for call in mock_sleep.await_args_list:
+            self.assertGreaterEqual(call.args[0], 1.0)
+            self.assertLessEqual(call.args[0], 4)
+
+    def test_does_not_retry_client_errors(self):
+        mock_client = MagicMock()
+        mock_client.images.generate = AsyncMock(side_effect=_api_status_error(openai.BadRequestError, 400))
+
+        with patch("mcp_image_server.providers.openai_provider.openai.AsyncOpenAI", return_value=mock_client), patch(
+            "mcp_image_server.providers.openai_provider.asyncio.sleep", AsyncMock()
+        ) as mock_sleep:
+            provider = OpenAIProvider(api_key="test-key", model="gpt-image-1.5")
+            result = asyncio.run(provider.generate_images(query="a cat"))
+
+        self.assertIn("OpenAI API error", result[0]["error"])
+        self.assertEqual(mock_client.images.generate.await_count, 1)
+        mock_sleep.assert_not_awaited()
+
+    def test_client_is_shared_across_instances_and_closed_once_at_shutdown(self):
+        with patch(
+            "mcp_image_server.providers.openai_provider.openai.AsyncOpenAI",
+            side_effect=lambda *args, **kwargs: MagicMock(close=AsyncMock()),
+        ) as mock_async_openai:
+            first = OpenAIProvider(api_key="test-key", model="gpt-image-1.5")
+            second = OpenAIProvider(api_key="test-key", model="gpt-image-1.5")
+            other = OpenAIProvider(api_key="test-key", model="gpt-image-1.5", base_url="https://proxy.example/v1")
+
+            self.assertIs(first.client, second.client)
+            self.assertIsNot(first.client, other.client)
+            self.assertEqual(mock_async_openai.call_count, 2)
+
+            asyncio.run(first.aclose())
+            first.client.close.assert_not_awaited()
+
+            asyncio.run(close_openai_clients())
+            first.client.close.assert_awaited_once()
+            other.client.close.assert_awaited_once()
+            third = OpenAIProvider(api_key="test-key", model="gpt-image-1.5")
+            self.assertIsNot(third.client, first.client)
+
+    def test_response_cache_coalesces_and_reuses_identical_requests(self):
+        async def slow_generate(**kwargs):
+            await asyncio.sleep(0.01)
+            return SimpleNamespace(data=[SimpleNamespace(b64_json="ZmFrZV9pbWFnZQ==", revised_prompt=None)])
+
+        mock_client = MagicMock()
+        mock_client.images.generate = AsyncMock(side_effect=slow_generate)
+
+        async def run_requests(provider):
+            first, second = await asyncio.gather(
+                provider.generate_images(query="a cat", style="vivid"),
+                provider.generate_images(query="a cat", style="vivid"),
+            )
+            third = await provider.generate_images(query="a cat", style="vivid")
+            other = await provider.generate_images(query="a dog", style="vivid")
+            return first, second, third, other
+
+        with patch("mcp_image_server.providers.openai_provider.openai.AsyncOpenAI", return_value=mock_client):
+            provider = OpenAIProvider(api_key="test-key", model="gpt-image-1.5", cache_size=1)
+            first, second, third, other = asyncio.run(run_requests(provider))
+
+        self.assertEqual(mock_client.images.generate.await_count, 2)
+        for result in (first, second, third, other):
+            self.assertEqual(result[0]["content"], "ZmFrZV9pbWFnZQ==")
+        self.assertEqual(other[0]["description"], "a dog")
+        self.assertEqual(len(provider._cache), 1)
+        self.assertEqual(provider._inflight, {})
+
+    def test_cancelled_caller_does_not_cancel_coalesced_request(self):
+        async def slow_generate(**kwargs):
+            await asyncio.sleep(0.05)
+            return SimpleNamespace(data=[SimpleNamespace(b64_json="ZmFrZV9pbWFnZQ==", revised_prompt=None)])
+
+        mock_client = MagicMock()
+        mock_client.images.generate = AsyncMock(side_effect=slow_generate)
+
+        async def run_requests(provider):
+            first = asyncio.ensure_future(provider.generate_images(query="a cat", style="vivid"))
+            await asyncio.sleep(0)
+            second = asyncio.ensure_future(provider.generate_images(query="a cat", style="vivid"))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await first
+            return await second
+
+        with patch("mcp_image_server.providers.openai_provider.openai.AsyncOpenAI", return_value=mock_client):
+            provider = OpenAIProvider(api_key="test-key", model="gpt-image-1.5", cache_size=1)
+            result = asyncio.run(run_requests(provider))
+
+        self.assertEqual(mock_client.images.generate.await_count, 1)
+        self.assertEqual(result[0]["content"], "ZmFrZV9pbWFnZQ==")
+        self.assertEqual(len(provider._cache), 1)
+        self.assertEqual(provider._inflight, {})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,4 +1,7 @@
+import asyncio
+import json
 import sys
+import tempfile
 import unittest
 from pathlib import Path
 from types import SimpleNamespace
@@ -10,7 +13,11 @@ SRC_DIR = PROJECT_ROOT / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
+from mcp_image_server.config import ServerConfig
+from mcp_image_server.providers.doubao_provider import DoubaoProvider
+from mcp_image_server.providers.openai_provider import OpenAIProvider
 from mcp_image_server.providers.provider_manager import ProviderManager
+from mcp_image_server.transports.http_server import MCPImageServerHTTP
 
 
 class ProviderManagerConfigTests(unittest.TestCase):
@@ -23,6 +30,9 @@ class ProviderManagerConfigTests(unittest.TestCase):
             "openai_api_key": None,
             "openai_base_url": None,
             "openai_model": "gpt-image-1.5",
+            "openai_max_retries": 5,
+            "openai_backoff_max": 60.0,
+            "openai_cache_size": 0,
             "doubao_api_key": None,
             "doubao_endpoint": None,
             "doubao_model": "doubao-seedream-4.5",
@@ -49,11 +59,16 @@ class ProviderManagerConfigTests(unittest.TestCase):
             mock_doubao.return_value = MagicMock()
 
             manager = ProviderManager(config=config)
+            mock_doubao.assert_not_called()
+            self.assertIsNotNone(manager.get_provider("doubao"))
 
         mock_openai.assert_called_once_with(
             api_key="openai-key",
             base_url="https://api.openai.com/v1",
             model="gpt-image-1.5",
+            max_retries=5,
+            backoff_max=60.0,
+            cache_size=0,
         )
         mock_doubao.assert_called_once_with(
             api_key="doubao-key",
@@ -124,6 +139,98 @@ class ProviderManagerConfigTests(unittest.TestCase):
             with self.assertRaises(ValueError):
                 ProviderManager(config=unavailable_config)
 
+    def test_non_default_providers_are_constructed_on_first_use(self):
+        config = self._build_config(
+            default_provider="doubao",
+            openai_api_key="openai-key",
+            doubao_api_key="doubao-key",
+        )
+
+        with patch("mcp_image_server.providers.provider_manager.OpenAIProvider") as mock_openai, patch(
+            "mcp_image_server.providers.provider_manager.DoubaoProvider"
+        ) as mock_doubao:
+            manager = ProviderManager(config=config)
+
+        mock_doubao.assert_called_once()
+        mock_openai.assert_not_called()
+        self.assertEqual(sorted(manager.get_available_providers()), ["doubao", "openai"])
+
+        first = manager.get_provider("openai")
+        second = manager.get_provider("openai")
+        self.assertIs(first, second)
+        mock_openai.assert_called_once()
+
+    def test_provider_failing_lazy_construction_is_dropped(self):
+        config = self._build_config(
+            default_provider="doubao",
+            openai_api_key="openai-key",
+            doubao_api_key="doubao-key",
+        )
+
+        with patch("mcp_image_server.providers.provider_manager.OpenAIProvider") as mock_openai, patch(
+            "mcp_image_server.providers.provider_manager.DoubaoProvider"
+        ):
+            mock_openai.side_effect = RuntimeError("boom")
+            manager = ProviderManager(config=config)
+
+        self.assertIsNone(manager.get_provider("openai"))
+        self.assertEqual(manager.get_available_providers(), ["doubao"])
+
+    def test_provider_failing_to_import_falls_back_to_next_provider(self):
+        config = self._build_config(
+            tencent_secret_id="secret-id",
+            tencent_secret_key="secret-key",
+            openai_api_key="openai-key",
+        )
+
+        missing_sdk = ModuleNotFoundError("No module named 'tencentcloud'")
+        with patch(
+            "mcp_image_server.providers.provider_manager._resolve_hunyuan_provider",
+            side_effect=missing_sdk,
+        ), patch("mcp_image_server.providers.provider_manager.OpenAIProvider") as mock_openai:
+            mock_openai.return_value = MagicMock()
+            manager = ProviderManager(config=config)
+
+        self.assertEqual(manager.default_provider, "openai")
+        self.assertEqual(manager.get_available_providers(), ["openai"])
+
+    def test_styles_list_resource_does_not_construct_unused_providers(self):
+        config = self._build_config(
+            default_provider="hunyuan",
+            tencent_secret_id="secret-id",
+            tencent_secret_key="secret-key",
+            openai_api_key="openai-key",
+            doubao_api_key="doubao-key",
+        )
+
+        with patch("mcp_image_server.providers.provider_manager.HunyuanProvider") as mock_hunyuan, patch(
+            "mcp_image_server.providers.provider_manager.OpenAIProvider"
+        ) as mock_openai, patch("mcp_image_server.providers.provider_manager.DoubaoProvider") as mock_doubao:
+            mock_hunyuan.return_value.catalog_styles.return_value = {"general": "general"}
+            mock_openai.catalog_styles.side_effect = OpenAIProvider.catalog_styles
+            mock_doubao.catalog_styles.side_effect = DoubaoProvider.catalog_styles
+            manager = ProviderManager(config=config)
+
+            with tempfile.TemporaryDirectory() as tmpdir:
+                server = MCPImageServerHTTP(ServerConfig(transport="http", host="127.0.0.1", image_save_dir=tmpdir))
+                server.provider_manager = manager
+                response = asyncio.run(server._handle_json_rpc(
+                    {"jsonrpc": "2.0", "id": 1, "method": "resources/read", "params": {"uri": "styles://list"}},
+                    session=None
+                ))
+
+        mock_openai.assert_not_called()
+        mock_doubao.assert_not_called()
+        styles = json.loads(response["result"]["contents"][0]["text"])
+        self.assertEqual(sorted(styles), ["doubao", "hunyuan", "openai"])
+        self.assertEqual(styles["openai"], dict(OpenAIProvider.catalog_styles()))
+
+    def test_server_config_normalizes_and_validates_default_provider(self):
+        self.assertEqual(ServerConfig(default_provider=" OpenAI ").default_provider, "openai")
+        self.assertIsNone(ServerConfig(default_provider="   ").default_provider)
+        with self.assertRaises(ValueError):
+            ServerConfig(default_provider="invalid-provider")
+
 
 if __name__ == "__main__":
     unittest.main()
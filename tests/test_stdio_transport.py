@@ -14,6 +14,13 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 SRC_DIR = PROJECT_ROOT / "src"
 
 
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from mcp_image_server.config import ServerConfig
+from mcp_image_server.transports.stdio_server import MCPImageServerStdio
+
+
 class StdioTransportTests(unittest.IsolatedAsyncioTestCase):
     async def test_stdio_initialize_and_list_capabilities(self):
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -76,5 +83,20 @@ class StdioTransportTests(unittest.IsolatedAsyncioTestCase):
                     self.assertEqual(styles_payload, {})
 
 
+class StdioJsonRpcDispatchTests(unittest.IsolatedAsyncioTestCase):
+    async def test_non_string_method_returns_error_and_server_keeps_serving(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            server = MCPImageServerStdio(
+                ServerConfig(transport="stdio", image_save_dir=str(Path(tmpdir) / "generated_images"))
+            )
+
+            response = await server._handle_json_rpc({"jsonrpc": "2.0", "id": 1, "method": ["x"]})
+            self.assertEqual(response["id"], 1)
+            self.assertEqual(response["error"]["code"], -32603)
+
+            ping = await server._handle_json_rpc({"jsonrpc": "2.0", "id": 2, "method": "ping"})
+            self.assertEqual(ping, {"jsonrpc": "2.0", "id": 2, "result": {}})
+
+
 if __name__ == "__main__":
     unittest.main()